@@ -0,0 +1,114 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.fake_trello import FakeTrelloServer
+from benchmarks.synthetic_board import SyntheticBoard
+from src.downloader import DEFAULT_DOWNLOAD_WORKERS
+from src.trello import Trello, RequestScheduler
+import src.exporter as exporter
+
+# Runs exporter.export_board against the local fake Trello server under different network
+# conditions and reports the wall time, requests/sec and MB/sec of every configuration.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_export --cards 500 --attachment-size 262144
+#   python -m benchmarks.bench_export --config baseline latency --async
+
+BOARD_ID = "b" * 24
+
+# Name and FakeTrelloServer arguments of every network condition
+CONFIGURATIONS: List[Tuple[str, Dict[str, Any]]] = [
+    ("baseline", {}),
+    ("latency", {"latency": 0.05}),
+    ("bandwidth", {"bandwidth": 1024 * 1024}),
+    ("429", {"error_rate_429": 0.02}),
+    ("5xx", {"error_rate_5xx": 0.02}),
+    ("rate-limit", {"rate_limit": 100}),
+]
+
+# The client may send as fast as it can, the server decides about rate limits
+CLIENT_REQUESTS_PER_INTERVAL = 1_000_000
+
+
+def run_configuration(board: SyntheticBoard, server_options: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Export the board from a fake Trello server with the given options.
+
+    Args:
+        board (SyntheticBoard): The board served by the fake server.
+        server_options (Dict[str, Any]): The arguments of FakeTrelloServer, e.g. the injected latency.
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        Dict[str, Any]: The measurements of the export.
+    """
+    with FakeTrelloServer(board, **server_options) as server, tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        scheduler = RequestScheduler(CLIENT_REQUESTS_PER_INTERVAL)
+
+        with Trello("key", "token", scheduler=scheduler, api_url=server.url,
+                    download_pool_size=args.host_concurrency if args.use_async else args.download_workers) as trello:
+            start_time = time.perf_counter()
+
+            # The exporter reports every card and download, keep that out of the results
+            with contextlib.redirect_stdout(io.StringIO()):
+                success = exporter.export_board(trello, BOARD_ID, args.download_workers, args.bulk,
+                                                use_async=args.use_async, concurrency=args.concurrency,
+                                                host_concurrency=args.host_concurrency)
+
+            seconds = time.perf_counter() - start_time
+
+        os.chdir(args.cwd)
+
+    return {"requests": server.requests, "bytes": server.bytes_sent, "seconds": seconds, "retries": scheduler.retries,
+            "errors": sum(count for status, count in server.status_counts.items() if status >= 400), "success": bool(success)}
+
+
+if __name__ == '__main__':
+    configuration_names = [name for name, _ in CONFIGURATIONS]
+
+    parser = argparse.ArgumentParser(description="Benchmark exporter.export_board against a local fake Trello server.")
+    parser.add_argument("--config", nargs="+", default=configuration_names, choices=configuration_names, help="Network conditions to run.")
+    parser.add_argument("--cards", type=int, default=200, metavar="N", help="Cards on the board.")
+    parser.add_argument("--lists", type=int, default=10, metavar="N", help="Lists on the board.")
+    parser.add_argument("--checklists", type=int, default=1, metavar="N", help="Checklists per card.")
+    parser.add_argument("--attachments", type=int, default=1, metavar="N", help="Attachments per card.")
+    parser.add_argument("--attachment-size", type=int, default=64 * 1024, metavar="BYTES", help="Size of every attachment.")
+    parser.add_argument("--download-workers", type=int, default=DEFAULT_DOWNLOAD_WORKERS, metavar="N", help="Parallel downloads.")
+    parser.add_argument("--bulk", action="store_true", help="Export with a single nested board request.")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Export with the asyncio client.")
+    parser.add_argument("--concurrency", type=int, default=64, metavar="N", help="With --async: requests in flight.")
+    parser.add_argument("--host-concurrency", type=int, default=16, metavar="N", help="With --async: requests in flight per host.")
+    parser.add_argument("--json", default=None, metavar="FILE", help="Write the results to a JSON file.")
+
+    args = parser.parse_args()
+    args.cwd = os.getcwd()
+
+    board = SyntheticBoard(BOARD_ID, args.lists, args.cards, checklists_per_card=args.checklists,
+                           attachments_per_card=args.attachments, attachment_size=args.attachment_size)
+    results = []
+
+    print(f"{'config':>12} {'time [s]':>9} {'requests':>9} {'req/s':>8} {'MB':>8} {'MB/s':>7} {'retries':>8} {'errors':>7} {'ok':>4}")
+
+    for name, server_options in CONFIGURATIONS:
+        if name not in args.config:
+            continue
+
+        result = run_configuration(board, server_options, args)
+        result["config"] = name
+        results.append(result)
+
+        megabytes = result["bytes"] / 1024 / 1024
+        print(f"{name:>12} {result['seconds']:>9.2f} {result['requests']:>9} {result['requests'] / result['seconds']:>8.1f} "
+              f"{megabytes:>8.1f} {megabytes / result['seconds']:>7.2f} {result['retries']:>8} {result['errors']:>7} "
+              f"{'yes' if result['success'] else 'no':>4}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,74 @@
+import time
+
+from src.create_obsidian_kanban_board import ObsidianKanban
+from src.util import insert_char
+
+# Compares the hashtag escaping of the markdown renderer with the previous
+# character-by-character implementation on texts full of "#tags". The previous
+# implementation is quadratic, so it only runs on the smaller inputs.
+#
+# Usage (from the repository root): python -m benchmarks.bench_hashtags
+
+TEXT_SIZES = [10_000, 100_000, 1_000_000]
+LEGACY_MAX_SIZE = 100_000
+
+
+def fix_hashtags_legacy(description: str) -> str:
+    """
+    The previous escaping: walk the text backwards and insert the invisible character before every hashtag.
+
+    Args:
+        description (str): The text to fix.
+
+    Returns:
+        str: The fixed text.
+    """
+    for i in range(len(description) - 1, -1, -1):
+        if description[i] == "#" and i + 1 < len(description) and description[i + 1] != " ":
+            description = insert_char("&#8203", description, i)
+            
+    return description
+
+
+def create_text(size: int) -> str:
+    """
+    Create a text of the given size consisting of hashtags, headings and plain words.
+
+    Args:
+        size (int): The length of the text.
+
+    Returns:
+        str: The text.
+    """
+    pattern = "#tag #x ## heading # word#\n"
+    return (pattern * (size // len(pattern) + 1))[:size]
+
+
+def measure(fix, text: str) -> float:
+    start_time = time.perf_counter()
+    fix(text)
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    kanban = ObsidianKanban()
+    
+    print(f"{'size':>10} {'regex [ms]':>11} {'batched [ms]':>13} {'legacy [ms]':>12}")
+    
+    for size in TEXT_SIZES:
+        text = create_text(size)
+        fixed = kanban._fix_hashtags_in_text(text)
+        regex_seconds = measure(kanban._fix_hashtags_in_text, text)
+        
+        # The same amount of text split into card sized fields
+        fields = [text[i:i + 200] for i in range(0, size, 200)]
+        batched_seconds = measure(kanban._fix_hashtags_in_texts, fields)
+        
+        if size <= LEGACY_MAX_SIZE:
+            legacy_seconds = measure(fix_hashtags_legacy, text)
+            assert fix_hashtags_legacy(text) == fixed, "escaped text differs from the previous implementation"
+            legacy = f"{legacy_seconds * 1000:>12.1f}"
+        else:
+            legacy = f"{'skipped':>12}"
+            
+        print(f"{size:>10} {regex_seconds * 1000:>11.1f} {batched_seconds * 1000:>13.1f} {legacy}")
@@ -0,0 +1,161 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.synthetic_board import write_synthetic_board
+from src.create_obsidian_kanban_board import ObsidianKanban
+
+# Times the loader (ObsidianKanban._load_board) and the renderer (ObsidianKanban._create_markdown_file)
+# on synthetic boards and reports the time and the peak memory of both.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_kanban --cards 1000 10000 100000
+#   python -m benchmarks.bench_kanban --json results.json
+#   python -m benchmarks.bench_kanban --baseline results.json   (exits with 1 on a regression)
+
+DEFAULT_BOARD_SIZES = [1000, 10000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(function: Callable[[], Any], repeat: int) -> Tuple[float, int]:
+    """
+    Measure the best time of several runs and the peak memory of a function.
+
+    The peak memory is measured in an extra run, because tracing the allocations slows the function down.
+
+    Args:
+        function (Callable[[], Any]): The function to measure.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        Tuple[float, int]: The best time in seconds and the peak memory in bytes.
+    """
+    seconds = float("inf")
+    
+    # The renderer reports every file it writes, keep that out of the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            gc.collect()
+            start_time = time.perf_counter()
+            function()
+            seconds = min(seconds, time.perf_counter() - start_time)
+        
+        gc.collect()
+        tracemalloc.start()
+        
+        try:
+            function()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+    return seconds, peak_memory
+
+
+def run_benchmarks(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """
+    Generate a synthetic board for every board size and measure the loader and the renderer on it.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        List[Dict[str, Any]]: One result per board size and phase.
+    """
+    results = []
+    
+    print(f"{'cards':>8} {'phase':>8} {'time [s]':>10} {'per card [us]':>14} {'peak [MB]':>10}")
+    
+    for cards in args.cards:
+        board_id = f"bench{cards}"
+        write_synthetic_board(board_id, args.lists, cards, args.labels, args.checklists, args.items,
+                              args.attachments, args.description_size, args.seed)
+        
+        kanban = ObsidianKanban()
+        board = kanban._load_board(board_id)
+        phases = [("load", lambda: kanban._load_board(board_id)),
+                  ("render", lambda: kanban._create_markdown_file(board))]
+        
+        for phase, function in phases:
+            seconds, peak_memory = measure(function, args.repeat)
+            results.append({"cards": cards, "phase": phase, "seconds": seconds, "peak_memory": peak_memory})
+            print(f"{cards:>8} {phase:>8} {seconds:>10.3f} {seconds / cards * 1e6:>14.1f} {peak_memory / 1024 / 1024:>10.1f}")
+            
+    return results
+
+
+def find_regressions(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """
+    Compare results with the results of an earlier run.
+
+    Args:
+        results (List[Dict[str, Any]]): The results of this run.
+        baseline (List[Dict[str, Any]]): The results of the earlier run.
+        tolerance (float): How much slower or bigger a result may be, e.g. 0.25 for 25%.
+
+    Returns:
+        List[str]: A description of every result that got worse by more than the tolerance.
+    """
+    baseline_results = {(result["cards"], result["phase"]): result for result in baseline}
+    regressions = []
+    
+    for result in results:
+        previous = baseline_results.get((result["cards"], result["phase"]))
+        
+        if not previous:
+            continue
+        
+        for metric in ["seconds", "peak_memory"]:
+            if result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{result['phase']} ({result['cards']} cards): {metric} {previous[metric]:.3g} -> {result[metric]:.3g}")
+                
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the board loader and the markdown renderer on synthetic boards.")
+    parser.add_argument("--cards", type=int, nargs="+", default=DEFAULT_BOARD_SIZES, metavar="N", help="Board sizes in cards.")
+    parser.add_argument("--lists", type=int, default=20, metavar="N", help="Lists per board.")
+    parser.add_argument("--labels", type=int, default=50, metavar="N", help="Labels per board.")
+    parser.add_argument("--checklists", type=int, default=1, metavar="N", help="Checklists per card.")
+    parser.add_argument("--items", type=int, default=5, metavar="N", help="Items per checklist.")
+    parser.add_argument("--attachments", type=int, default=1, metavar="N", help="Attachment records per card.")
+    parser.add_argument("--description-size", type=int, default=200, metavar="N", help="Characters per card description.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic boards.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, metavar="N", help="Timed runs per phase, the best one counts.")
+    parser.add_argument("--json", default=None, metavar="FILE", help="Write the results to a JSON file.")
+    parser.add_argument("--baseline", default=None, metavar="FILE", help="Compare with the JSON results of an earlier run.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown/growth against the baseline.")
+    
+    args = parser.parse_args()
+    output_file = os.path.abspath(args.json) if args.json else None
+    baseline = None
+    
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+    
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        results = run_benchmarks(args)
+        
+    if output_file:
+        with open(output_file, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+            
+    if baseline is not None:
+        regressions = find_regressions(results, baseline, args.tolerance)
+        
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+            
+        sys.exit(1 if regressions else 0)
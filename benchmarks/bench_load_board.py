@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+from benchmarks.bench_kanban import measure, DEFAULT_REPEAT
+from benchmarks.synthetic_board import write_synthetic_board
+from src.create_obsidian_kanban_board import ObsidianKanban
+
+# Measures how ObsidianKanban._load_board scales with the board size, with the load measurement
+# of benchmarks.bench_kanban. With the indexed loader the time per card stays roughly constant,
+# i.e. loading scales linearly.
+#
+# Usage (from the repository root): python -m benchmarks.bench_load_board
+
+BOARD_SIZES = [1250, 2500, 5000, 10000, 20000]
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+
+        print(f"{'cards':>8} {'lists':>6} {'labels':>7} {'load [s]':>10} {'per card [us]':>14} {'peak [MB]':>10}")
+
+        for cards in BOARD_SIZES:
+            board_id = f"bench{cards}"
+            write_synthetic_board(board_id, lists=80, cards=cards, labels=300,
+                                  checklists_per_card=1, attachments_per_card=1, description_size=200)
+
+            kanban = ObsidianKanban()
+            seconds, peak_memory = measure(lambda: kanban._load_board(board_id), DEFAULT_REPEAT)
+
+            print(f"{cards:>8} {80:>6} {300:>7} {seconds:>10.3f} {seconds / cards * 1e6:>14.1f} {peak_memory / 1024 / 1024:>10.1f}")
@@ -0,0 +1,80 @@
+import gc
+import os
+import tempfile
+import tracemalloc
+from typing import Dict
+
+from benchmarks.synthetic_board import write_synthetic_board
+import src.create_obsidian_kanban_board as create_obsidian_kanban_board
+import src.kanban_board as kanban_board
+
+# Measures the memory a loaded board keeps alive with the slotted kanban_board classes
+# and with the same classes without __slots__ (one __dict__ per object).
+#
+# Usage (from the repository root): python -m benchmarks.bench_memory
+
+BOARD_SIZES = [2000, 10000]
+MODEL_CLASSES = ["Board", "BoardList", "Card", "Checklist", "ChecklistItem", "Label"]
+
+
+def create_unslotted_classes() -> Dict[str, type]:
+    """
+    Create copies of the kanban_board classes without __slots__.
+
+    Returns:
+        Dict[str, type]: The classes by name.
+    """
+    return {name: type(name, (), {"__init__": getattr(kanban_board, name).__init__}) for name in MODEL_CLASSES}
+
+
+def measure_board(board_id: str) -> int:
+    """
+    Load a board and measure the memory it keeps alive.
+
+    Args:
+        board_id (str): The ID of the board.
+
+    Returns:
+        int: The bytes allocated by the loaded board.
+    """
+    gc.collect()
+    tracemalloc.start()
+    
+    try:
+        board = create_obsidian_kanban_board.ObsidianKanban()._load_board(board_id)
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        
+    del board
+    return size
+
+
+if __name__ == '__main__':
+    slotted_classes = {name: getattr(create_obsidian_kanban_board, name) for name in MODEL_CLASSES}
+    
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        
+        print(f"{'cards':>8} {'items':>9} {'dict [MB]':>10} {'slots [MB]':>11} {'saving':>7}")
+        
+        for cards in BOARD_SIZES:
+            board_id = f"bench{cards}"
+            write_synthetic_board(board_id, lists=20, cards=cards, labels=50, checklists_per_card=2,
+                                  items_per_checklist=10, attachments_per_card=1, description_size=100)
+            
+            # The loader creates the objects through the names imported into its module
+            for name, unslotted_class in create_unslotted_classes().items():
+                setattr(create_obsidian_kanban_board, name, unslotted_class)
+                
+            try:
+                dict_size = measure_board(board_id)
+            finally:
+                for name, slotted_class in slotted_classes.items():
+                    setattr(create_obsidian_kanban_board, name, slotted_class)
+                    
+            slots_size = measure_board(board_id)
+            
+            print(f"{cards:>8} {cards * 20:>9} {dict_size / 1024 / 1024:>10.1f} {slots_size / 1024 / 1024:>11.1f} "
+                  f"{1 - slots_size / dict_size:>7.0%}")
@@ -0,0 +1,333 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic_board import SyntheticBoard
+
+# A local stand-in for the Trello API that serves a synthetic board, so the exporter can be
+# benchmarked without a Trello account. Latency, bandwidth caps, rate limits, 429 and 5xx
+# responses can be injected.
+#
+# Usage:
+#   with FakeTrelloServer(SyntheticBoard("b" * 24, cards=1000), latency=0.05) as server:
+#       trello = Trello("key", "token", api_url=server.url)
+
+RATE_LIMIT_INTERVAL = 10.0
+RETRY_AFTER = "1"
+WRITE_CHUNK_SIZE = 16 * 1024
+
+
+class FakeTrelloServer:
+    def __init__(self, board: SyntheticBoard, latency: float = 0.0, bandwidth: Optional[int] = None,
+                 error_rate_429: float = 0.0, error_rate_5xx: float = 0.0, rate_limit: Optional[int] = None,
+                 seed: int = 0) -> None:
+        """
+        Set up a fake Trello API server for a synthetic board. Call start() or use it as a context manager.
+
+        Serves the endpoints used by src/trello.py: boards (also with nested content), lists, labels,
+        cards, actions, checklists, attachments, the batch endpoint and the attachment downloads.
+
+        Args:
+            board (SyntheticBoard): The board that is served.
+            latency (float): Seconds every response is delayed.
+            bandwidth (Optional[int]): Maximum bytes per second of every response body, None for no limit.
+            error_rate_429 (float): Share of the requests answered with "429 Too Many Requests" (0 to 1).
+            error_rate_5xx (float): Share of the requests answered with "503 Service Unavailable" (0 to 1).
+            rate_limit (Optional[int]): Requests allowed per 10 seconds like Trello's token limit, None for no limit.
+                        The x-rate-limit-api-token-* headers are sent and further requests get a 429.
+            seed (int): The seed for the injected errors.
+        """
+        self.board = board
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.rate_limit = rate_limit
+        self.url = ""
+        self.requests = 0
+        self.bytes_sent = 0
+        self.status_counts: Dict[int, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._attachments: Dict[str, Any] = {}
+        self._resources_by_id = {"cards": {card["id"]: card for card in board.cards_json},
+                                 "lists": {list_json["id"]: list_json for list_json in board.lists_json},
+                                 "checklists": board.checklists_json}
+
+
+    def __enter__(self) -> "FakeTrelloServer":
+        self.start()
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+    def start(self) -> str:
+        """
+        Start serving on a free local port on a background thread.
+
+        Returns:
+            str: The URL of the server, to be passed as api_url to Trello.
+        """
+        server = self
+
+        class Handler(_FakeTrelloHandler):
+            fake = server
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+        # Attachments are downloaded from this server instead of trello.com
+        for card_id, attachments in self.board.attachments_json.items():
+            for attachment in attachments:
+                attachment["url"] = f"{self.url}/download/{attachment['id']}/{attachment['fileName']}"
+                self._attachments[attachment["id"]] = attachment
+
+        threading.Thread(target=self._server.serve_forever, name="fake-trello", daemon=True).start()
+        return self.url
+
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+    def reset_stats(self) -> None:
+        """
+        Reset the request, byte and status counters.
+        """
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+            self.status_counts = {}
+
+
+    def check_request(self) -> Tuple[Optional[int], Dict[str, str]]:
+        """
+        Count a request and decide if it fails.
+
+        Returns:
+            Tuple[Optional[int], Dict[str, str]]: The status of the injected error, or None if the request
+                        is served, and the rate limit headers of the response.
+        """
+        with self._lock:
+            self.requests += 1
+            headers: Dict[str, str] = {}
+
+            if self.rate_limit:
+                now = time.monotonic()
+
+                if now - self._window_start >= RATE_LIMIT_INTERVAL:
+                    self._window_start = now
+                    self._window_requests = 0
+
+                self._window_requests += 1
+                remaining = max(0, self.rate_limit - self._window_requests)
+                headers["x-rate-limit-api-token-interval-ms"] = str(int(RATE_LIMIT_INTERVAL * 1000))
+                headers["x-rate-limit-api-token-max"] = str(self.rate_limit)
+                headers["x-rate-limit-api-token-remaining"] = str(remaining)
+
+                if self._window_requests > self.rate_limit:
+                    return 429, dict(headers, **{"Retry-After": RETRY_AFTER})
+
+            if self._random.random() < self.error_rate_429:
+                return 429, dict(headers, **{"Retry-After": RETRY_AFTER})
+
+            if self._random.random() < self.error_rate_5xx:
+                return 503, headers
+
+            return None, headers
+
+
+    def record_response(self, status: int, size: int) -> None:
+        """
+        Count a sent response.
+
+        Args:
+            status (int): The HTTP status of the response.
+            size (int): The size of the response body in bytes.
+        """
+        with self._lock:
+            self.bytes_sent += size
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+
+    def get_json(self, path: str, query: Dict[str, str]) -> Optional[Any]:
+        """
+        Get the JSON response of an API path.
+
+        Args:
+            path (str): The path of the request without the API version, e.g. "/boards/<id>/cards".
+            query (Dict[str, str]): The query parameters.
+
+        Returns:
+            Optional[Any]: The response, or None if the resource doesn't exist.
+        """
+        board = self.board
+        board_id = board.board_json["id"]
+
+        if path == "/members/me/boards":
+            return [board.board_json]
+
+        match = re.fullmatch(r"/boards/([^/]+)(/\w+)?", path)
+
+        if match:
+            if match.group(1) != board_id:
+                return None
+
+            resource = match.group(2)
+
+            if resource is None:
+                if "cards" not in query:
+                    return board.board_json
+
+                # Nested resources, see BOARD_CONTENT_QUERY
+                cards = board.cards_json
+
+                if query.get("card_attachments") == "true":
+                    cards = [dict(card, attachments=board.attachments_json[card["id"]]) for card in cards]
+
+                return dict(board.board_json, cards=cards, lists=board.lists_json, labels=board.labels_json,
+                            checklists=list(board.checklists_json.values()))
+
+            if resource == "/actions":
+                # A single action, so every export is followed by an empty incremental update
+                return [] if "since" in query or "before" in query else [{"id": "a" * 24, "date": "2024-01-01T00:00:00.000Z",
+                                                                         "type": "updateBoard", "data": {}}]
+
+            if resource == "/cards" and "limit" in query:
+                # Paginated like Trello: newest cards (highest IDs) first, "before" is the oldest card of the previous page
+                cards = sorted(board.cards_json, key=lambda card: card["id"], reverse=True)
+
+                if "before" in query:
+                    cards = [card for card in cards if card["id"] < query["before"]]
+
+                return cards[:int(query["limit"])]
+
+            return {"/cards": board.cards_json, "/lists": board.lists_json, "/labels": board.labels_json}.get(resource)
+
+        match = re.fullmatch(r"/(checklists|cards|lists)/([^/]+)(/attachments)?", path)
+
+        if match:
+            kind, resource_id, attachments = match.groups()
+
+            if kind == "cards" and attachments:
+                return board.attachments_json.get(resource_id)
+
+            return self._resources_by_id[kind].get(resource_id)
+
+        return None
+
+
+class _FakeTrelloHandler(BaseHTTPRequestHandler):
+    fake: FakeTrelloServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, without this every keep-alive response waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+    def do_GET(self) -> None:
+        fake = self.fake
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        error_status, headers = fake.check_request()
+
+        if error_status:
+            return self._send(error_status, b'{"message": "injected error"}', headers)
+
+        if url.path.startswith("/download/"):
+            return self._send_attachment(url.path, headers)
+
+        if url.path == "/1/batch":
+            results = []
+
+            for url_path in query.get("urls", "").split(","):
+                result = fake.get_json(url_path, {})
+                results.append({"200": result} if result is not None else {"name": "NotFound", "statusCode": 404})
+
+            return self._send_json(results, headers)
+
+        if url.path.startswith("/1/"):
+            result = fake.get_json(url.path[2:], query)
+
+            if result is not None:
+                return self._send_json(result, headers)
+
+        self._send(404, b'{"message": "not found"}', headers)
+
+
+    def _send_attachment(self, path: str, headers: Dict[str, str]) -> None:
+        attachment = self.fake._attachments.get(path.split("/")[2])
+
+        if attachment is None:
+            return self._send(404, b"", headers)
+
+        etag = f'"{attachment["id"]}"'
+        headers = dict(headers, ETag=etag)
+
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", headers)
+
+        self._send(200, _create_content(attachment["id"], attachment["bytes"]), dict(headers, **{"Content-Type": attachment["mimeType"]}))
+
+
+    def _send_json(self, result: Any, headers: Dict[str, str]) -> None:
+        self._send(200, json.dumps(result).encode("utf-8"), dict(headers, **{"Content-Type": "application/json"}))
+
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        for start in range(0, len(body), WRITE_CHUNK_SIZE):
+            chunk = body[start:start + WRITE_CHUNK_SIZE]
+            self.wfile.write(chunk)
+
+            if self.fake.bandwidth:
+                time.sleep(len(chunk) / self.fake.bandwidth)
+
+        self.fake.record_response(status, len(body))
+
+
+def _create_content(attachment_id: str, size: int) -> bytes:
+    """
+    Create the content of an attachment, the same for every download.
+
+    Args:
+        attachment_id (str): The ID of the attachment.
+        size (int): The size in bytes.
+
+    Returns:
+        bytes: The content.
+    """
+    pattern = attachment_id.encode("ascii")
+    return (pattern * (size // len(pattern) + 1))[:size]
@@ -0,0 +1,163 @@
+import argparse
+import random
+from typing import Any, Dict, List
+
+import src.file_system as file_system
+import src.file_structure as file_structure
+
+# Generates synthetic board exports in the same file structure the exporter writes,
+# so the loader and renderer can be measured without a Trello account.
+#
+# Usage (from the repository root, writes to boards/<board_id>/):
+#   python -m benchmarks.synthetic_board synthetic --cards 100000 --lists 50
+
+LABEL_COLORS = ["green", "yellow", "orange", "red", "purple", "blue", "sky", "lime", "pink", "black",
+                "green_dark", "blue_light", "red_dark", "sky_light"]
+
+
+def create_id(rng: random.Random) -> str:
+    """
+    Create a random ID that looks like a Trello ID (24 hex digits).
+
+    Args:
+        rng (random.Random): The random generator.
+
+    Returns:
+        str: The ID.
+    """
+    return f"{rng.getrandbits(96):024x}"
+
+
+class SyntheticBoard:
+    def __init__(self, board_id: str, lists: int = 10, cards: int = 1000, labels: int = 20,
+                 checklists_per_card: int = 1, items_per_checklist: int = 5, attachments_per_card: int = 1,
+                 description_size: int = 200, seed: int = 0, attachment_size: int = 1024) -> None:
+        """
+        Generate the data of a synthetic board in the shape the Trello API returns it.
+
+        Args:
+            board_id (str): The ID of the board.
+            lists (int): The number of lists.
+            cards (int): The number of cards, spread evenly over the lists.
+            labels (int): The number of labels. Every card gets up to three of them.
+            checklists_per_card (int): The number of checklists on every card.
+            items_per_checklist (int): The number of items in every checklist.
+            attachments_per_card (int): The number of attachment records on every card.
+            description_size (int): The length of every card description in characters.
+            seed (int): The seed of the random generator, the same seed generates the same board.
+            attachment_size (int): The size in bytes of every attachment.
+        """
+        rng = random.Random(seed)
+        
+        self.board_json = {"id": board_id, "name": f"Synthetic {board_id}", "closed": False}
+        self.lists_json = [{"id": create_id(rng), "name": f"List {i}", "closed": False, "pos": i} for i in range(lists)]
+        self.labels_json = [{"id": create_id(rng), "name": f"Label {i}" if i % 5 else "", "color": LABEL_COLORS[i % len(LABEL_COLORS)]}
+                            for i in range(labels)]
+        self.cards_json: List[Any] = []
+        self.checklists_json: Dict[str, Any] = {}
+        self.attachments_json: Dict[str, Any] = {}
+        
+        for i in range(cards):
+            card_id = create_id(rng)
+            checklist_ids = [create_id(rng) for _ in range(checklists_per_card)]
+            attachments_json = [{"id": create_id(rng), "fileName": f"file_{i}_{j}.png", "bytes": attachment_size,
+                                 "mimeType": "image/png", "url": f"https://trello.com/1/cards/{card_id}/attachments/{j}/download/file.png"}
+                                for j in range(attachments_per_card)]
+            
+            self.cards_json.append({
+                "id": card_id,
+                "name": f"Card {i} #{i % 7}",
+                "desc": _create_description(rng, description_size),
+                "idList": self.lists_json[i % lists]["id"],
+                "idBoard": board_id,
+                "pos": i,
+                "closed": False,
+                "idLabels": [label["id"] for label in rng.sample(self.labels_json, min(len(self.labels_json), rng.randint(0, 3)))],
+                "idChecklists": checklist_ids,
+                "idAttachmentCover": attachments_json[-1]["id"] if attachments_json else None,
+                "badges": {"attachments": len(attachments_json), "comments": 0, "checkItems": checklists_per_card * items_per_checklist}
+            })
+            
+            for checklist_id in checklist_ids:
+                self.checklists_json[checklist_id] = {
+                    "id": checklist_id,
+                    "idCard": card_id,
+                    "name": f"Checklist #{checklist_id[:4]}",
+                    "checkItems": [{"id": create_id(rng), "name": f"Item {k} #todo", "state": "complete" if k % 2 else "incomplete"}
+                                   for k in range(items_per_checklist)]
+                }
+                
+            self.attachments_json[card_id] = attachments_json
+
+
+def write_synthetic_board(board_id: str, lists: int = 10, cards: int = 1000, labels: int = 20,
+                          checklists_per_card: int = 1, items_per_checklist: int = 5, attachments_per_card: int = 1,
+                          description_size: int = 200, seed: int = 0) -> None:
+    """
+    Write a synthetic board export to boards/<board_id>/ in the current directory.
+    The arguments are the same as for SyntheticBoard, no attachment files are written.
+    """
+    board = SyntheticBoard(board_id, lists, cards, labels, checklists_per_card, items_per_checklist,
+                           attachments_per_card, description_size, seed)
+    
+    file_system.delete_folder(file_structure.get_board_folder(board_id))
+    
+    for folder in [file_structure.get_board_folder(board_id),
+                   file_structure.get_attachment_folder(board_id),
+                   file_structure.get_checklists_folder(board_id)]:
+        file_system.create_folder(folder)
+    
+    for card in board.cards_json:
+        if card["idChecklists"]:
+            file_system.write_file_json(file_structure.get_checklists_for_card_json_file(board_id, card["id"]), card["idChecklists"])
+        
+        for checklist_id in card["idChecklists"]:
+            file_system.write_file_json(file_structure.get_checklist_json_file(board_id, checklist_id), board.checklists_json[checklist_id])
+            
+        if board.attachments_json[card["id"]]:
+            file_system.write_file_json(file_structure.get_attachments_for_card_json_file(board_id, card["id"]),
+                                        board.attachments_json[card["id"]])
+    
+    file_system.write_file_json(file_structure.get_board_json_file(board_id), board.board_json)
+    file_system.write_file_json(file_structure.get_lists_json_file(board_id), board.lists_json)
+    file_system.write_file_json(file_structure.get_labels_json_file(board_id), board.labels_json)
+    file_system.write_file_json(file_structure.get_cards_json_file(board_id), board.cards_json)
+
+
+def _create_description(rng: random.Random, size: int) -> str:
+    """
+    Create a description with words, line breaks and hashtags.
+
+    Args:
+        rng (random.Random): The random generator.
+        size (int): The length of the description in characters.
+
+    Returns:
+        str: The description.
+    """
+    words: List[str] = []
+    length = 0
+    
+    while length < size:
+        word = rng.choice(["lorem", "ipsum", "#tag", "dolor", "# heading", "\n", "sit", "amet", "#1"])
+        words.append(word)
+        length += len(word) + 1
+        
+    return " ".join(words)[:size]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write a synthetic board export to boards/<board_id>/.")
+    parser.add_argument("board_id", help="The ID of the synthetic board.")
+    parser.add_argument("--lists", type=int, default=10, metavar="N", help="Lists on the board.")
+    parser.add_argument("--cards", type=int, default=1000, metavar="N", help="Cards on the board.")
+    parser.add_argument("--labels", type=int, default=20, metavar="N", help="Labels on the board.")
+    parser.add_argument("--checklists", type=int, default=1, metavar="N", help="Checklists per card.")
+    parser.add_argument("--items", type=int, default=5, metavar="N", help="Items per checklist.")
+    parser.add_argument("--attachments", type=int, default=1, metavar="N", help="Attachment records per card.")
+    parser.add_argument("--description-size", type=int, default=200, metavar="N", help="Characters per card description.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator.")
+    
+    args = parser.parse_args()
+    write_synthetic_board(args.board_id, args.lists, args.cards, args.labels, args.checklists, args.items,
+                          args.attachments, args.description_size, args.seed)
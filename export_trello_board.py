@@ -1,10 +1,19 @@
 import argparse
 import sys
+from typing import Any, Optional
 
 import src.exporter as exporter
+from src.exporter import DEFAULT_BOARD_WORKERS
+from src.downloader import DEFAULT_DOWNLOAD_WORKERS
+from src.attachment_cache import AttachmentCache, LINK_HARDLINK, LINK_MODES
+from src.async_trello import DEFAULT_CONCURRENCY, DEFAULT_HOST_CONCURRENCY
 import src.util as util
 from src.create_obsidian_kanban_board import ObsidianKanban
-from src.trello import Trello
+from src.trello import Trello, RequestFailedError, DEFAULT_API_POOL_SIZE
+from src.metrics import Metrics
+from src.card_store import STORE_FILES, STORE_TYPES
+from src.archive import BoardArchive
+from src.render_pipeline import RenderPipeline
 
 # Export structure
 # ├── Boards
@@ -25,6 +34,41 @@ STRING_TOOL_DESCRIPTION = "A tool for exporting Trello boards and creating Obsid
 STRING_HELP_TRELLO_API_KEY = "Trello API-Key"
 STRING_HELP_TRELLO_API_TOKEN = "Trello API-Token"
 STRING_HELP_TRELLO_BOARD_ID = "Optional: Trello Board ID (or URL) for the board you want to export. Omit to get a list of all boards."
+STRING_HELP_DOWNLOAD_WORKERS = f"Number of attachments downloaded in parallel (default: {DEFAULT_DOWNLOAD_WORKERS})."
+STRING_HELP_BULK = "Fetch the whole board with a single nested request instead of one request per checklist and card."
+STRING_HELP_INCREMENTAL = "Only fetch the cards that changed since the last export of the board."
+STRING_HELP_RESUME = "Continue an interrupted export of the board instead of starting over."
+STRING_HELP_ASYNC = "Fetch checklists, attachment data and attachments with concurrent asyncio tasks (requires aiohttp)."
+STRING_HELP_CONCURRENCY = f"With --async: maximum number of requests in flight (default: {DEFAULT_CONCURRENCY})."
+STRING_HELP_HOST_CONCURRENCY = f"With --async: maximum number of requests in flight per host (default: {DEFAULT_HOST_CONCURRENCY})."
+STRING_HELP_ALL = "Export all boards of the account instead of a single board."
+STRING_HELP_BOARDS = "Export the given comma separated board IDs instead of a single board."
+STRING_HELP_BOARD_WORKERS = f"With --all or --boards: number of boards exported in parallel (default: {DEFAULT_BOARD_WORKERS})."
+STRING_HELP_METRICS = "Write timing and request metrics (phases, latency percentiles per endpoint, bytes, retries, peak memory) to a JSON file."
+STRING_HELP_METRICS_SUMMARY = "Print a summary of the timing and request metrics at the end."
+STRING_HELP_STORE = f"How the checklists and attachment data of the cards are stored: one JSON file each or a single JSON Lines file (default: {STORE_FILES})."
+STRING_HELP_ARCHIVE = "Load every exported board into a SQLite archive and create the Obsidian Kanban board from it."
+STRING_HELP_PIPELINE = "Create the Obsidian Kanban board while the board is exported, it is ready before the attachment downloads finish."
+STRING_HELP_RENDER_CACHE = "Reuse the markdown of the cards that didn't change since the last time the Obsidian Kanban board was created."
+STRING_HELP_ATTACHMENT_CACHE = "Keep downloaded attachments in a cache of up to SIZE_MB megabytes and skip downloads of unchanged attachments."
+STRING_HELP_ATTACHMENT_LINKS = f"With --attachment-cache: how the attachments of the boards refer to the cached files (default: {LINK_HARDLINK})."
+
+
+def _get_boards(trello: Trello) -> Optional[Any]:
+    """
+    Get all boards of the account.
+
+    Args:
+        trello (Trello): The Trello instance.
+
+    Returns:
+        Optional[Any]: The boards, or None if the request failed.
+    """
+    try:
+        return trello.get_boards()
+    except RequestFailedError as e:
+        print(f"ERROR: {e}")
+        return None
 
 
 if __name__ == '__main__':
@@ -32,37 +76,131 @@ if __name__ == '__main__':
     parser.add_argument("api_key", help=STRING_HELP_TRELLO_API_KEY)
     parser.add_argument("api_token", help=STRING_HELP_TRELLO_API_TOKEN)
     parser.add_argument("board_id", nargs='?', default=None, help=STRING_HELP_TRELLO_BOARD_ID)
+    parser.add_argument("--download-workers", type=int, default=DEFAULT_DOWNLOAD_WORKERS, metavar="N", help=STRING_HELP_DOWNLOAD_WORKERS)
+    parser.add_argument("--bulk", action="store_true", help=STRING_HELP_BULK)
+    parser.add_argument("--incremental", action="store_true", help=STRING_HELP_INCREMENTAL)
+    parser.add_argument("--resume", action="store_true", help=STRING_HELP_RESUME)
+    parser.add_argument("--async", dest="use_async", action="store_true", help=STRING_HELP_ASYNC)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, metavar="N", help=STRING_HELP_CONCURRENCY)
+    parser.add_argument("--host-concurrency", type=int, default=DEFAULT_HOST_CONCURRENCY, metavar="N", help=STRING_HELP_HOST_CONCURRENCY)
+    parser.add_argument("--store", default=STORE_FILES, choices=STORE_TYPES, help=STRING_HELP_STORE)
+    parser.add_argument("--attachment-cache", type=int, default=None, metavar="SIZE_MB", help=STRING_HELP_ATTACHMENT_CACHE)
+    parser.add_argument("--attachment-links", default=LINK_HARDLINK, choices=LINK_MODES, help=STRING_HELP_ATTACHMENT_LINKS)
+    boards_group = parser.add_mutually_exclusive_group()
+    boards_group.add_argument("--all", dest="all_boards", action="store_true", help=STRING_HELP_ALL)
+    boards_group.add_argument("--boards", default=None, metavar="ID,ID,...", help=STRING_HELP_BOARDS)
+    parser.add_argument("--board-workers", type=int, default=DEFAULT_BOARD_WORKERS, metavar="N", help=STRING_HELP_BOARD_WORKERS)
+    parser.add_argument("--metrics", default=None, metavar="FILE", help=STRING_HELP_METRICS)
+    parser.add_argument("--metrics-summary", action="store_true", help=STRING_HELP_METRICS_SUMMARY)
+    parser.add_argument("--archive", default=None, metavar="FILE", help=STRING_HELP_ARCHIVE)
+    parser.add_argument("--pipeline", action="store_true", help=STRING_HELP_PIPELINE)
+    parser.add_argument("--render-cache", action="store_true", help=STRING_HELP_RENDER_CACHE)
 
     args = parser.parse_args()
+    
+    multi_board = args.all_boards or args.boards
+    board_workers = max(1, args.board_workers) if multi_board else 1
+    
+    if multi_board and args.board_id:
+        parser.error("board_id can't be combined with --all or --boards")
         
-    trello = Trello(args.api_key, args.api_token)
-
-    # Check if board_id is a url
-    if util.is_url(args.board_id):
-        print("Getting board_id from trello.com...")
-        args.board_id = trello.get_board_id_from_url(args.board_id)
+    if args.pipeline and args.archive:
+        parser.error("--pipeline can't be combined with --archive, the board is created from the archive")
+    
+    attachment_cache = AttachmentCache(args.attachment_cache * 1024 * 1024, args.attachment_links) if args.attachment_cache else None
+    download_pool_size = args.host_concurrency if args.use_async else args.download_workers
+    # Boards exported in parallel share the connection pools, Trello adds the downloads to the API pool
+    api_pool_size = max(DEFAULT_API_POOL_SIZE, board_workers * (args.concurrency if args.use_async else 1))
+        
+    metrics = Metrics()
+    archive = BoardArchive(args.archive) if args.archive else None
+    success = True
+    
+    def create_kanban_board(board_id: str) -> None:
+        if archive:
+            with metrics.phase("archive"):
+                archive.import_board(board_id)
+            
+        ObsidianKanban(metrics, archive, args.render_cache).export(board_id)
+    
+    def create_pipeline(board_id: str) -> RenderPipeline:
+        return RenderPipeline(ObsidianKanban(metrics, use_render_cache=args.render_cache), board_id)
         
-        if not args.board_id:
-            print("ERROR: Couldn't get the board_id from the given URL!")
-            sys.exit(1)
+    with Trello(args.api_key, args.api_token, api_pool_size=api_pool_size, download_pool_size=download_pool_size * board_workers,
+                attachment_cache=attachment_cache, metrics=metrics) as trello:
+        if multi_board:
+            if args.all_boards:
+                boards = _get_boards(trello)
+                
+                if boards is None:
+                    print("ERROR: Couldn't get the boards!")
+                    sys.exit(1)
+                    
+                board_ids = [board["id"] for board in boards]
+            else:
+                board_ids = [board_id.strip() for board_id in args.boards.split(",") if board_id.strip()]
+            
+            results = exporter.export_boards(trello, board_ids, board_workers, args.download_workers, args.bulk, args.incremental,
+                                             args.use_async, args.concurrency, args.host_concurrency, args.resume,
+                                             args.store, on_board_exported=create_kanban_board,
+                                             create_pipeline=create_pipeline if args.pipeline else None)
+            success = all(results.values())
         else:
-            print(f"Board ID: {args.board_id}")
+            # Check if board_id is a url
+            if util.is_url(args.board_id):
+                print("Getting board_id from trello.com...")
+                try:
+                    args.board_id = trello.get_board_id_from_url(args.board_id)
+                except RequestFailedError as e:
+                    print(f"ERROR: {e}")
+                    args.board_id = None
+        
+                if not args.board_id:
+                    print("ERROR: Couldn't get the board_id from the given URL!")
+                    sys.exit(1)
+                else:
+                    print(f"Board ID: {args.board_id}")
             
-    if args.board_id:                
-        exporter.export_board(trello, args.board_id)      
+            if args.board_id:                
+                pipeline = create_pipeline(args.board_id) if args.pipeline else None
+                result = exporter.export_board(trello, args.board_id, args.download_workers, args.bulk, args.incremental,
+                                               args.use_async, args.concurrency, args.host_concurrency, args.resume, args.store,
+                                               pipeline)
+                success = bool(result)
 
-        kanban = ObsidianKanban()
-        kanban.export(args.board_id)
-    else:              
-        boards = trello.get_boards()        
+                # Failed downloads are only links in the markdown, but a partial export isn't rendered.
+                # Incremental and async exports don't feed the pipeline.
+                if result.complete and not (pipeline and pipeline.done):
+                    create_kanban_board(args.board_id)
+            else:              
+                boards = _get_boards(trello)
+                
+                if boards is None:
+                    print("ERROR: Couldn't get the boards!")
+                    sys.exit(1)
         
-        if boards:
-            print(f"Listing Boards ({len(boards)}):")
+                if boards:
+                    print(f"Listing Boards ({len(boards)}):")
             
-            for i, board in enumerate(boards, start=1):
-                index = f"[{i}]".rjust(4) # Right-align the current index for consistent formatting.
-                name = board["name"][:40].ljust(40) # Ensure a fixed width for the board name (max 40 characters) and left-align it for readability.
-                board_id = board["id"]
-                print(f"{index} Name: {name} Board ID: {board_id}")
-        else:
-            print("No boards found!")
\ No newline at end of file
+                    for i, board in enumerate(boards, start=1):
+                        index = f"[{i}]".rjust(4) # Right-align the current index for consistent formatting.
+                        name = board["name"][:40].ljust(40) # Ensure a fixed width for the board name (max 40 characters) and left-align it for readability.
+                        board_id = board["id"]
+                        print(f"{index} Name: {name} Board ID: {board_id}")
+                else:
+                    print("No boards found!")
+    
+    if archive:
+        archive.close()
+    
+    if args.metrics or args.metrics_summary:
+        metrics.count("retries", trello.scheduler.retries)
+        
+        if args.metrics:
+            metrics.save(args.metrics)
+            
+        if args.metrics_summary:
+            metrics.print_summary()
+            
+    if not success:
+        sys.exit(1)
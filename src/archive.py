@@ -0,0 +1,436 @@
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+import src.file_system as file_system
+import src.file_structure as file_structure
+from src.card_store import open_card_store
+
+
+# Version of the archive schema, an archive with another version is rebuilt on open
+SCHEMA_VERSION = 1
+
+# Every table has a board_id, so a board is replaced with one DELETE per table. Rows are inserted
+# with OR REPLACE, a card moved to another board belongs to the board imported last.
+# "position" is the index in the exported JSON arrays, so a board is read back in its export order.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lists (
+    id TEXT PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS labels (
+    id TEXT PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    color TEXT,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    list_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    desc TEXT NOT NULL,
+    pos REAL,
+    position INTEGER NOT NULL,
+    attachment_cover_id TEXT,
+    attachment_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS card_labels (
+    card_id TEXT NOT NULL,
+    board_id TEXT NOT NULL,
+    label_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (card_id, position)
+);
+CREATE TABLE IF NOT EXISTS checklists (
+    id TEXT NOT NULL,
+    board_id TEXT NOT NULL,
+    card_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (card_id, position)
+);
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT NOT NULL,
+    board_id TEXT NOT NULL,
+    checklist_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    state TEXT,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (checklist_id, position)
+);
+CREATE TABLE IF NOT EXISTS attachments (
+    id TEXT NOT NULL,
+    board_id TEXT NOT NULL,
+    card_id TEXT NOT NULL,
+    name TEXT,
+    file_name TEXT NOT NULL,
+    mime_type TEXT,
+    bytes INTEGER,
+    url TEXT,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (card_id, position)
+);
+CREATE INDEX IF NOT EXISTS lists_by_board ON lists (board_id, position);
+CREATE INDEX IF NOT EXISTS labels_by_board ON labels (board_id, position);
+CREATE INDEX IF NOT EXISTS labels_by_name ON labels (name);
+CREATE INDEX IF NOT EXISTS cards_by_board ON cards (board_id, position);
+CREATE INDEX IF NOT EXISTS cards_by_list ON cards (list_id);
+CREATE INDEX IF NOT EXISTS card_labels_by_label ON card_labels (label_id);
+CREATE INDEX IF NOT EXISTS card_labels_by_board ON card_labels (board_id);
+CREATE INDEX IF NOT EXISTS checklists_by_board ON checklists (board_id);
+CREATE INDEX IF NOT EXISTS items_by_board ON items (board_id);
+CREATE INDEX IF NOT EXISTS attachments_by_board ON attachments (board_id);
+CREATE INDEX IF NOT EXISTS attachments_by_file_name ON attachments (file_name);
+"""
+
+TABLES = ["boards", "lists", "labels", "cards", "card_labels", "checklists", "items", "attachments"]
+
+
+class BoardArchive:
+    def __init__(self, file_path: str) -> None:
+        """
+        Open (or create) a SQLite archive of exported boards.
+
+        Boards are imported from their export folder after export_board, see import_board.
+        The archive can be queried across all boards with indexed lookups, and ObsidianKanban
+        renders straight from it: it offers the board, lists, labels and cards in the shape of
+        the exported JSON files and the read_checklists/read_attachments methods of a card store.
+
+        Args:
+            file_path (str): The path of the SQLite database file.
+        """
+        self.file_path = file_path
+        # Boards exported in parallel are imported from several threads, the lock serializes them
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+
+    def __enter__(self) -> "BoardArchive":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        with self._lock:
+            self.connection.close()
+
+
+    def import_board(self, board_id: str) -> None:
+        """
+        Replace the data of a board in the archive with its exported files, in a single transaction.
+
+        Args:
+            board_id (str): The ID of the exported Trello board.
+        """
+        board_json = file_system.read_file_json(file_structure.get_board_json_file(board_id))
+        lists_json = file_system.read_file_json(file_structure.get_lists_json_file(board_id))
+        labels_json = file_system.read_file_json(file_structure.get_labels_json_file(board_id))
+
+        with self._lock, self.connection, open_card_store(board_id, read_only=True) as card_store:
+            for table in TABLES:
+                self.connection.execute(f"DELETE FROM {table} WHERE {'id' if table == 'boards' else 'board_id'} = ?", (board_id,))
+
+            self.connection.execute("INSERT OR REPLACE INTO boards (id, name) VALUES (?, ?)", (board_id, board_json["name"]))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO lists (id, board_id, name, position) VALUES (?, ?, ?, ?)",
+                [(list["id"], board_id, list["name"], position) for position, list in enumerate(lists_json)])
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO labels (id, board_id, name, color, position) VALUES (?, ?, ?, ?, ?)",
+                [(label["id"], board_id, label["name"], label["color"], position) for position, label in enumerate(labels_json)])
+
+            # Cards are streamed, so a board never has to fit into memory as a whole
+            cards = file_system.read_file_json_array(file_structure.get_cards_json_file(board_id))
+
+            for position, card in enumerate(cards):
+                self._insert_card(board_id, card, position, card_store)
+
+
+    def get_board(self, board_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a board in the shape of board.json.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+
+        Returns:
+            Optional[Dict[str, Any]]: The board, or None if it is not in the archive.
+        """
+        row = self._query_one("SELECT id, name FROM boards WHERE id = ?", (board_id,))
+        return dict(row) if row else None
+
+
+    def get_lists(self, board_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the lists of a board in the shape of lists.json.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+
+        Returns:
+            List[Dict[str, Any]]: The lists in board order.
+        """
+        return [dict(row) for row in self._query(
+            "SELECT id, name FROM lists WHERE board_id = ? ORDER BY position", (board_id,))]
+
+
+    def get_labels(self, board_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the labels of a board in the shape of labels.json.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+
+        Returns:
+            List[Dict[str, Any]]: The labels in board order.
+        """
+        return [dict(row) for row in self._query(
+            "SELECT id, name, color FROM labels WHERE board_id = ? ORDER BY position", (board_id,))]
+
+
+    def get_cards(self, board_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Get the cards of a board in the shape of cards.json, with the fields the loader uses.
+
+        The cards also carry their checklists and attachments data, so loading a board takes
+        a fixed number of queries instead of several per card.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+
+        Yields:
+            Dict[str, Any]: The cards in board order.
+        """
+        label_ids: Dict[str, List[str]] = {}
+
+        for row in self._query("SELECT card_id, label_id FROM card_labels WHERE board_id = ? ORDER BY card_id, position", (board_id,)):
+            label_ids.setdefault(row["card_id"], []).append(row["label_id"])
+
+        checklists = self._get_checklists("board_id", board_id)
+        attachments = self._get_attachments("board_id", board_id)
+        rows = self._query("SELECT id, list_id, name, desc, pos, attachment_cover_id, attachment_count "
+                           "FROM cards WHERE board_id = ? ORDER BY position", (board_id,))
+
+        for row in rows:
+            card_checklists = checklists.get(row["id"], [])
+
+            yield {
+                "id": row["id"],
+                "name": row["name"],
+                "desc": row["desc"],
+                "idList": row["list_id"],
+                "pos": row["pos"],
+                "idLabels": label_ids.get(row["id"], []),
+                "idChecklists": [checklist["id"] for checklist in card_checklists],
+                "idAttachmentCover": row["attachment_cover_id"],
+                "badges": {"attachments": row["attachment_count"]},
+                "checklists": card_checklists,
+                "attachments": attachments.get(row["id"], [])
+            }
+
+
+    def read_checklists(self, card: Any) -> List[Any]:
+        """
+        Read the checklists of a card in the shape of the checklist files.
+
+        Args:
+            card (Any): The card data.
+
+        Returns:
+            List[Any]: The checklists in card order, each with its checkItems.
+        """
+        if "checklists" in card:
+            return card["checklists"]
+
+        return self._get_checklists("card_id", card["id"]).get(card["id"], [])
+
+
+    def read_attachments(self, card: Any) -> Any:
+        """
+        Read the attachments data of a card in the shape of the attachments files.
+
+        Args:
+            card (Any): The card data.
+
+        Returns:
+            Any: The attachments data of the card in card order.
+        """
+        if "attachments" in card:
+            return card["attachments"]
+
+        return self._get_attachments("card_id", card["id"]).get(card["id"], [])
+
+
+    def get_cards_with_label(self, label_name: str) -> List[Dict[str, Any]]:
+        """
+        Find the cards of all boards that have a label with the given name.
+
+        Args:
+            label_name (str): The name of the label as shown on Trello.
+
+        Returns:
+            List[Dict[str, Any]]: The board, list and card ID and name of every card.
+        """
+        return [dict(row) for row in self._query(
+            "SELECT boards.id AS board_id, boards.name AS board_name, lists.id AS list_id, lists.name AS list_name, "
+            "cards.id AS card_id, cards.name AS card_name "
+            "FROM labels "
+            "JOIN card_labels ON card_labels.label_id = labels.id "
+            "JOIN cards ON cards.id = card_labels.card_id "
+            "JOIN lists ON lists.id = cards.list_id "
+            "JOIN boards ON boards.id = cards.board_id "
+            "WHERE labels.name = ? ORDER BY boards.name, lists.position, cards.position", (label_name,))]
+
+
+    def _insert_card(self, board_id: str, card: Any, position: int, card_store: Any) -> None:
+        """
+        Insert a card with its labels, checklists, checklist items and attachments data.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+            card (Any): The card data from cards.json.
+            position (int): The index of the card in cards.json.
+            card_store (Any): The store of the exported checklists and attachments data.
+        """
+        execute = self.connection.execute
+        execute("INSERT OR REPLACE INTO cards (id, board_id, list_id, name, desc, pos, position, attachment_cover_id, attachment_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (card["id"], board_id, card["idList"], card["name"], card["desc"], card["pos"], position,
+                 card.get("idAttachmentCover"), card["badges"]["attachments"]))
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO card_labels (card_id, board_id, label_id, position) VALUES (?, ?, ?, ?)",
+            [(card["id"], board_id, label_id, label_position) for label_position, label_id in enumerate(card["idLabels"])])
+
+        checklists = zip(card["idChecklists"], card_store.read_checklists(card))
+
+        for checklist_position, (checklist_id, checklist) in enumerate(checklists):
+            # Checklists deleted while the board was exported are exported as null
+            if not checklist:
+                continue
+
+            execute("INSERT OR REPLACE INTO checklists (id, board_id, card_id, name, position) VALUES (?, ?, ?, ?, ?)",
+                    (checklist_id, board_id, card["id"], checklist["name"], checklist_position))
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO items (id, board_id, checklist_id, name, state, position) VALUES (?, ?, ?, ?, ?, ?)",
+                [(item.get("id"), board_id, checklist_id, item["name"], item.get("state"), item_position)
+                 for item_position, item in enumerate(checklist["checkItems"])])
+
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO attachments (id, board_id, card_id, name, file_name, mime_type, bytes, url, position) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(attachment["id"], board_id, card["id"], attachment.get("name"), attachment["fileName"],
+              attachment.get("mimeType"), attachment.get("bytes"), attachment.get("url"), attachment_position)
+             for attachment_position, attachment in enumerate(card_store.read_attachments(card))])
+
+
+    def _get_checklists(self, column: str, value: str) -> Dict[str, List[Any]]:
+        """
+        Get the checklists with their items of a board or a card.
+
+        Args:
+            column (str): "board_id" or "card_id".
+            value (str): The ID of the board or card.
+
+        Returns:
+            Dict[str, List[Any]]: The checklists in card order by card ID.
+        """
+        rows = self._query(
+            "SELECT checklists.card_id, checklists.id AS checklist_id, checklists.name AS checklist_name, items.name, items.state "
+            "FROM checklists LEFT JOIN items ON items.checklist_id = checklists.id "
+            f"WHERE checklists.{column} = ? ORDER BY checklists.card_id, checklists.position, items.position", (value,))
+        checklists: Dict[str, List[Any]] = {}
+        checklist = None
+
+        for row in rows:
+            if checklist is None or checklist["id"] != row["checklist_id"]:
+                checklist = {"id": row["checklist_id"], "name": row["checklist_name"], "checkItems": []}
+                checklists.setdefault(row["card_id"], []).append(checklist)
+
+            # A checklist without items has a single row without item
+            if row["name"] is not None:
+                checklist["checkItems"].append({"name": row["name"], "state": row["state"]})
+
+        return checklists
+
+
+    def _get_attachments(self, column: str, value: str) -> Dict[str, List[Any]]:
+        """
+        Get the attachments data of a board or a card.
+
+        Args:
+            column (str): "board_id" or "card_id".
+            value (str): The ID of the board or card.
+
+        Returns:
+            Dict[str, List[Any]]: The attachments data in card order by card ID.
+        """
+        attachments: Dict[str, List[Any]] = {}
+
+        for row in self._query(f"SELECT * FROM attachments WHERE {column} = ? ORDER BY card_id, position", (value,)):
+            attachments.setdefault(row["card_id"], []).append({
+                "id": row["id"], "name": row["name"], "fileName": row["file_name"], "mimeType": row["mime_type"],
+                "bytes": row["bytes"], "url": row["url"]
+            })
+
+        return attachments
+
+
+    def _create_schema(self) -> None:
+        """
+        Create the tables and indexes, or rebuild them if the archive has another schema version.
+        """
+        with self._lock, self.connection:
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+
+            if version not in (0, SCHEMA_VERSION):
+                for table in TABLES:
+                    self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+    def _query(self, sql: str, parameters: tuple) -> List[sqlite3.Row]:
+        """
+        Run a query and fetch all rows.
+
+        Args:
+            sql (str): The query.
+            parameters (tuple): The query parameters.
+
+        Returns:
+            List[sqlite3.Row]: The rows.
+        """
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+
+    def _query_one(self, sql: str, parameters: tuple) -> Optional[sqlite3.Row]:
+        """
+        Run a query and fetch the first row.
+
+        Args:
+            sql (str): The query.
+            parameters (tuple): The query parameters.
+
+        Returns:
+            Optional[sqlite3.Row]: The row, or None if there is none.
+        """
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchone()
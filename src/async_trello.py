@@ -0,0 +1,206 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from src.trello import Trello, DownloadResult, RequestFailedError, ACTIONS_PAGE_LIMIT, BOARD_CONTENT_QUERY
+from src.attachment_cache import Fingerprint
+from src.metrics import get_endpoint
+
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_HOST_CONCURRENCY = 16
+
+
+class AsyncTrello:
+    def __init__(self, trello: Trello, concurrency: int = DEFAULT_CONCURRENCY,
+                 host_concurrency: int = DEFAULT_HOST_CONCURRENCY) -> None:
+        """
+        Set up an asyncio Trello client on top of a (synchronous) Trello instance.
+
+        Metadata requests are sent with aiohttp, so hundreds of them can be in flight from a single thread.
+        They share the rate limit scheduler of the given Trello instance. Attachment downloads reuse
+        Trello.download_attachment (streaming, attachment cache) on worker threads.
+
+        Args:
+            trello (Trello): The Trello instance providing the credentials, the scheduler and the attachment cache.
+            concurrency (int): The maximum number of requests in flight.
+            host_concurrency (int): The maximum number of requests in flight per host.
+        """
+        if aiohttp is None:
+            raise ImportError("The asyncio client requires aiohttp: pip install aiohttp")
+
+        self.trello = trello
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+    async def __aenter__(self) -> "AsyncTrello":
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.host_concurrency)
+        self._session = aiohttp.ClientSession(connector=connector)
+        return self
+
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+    async def close(self) -> None:
+        """
+        Close the aiohttp session and all of its open connections.
+        """
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+
+    async def get_board(self, board_id: str) -> Optional[Any]:
+        """
+        Retrieve information about a Trello board using its ID. See Trello.get_board.
+        """
+        return await self._execute_get_request(f"/boards/{board_id}")
+
+
+    async def get_board_with_content(self, board_id: str) -> Optional[Any]:
+        """
+        Retrieve a Trello board with its lists, labels, cards, card attachments and checklists.
+        See Trello.get_board_with_content.
+        """
+        return await self._execute_get_request(f"/boards/{board_id}", BOARD_CONTENT_QUERY)
+
+
+    async def get_board_actions(self, board_id: str, limit: int = ACTIONS_PAGE_LIMIT) -> Optional[Any]:
+        """
+        Retrieve the newest actions of a Trello board. See Trello.get_board_actions.
+        """
+        return await self._execute_get_request(f"/boards/{board_id}/actions", {"limit": str(limit)})
+
+
+    async def get_lists(self, board_id: str) -> Optional[Any]:
+        """
+        Retrieve information about all lists in a Trello board. See Trello.get_lists.
+        """
+        return await self._execute_get_request(f"/boards/{board_id}/lists")
+
+
+    async def get_labels(self, board_id: str) -> Optional[Any]:
+        """
+        Retrieve information about all labels in a Trello board. See Trello.get_labels.
+        """
+        return await self._execute_get_request(f"/boards/{board_id}/labels")
+
+
+    async def get_all_cards(self, board_id: str) -> Optional[Any]:
+        """
+        Retrieve information about all cards in a Trello board. See Trello.get_all_cards.
+        """
+        return await self._execute_get_request(f"/boards/{board_id}/cards")
+
+
+    async def get_checklist(self, checklist_id: str) -> Optional[Any]:
+        """
+        Retrieve information about a specific Trello checklist using its ID. See Trello.get_checklist.
+        """
+        return await self._execute_get_request(f"/checklists/{checklist_id}")
+
+
+    async def get_attachments(self, card_id: str) -> Optional[Any]:
+        """
+        Retrieve information about all attachments on a Trello card. See Trello.get_attachments.
+        """
+        return await self._execute_get_request(f"/cards/{card_id}/attachments")
+
+
+    async def download_attachment(self, attachment_url: str, filename: str, attachment_id: Optional[str] = None,
+                                  fingerprint: Optional[Fingerprint] = None) -> DownloadResult:
+        """
+        Download an attachment from a Trello card on a worker thread. See Trello.download_attachment.
+        """
+        async with self._semaphore, self._get_host_semaphore(attachment_url):
+            try:
+                print("Downloading:", attachment_url)
+                return await asyncio.to_thread(self.trello.download_attachment, attachment_url, filename, attachment_id, fingerprint)
+            except Exception as e:
+                print(f"ERROR downloading Attachment [{e}]")
+                print(f"   {attachment_url}")
+                return DownloadResult(attachment_url, filename, False, error=str(e), attachment_id=attachment_id)
+
+
+    async def _execute_get_request(self, url_path: str, query: Optional[Dict[str, str]] = None) -> Optional[Any]:
+        """
+        Execute a GET request within the rate limit and the concurrency limits, retrying temporary errors.
+
+        Args:
+            url_path (str): The path for the GET request.
+            query (Optional[Dict[str, str]]): Additional query parameters for the request.
+
+        Returns:
+            Optional[Any]: The JSON response if the request is successful, or None if Trello rejected it (e.g. 404).
+
+        Raises:
+            RequestFailedError: If the request still fails after all retries.
+        """
+        url, headers, params = self.trello._create_get_request(url_path, query)
+        scheduler = self.trello.scheduler
+        metrics = self.trello.metrics
+        endpoint = get_endpoint(url_path)
+
+        for attempt in range(scheduler.max_retries + 1):
+            await asyncio.sleep(scheduler.reserve())
+
+            try:
+                async with self._semaphore, self._get_host_semaphore(url):
+                    start_time = time.perf_counter()
+                    
+                    async with self._session.get(url, headers=headers, params=params) as response:
+                        metrics.record_request(endpoint, time.perf_counter() - start_time, response.status)
+                        scheduler.update_quota(response.headers)
+
+                        if response.status == 200:
+                            return await response.json(content_type=None)
+
+                        status = response.status
+                        retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                metrics.record_request(endpoint, time.perf_counter() - start_time, e.__class__.__name__)
+                
+                if attempt == scheduler.max_retries:
+                    raise RequestFailedError(url, e.__class__.__name__) from e
+
+                await asyncio.sleep(scheduler.schedule_retry(attempt, e.__class__.__name__))
+                continue
+
+            if not scheduler.should_retry(status):
+                return None
+
+            if attempt == scheduler.max_retries:
+                print(f"ERROR: Request failed [{status}] after {scheduler.max_retries} retries")
+                raise RequestFailedError(url, status)
+
+            await asyncio.sleep(scheduler.schedule_retry(attempt, status, retry_after))
+
+
+    def _get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """
+        Get the semaphore limiting the requests in flight to the host of a URL.
+
+        Args:
+            url (str): The URL of the request.
+
+        Returns:
+            asyncio.Semaphore: The semaphore of the host.
+        """
+        host = urlparse(url).netloc
+
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.host_concurrency)
+
+        return self._host_semaphores[host]
@@ -0,0 +1,358 @@
+import os
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import src.file_system as file_system
+import src.file_structure as file_structure
+
+
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024
+
+# How the attachments of an export refer to the cached files
+LINK_HARDLINK = "hardlink"
+LINK_SYMLINK = "symlink"
+LINK_REFLINK = "reflink"
+LINK_COPY = "copy"
+LINK_MODES = [LINK_HARDLINK, LINK_SYMLINK, LINK_REFLINK, LINK_COPY]
+
+# ioctl that makes a file share the data blocks of another file (Btrfs, XFS), see ioctl_ficlone(2)
+FICLONE = 0x40049409
+
+# Attachments with the same size, MIME type and file name are probably the same file, e.g. a logo on many boards
+Fingerprint = Tuple[int, str, str]
+
+
+class AttachmentCache:
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, link_mode: str = LINK_HARDLINK) -> None:
+        """
+        Set up a persistent attachment cache shared by all board exports.
+
+        Files are stored once per content hash, and the attachments folders of all boards link to them
+        (see LINK_MODES), so an attachment that is on many cards and boards takes up disk space once.
+        The index maps every attachment ID to the hash of its content, its fingerprint and the
+        ETag / Last-Modified values of its last download, which are used for conditional requests.
+        An attachment that is not cached yet is requested with the ETag of a cached attachment with the
+        same fingerprint, so a copy of a cached file is linked instead of downloaded again.
+        When the cache grows beyond `max_size` bytes, the least recently used files are evicted.
+
+        Args:
+            max_size (int): The maximum size of all cached files in bytes.
+            link_mode (str): How exported attachments refer to the cached files, one of LINK_MODES.
+                        With LINK_SYMLINK the files linked by this instance are never evicted, so the cache can grow
+                        beyond `max_size` until the next run. Attachments of earlier runs break when their file is evicted.
+        """
+        self.max_size = max_size
+        self.link_mode = link_mode
+        self._lock = threading.Lock()
+        self._index: Dict[str, Any] = {}
+        # Fingerprint -> ID of a cached attachment with that fingerprint
+        self._fingerprints: Dict[Fingerprint, str] = {}
+        # Hashes of the files symlinked into exports by this instance, evicting them would break the links
+        self._linked_hashes: Set[str] = set()
+        
+        file_system.create_folder(file_structure.get_attachment_cache_folder())
+        index_file = file_structure.get_attachment_cache_index_file()
+        
+        if file_system.file_exists(index_file):
+            self._index = file_system.read_file_json(index_file)
+            
+        self._size = sum({entry["hash"]: entry["size"] for entry in self._index.values()}.values())
+        self._index_fingerprints()
+
+
+    def get_conditional_headers(self, attachment_id: str, fingerprint: Optional[Fingerprint] = None) -> Dict[str, str]:
+        """
+        Get the headers for a conditional request of a cached attachment.
+
+        If the attachment is not cached, the ETag of a cached attachment with the same fingerprint is used.
+        The server only answers 304 Not Modified if the attachment has the same content.
+
+        Args:
+            attachment_id (str): The ID of the Trello attachment.
+            fingerprint (Optional[Fingerprint]): The fingerprint of the attachment, see get_fingerprint.
+
+        Returns:
+            Dict[str, str]: The If-None-Match / If-Modified-Since headers, or an empty dictionary
+                            if neither the attachment nor a copy of it is cached.
+        """
+        with self._lock:
+            entry = self._index.get(attachment_id)
+            
+            if not entry or not file_system.file_exists(file_structure.get_attachment_cache_file(entry["hash"])):
+                entry = self._find_copy(fingerprint)
+                
+                # The date of another attachment says nothing about this one, only the ETag identifies the content
+                return {"If-None-Match": entry["etag"]} if entry else {}
+            
+            headers = {}
+            
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+                
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+                
+            return headers
+
+
+    def link(self, attachment_id: str, filename: str, fingerprint: Optional[Fingerprint] = None) -> bool:
+        """
+        Link a cached attachment into an export.
+
+        Args:
+            attachment_id (str): The ID of the Trello attachment.
+            filename (str): The path the attachment is exported to.
+            fingerprint (Optional[Fingerprint]): The fingerprint of the attachment. If the attachment is not cached,
+                        the cached attachment with the same fingerprint is linked and recorded for this attachment ID.
+
+        Returns:
+            bool: True if the attachment was cached and linked, False otherwise.
+        """
+        with self._lock:
+            entry = self._index.get(attachment_id)
+            
+            if not entry or not file_system.file_exists(file_structure.get_attachment_cache_file(entry["hash"])):
+                entry = self._find_copy(fingerprint)
+                
+                if not entry:
+                    return False
+                
+                entry = self._index[attachment_id] = dict(entry, fingerprint=list(fingerprint))
+            
+            cache_file = file_structure.get_attachment_cache_file(entry["hash"])
+            entry["last_used"] = time.time()
+            self._pin(entry["hash"])
+            
+        _link_file(cache_file, filename, self.link_mode)
+        return True
+
+
+    def add(self, attachment_id: str, filename: str, content_hash: str, etag: Optional[str], last_modified: Optional[str],
+            fingerprint: Optional[Fingerprint] = None) -> None:
+        """
+        Add a downloaded attachment to the cache, replace the download with a link to the cached file
+        and evict old files if the cache is too big.
+
+        Args:
+            attachment_id (str): The ID of the Trello attachment.
+            filename (str): The path the attachment was downloaded to.
+            content_hash (str): The SHA-256 hash of the attachment's content.
+            etag (Optional[str]): The ETag header of the download.
+            last_modified (Optional[str]): The Last-Modified header of the download.
+            fingerprint (Optional[Fingerprint]): The fingerprint of the attachment, see get_fingerprint.
+        """
+        cache_file = file_structure.get_attachment_cache_file(content_hash)
+        
+        with self._lock:
+            self._pin(content_hash)
+            
+            if file_system.file_exists(cache_file):
+                # The same file was downloaded for another attachment, the download is only a duplicate
+                _link_file(cache_file, filename, self.link_mode)
+            else:
+                _link_file(filename, cache_file, LINK_HARDLINK)
+                self._size += os.path.getsize(cache_file)
+                
+                # A hard link is the cached file itself, other modes need a file of their own
+                if self.link_mode != LINK_HARDLINK:
+                    _link_file(cache_file, filename, self.link_mode)
+            
+            old_entry = self._index.get(attachment_id)
+            self._index[attachment_id] = {
+                "hash": content_hash,
+                "size": os.path.getsize(cache_file),
+                "etag": etag,
+                "last_modified": last_modified,
+                "last_used": time.time(),
+                "fingerprint": list(fingerprint) if fingerprint else None
+            }
+            
+            if old_entry and old_entry["hash"] != content_hash:
+                # The attachment changed, its old file is deleted unless another attachment has the same content
+                self._delete_unused_file(old_entry)
+                self._index_fingerprints()
+            elif fingerprint and etag:
+                self._fingerprints[fingerprint] = attachment_id
+            
+            if self._size > self.max_size:
+                self._evict()
+
+
+    def save(self) -> None:
+        """
+        Write the cache index to the file system.
+        """
+        with self._lock:
+            file_system.write_file_json(file_structure.get_attachment_cache_index_file(), self._index)
+
+
+    def _evict(self) -> None:
+        """
+        Delete the least recently used files until the cache fits into its maximum size.
+        Must be called with the lock held.
+        """
+        files: Dict[str, Any] = {}
+        
+        # Several attachments can share one file, the file counts as used when any of them was used
+        for entry in self._index.values():
+            last_used = max(files[entry["hash"]]["last_used"], entry["last_used"]) if entry["hash"] in files else entry["last_used"]
+            files[entry["hash"]] = {"size": entry["size"], "last_used": last_used}
+            
+        evicted_hashes = set()
+        
+        for content_hash, file in sorted(files.items(), key=lambda item: item[1]["last_used"]):
+            if self._size <= self.max_size:
+                break
+            
+            if content_hash in self._linked_hashes:
+                continue
+            
+            file_system.delete_file(file_structure.get_attachment_cache_file(content_hash))
+            self._size -= file["size"]
+            evicted_hashes.add(content_hash)
+            
+        self._index = {id: entry for id, entry in self._index.items() if entry["hash"] not in evicted_hashes}
+        self._index_fingerprints()
+
+
+    def _delete_unused_file(self, entry: Any) -> None:
+        """
+        Delete the cached file of an index entry if no attachment refers to it anymore.
+        Must be called with the lock held.
+
+        Args:
+            entry (Any): The index entry that was replaced.
+        """
+        if any(other["hash"] == entry["hash"] for other in self._index.values()):
+            return
+        
+        cache_file = file_structure.get_attachment_cache_file(entry["hash"])
+        
+        if file_system.file_exists(cache_file):
+            file_system.delete_file(cache_file)
+            self._size -= entry["size"]
+        
+        self._linked_hashes.discard(entry["hash"])
+
+
+    def _pin(self, content_hash: str) -> None:
+        """
+        Keep a file from being evicted while it is symlinked into an export of this run.
+        Must be called with the lock held.
+
+        Args:
+            content_hash (str): The hash of the cached file.
+        """
+        if self.link_mode == LINK_SYMLINK:
+            self._linked_hashes.add(content_hash)
+
+
+    def _index_fingerprints(self) -> None:
+        """
+        Map the fingerprints of the cached attachments to their IDs. Only attachments with an ETag are
+        indexed, they are the ones a copy can be requested with. Must be called with the lock held.
+        """
+        self._fingerprints = {tuple(entry["fingerprint"]): id for id, entry in self._index.items()
+                              if entry.get("fingerprint") and entry["etag"]}
+
+
+    def _find_copy(self, fingerprint: Optional[Fingerprint]) -> Optional[Any]:
+        """
+        Find a cached attachment with the given fingerprint. Must be called with the lock held.
+
+        Args:
+            fingerprint (Optional[Fingerprint]): The fingerprint of the attachment.
+
+        Returns:
+            Optional[Any]: The index entry of the cached attachment, or None if there is none.
+        """
+        entry = self._index.get(self._fingerprints.get(fingerprint)) if fingerprint else None
+        
+        if not entry or not file_system.file_exists(file_structure.get_attachment_cache_file(entry["hash"])):
+            return None
+        
+        return entry
+
+
+def get_fingerprint(attachment: Any) -> Optional[Fingerprint]:
+    """
+    Get the fingerprint of an attachment from its Trello data.
+
+    Args:
+        attachment (Any): The attachment data.
+
+    Returns:
+        Optional[Fingerprint]: The size, MIME type and file name, or None if the size is unknown (e.g. for links).
+    """
+    if not attachment.get("bytes"):
+        return None
+    
+    return (attachment["bytes"], attachment.get("mimeType") or "", attachment["fileName"])
+
+
+def hash_chunks(chunks: Iterable[bytes], content_hash: Any) -> Iterator[bytes]:
+    """
+    Pass chunks through while adding them to a hash.
+
+    Args:
+        chunks (Iterable[bytes]): The chunks to hash.
+        content_hash (Any): The hashlib object that is updated with every chunk.
+
+    Yields:
+        bytes: The unchanged chunks.
+    """
+    for chunk in chunks:
+        content_hash.update(chunk)
+        yield chunk
+
+
+def _link_file(source: str, target: str, link_mode: str) -> None:
+    """
+    Link a file to a new path, or copy it if the file system doesn't support the link mode.
+
+    Args:
+        source (str): The existing file.
+        target (str): The path of the link.
+        link_mode (str): One of LINK_MODES.
+    """
+    file_system.delete_file(target)
+    
+    try:
+        if link_mode == LINK_HARDLINK:
+            os.link(source, target)
+            return
+        
+        if link_mode == LINK_SYMLINK:
+            # Relative, so the link still works after the export and the cache are moved together
+            os.symlink(os.path.relpath(source, os.path.dirname(target)), target)
+            return
+        
+        if link_mode == LINK_REFLINK and fcntl:
+            _reflink_file(source, target)
+            return
+    except OSError:
+        file_system.delete_file(target)
+        
+    shutil.copyfile(source, target)
+
+
+def _reflink_file(source: str, target: str) -> None:
+    """
+    Create a copy of a file that shares its data blocks until one of them is changed (copy-on-write).
+
+    Args:
+        source (str): The existing file.
+        target (str): The path of the copy.
+
+    Raises:
+        OSError: If the file system doesn't support reflinks.
+    """
+    with open(source, "rb") as source_file, open(target, "wb") as target_file:
+        fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
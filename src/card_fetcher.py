@@ -0,0 +1,131 @@
+import queue
+import threading
+from typing import Any, Iterator, List, Optional
+
+from src.trello import Trello, CARDS_PAGE_LIMIT
+
+
+# Pages fetched ahead of the page that is being processed
+DEFAULT_PAGES_AHEAD = 2
+
+# Put on the queue after the last page
+_END = object()
+
+
+class CardFetchError(Exception):
+    """
+    Raised while iterating a CardPageFetcher whose pages ended early, so the pages so far are not all cards of the board.
+    """
+
+
+class CardPageFetcher:
+    def __init__(self, trello: Trello, board_id: str, page_size: int = CARDS_PAGE_LIMIT,
+                 pages_ahead: int = DEFAULT_PAGES_AHEAD) -> None:
+        """
+        Fetch the cards of a board page by page on a background thread.
+
+        The next page is downloaded while the caller works on the current one (e.g. fetches
+        its checklists and attachments), and at most `pages_ahead` pages wait in memory.
+
+        Args:
+            trello (Trello): The Trello instance used to fetch the cards.
+            board_id (str): The ID of the Trello board.
+            page_size (int): The number of cards per request, at most CARDS_PAGE_LIMIT.
+            pages_ahead (int): The number of pages fetched ahead.
+        """
+        self.trello = trello
+        self.board_id = board_id
+        self.page_size = page_size
+        self.failed = False
+        self.card_count = 0
+        self._pages: queue.Queue = queue.Queue(max(1, pages_ahead))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._fetch_pages, name="card-pages", daemon=True)
+
+
+    def __enter__(self) -> "CardPageFetcher":
+        return self.start()
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        """
+        Yield the pages of cards as they arrive.
+
+        Yields:
+            List[Any]: The cards of a page.
+
+        Raises:
+            CardFetchError: If a request failed after the pages so far, see `failed`.
+        """
+        while True:
+            page = self._pages.get()
+
+            if page is _END:
+                if self.failed:
+                    raise CardFetchError(f"Only {self.card_count} cards of Board {self.board_id} were fetched")
+
+                return
+
+            self.card_count += len(page)
+            yield page
+
+
+    def start(self) -> "CardPageFetcher":
+        """
+        Start fetching pages on the background thread.
+
+        Returns:
+            CardPageFetcher: The fetcher, iterate it to get the pages.
+        """
+        self._thread.start()
+        return self
+
+
+    def close(self) -> None:
+        """
+        Stop fetching pages and wait for the background thread.
+        """
+        self._stopped.set()
+
+        # Make room for a page the thread is waiting to put on the queue
+        while self._thread.is_alive():
+            try:
+                self._pages.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+    def _fetch_pages(self) -> None:
+        """
+        Fetch all pages and put them on the queue. Runs on the background thread.
+        """
+        before: Optional[str] = None
+
+        try:
+            while not self._stopped.is_set():
+                with self.trello.metrics.phase("fetch_cards"):
+                    page = self.trello.get_cards_page(self.board_id, before, self.page_size)
+
+                if page is None:
+                    print(f"ERROR getting Cards of Board: {self.board_id}")
+                    self.failed = True
+                    return
+
+                if page:
+                    self._pages.put(page)
+
+                if len(page) < self.page_size:
+                    return
+
+                # Continue with the cards older than the oldest one of this page
+                before = min(card["id"] for card in page)
+        except Exception as e:
+            # E.g. a connection error after the last retry, the consumer must not take the pages so far for the whole board
+            print(f"ERROR getting Cards of Board: {self.board_id} [{e}]")
+            self.failed = True
+        finally:
+            self._pages.put(_END)
@@ -0,0 +1,369 @@
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+import src.file_system as file_system
+import src.file_structure as file_structure
+
+
+# Layouts of the per-card data (checklists and attachments data) of an export
+STORE_FILES = "files"
+STORE_JSONL = "jsonl"
+STORE_TYPES = [STORE_FILES, STORE_JSONL]
+
+# The JSON Lines store is rewritten once less than this share of it is live data
+COMPACT_RATIO = 0.5
+
+
+class FileCardStore:
+    def __init__(self, board_id: str) -> None:
+        """
+        Store the per-card data of a board in one JSON file per checklist, per card's checklist list
+        and per card's attachment list (see file_structure).
+
+        Args:
+            board_id (str): The ID of the Trello board.
+        """
+        self.board_id = board_id
+
+
+    def __enter__(self) -> "FileCardStore":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        """
+        Nothing to do, every card is written to its own files right away.
+        """
+
+
+    def write_card(self, card_id: str, checklist_ids: List[str], checklists_json: Dict[str, Any],
+                   attachments_json: Optional[Any]) -> None:
+        """
+        Write the checklists and attachments data of a card.
+
+        Args:
+            card_id (str): The ID of the Trello card.
+            checklist_ids (List[str]): The checklist IDs of the card.
+            checklists_json (Dict[str, Any]): The checklists data by checklist ID.
+            attachments_json (Optional[Any]): The attachments data of the card, None if the card has no attachments.
+        """
+        if checklist_ids:
+            file_system.write_file_json(file_structure.get_checklists_for_card_json_file(self.board_id, card_id), checklist_ids)
+
+            for checklist_id in checklist_ids:
+                file_system.write_file_json(
+                    file_structure.get_checklist_json_file(self.board_id, checklist_id),
+                    checklists_json.get(checklist_id))
+
+        if attachments_json is not None:
+            file_system.write_file_json(file_structure.get_attachments_for_card_json_file(self.board_id, card_id), attachments_json)
+
+
+    def read_checklists(self, card: Any) -> List[Any]:
+        """
+        Read the checklists data of an exported card.
+
+        Args:
+            card (Any): The card data.
+
+        Returns:
+            List[Any]: The checklists data in the order of the card's checklist IDs.
+        """
+        return [file_system.read_file_json(file_structure.get_checklist_json_file(self.board_id, checklist_id))
+                for checklist_id in card["idChecklists"]]
+
+
+    def read_attachments(self, card: Any) -> Any:
+        """
+        Read the attachments data of an exported card.
+
+        Args:
+            card (Any): The card data.
+
+        Returns:
+            Any: The attachments data of the card, or an empty list if the card has no attachments.
+        """
+        attachments_file = file_structure.get_attachments_for_card_json_file(self.board_id, card["id"])
+
+        if card["badges"]["attachments"] and file_system.file_exists(attachments_file):
+            return file_system.read_file_json(attachments_file) or []
+
+        return []
+
+
+    def delete_card(self, card: Any) -> None:
+        """
+        Delete the checklists and attachments data of an exported card. The attachment files are kept.
+
+        Args:
+            card (Any): The card as it was exported.
+        """
+        file_system.delete_file(file_structure.get_checklists_for_card_json_file(self.board_id, card["id"]))
+
+        for checklist_id in card["idChecklists"]:
+            file_system.delete_file(file_structure.get_checklist_json_file(self.board_id, checklist_id))
+
+        file_system.delete_file(file_structure.get_attachments_for_card_json_file(self.board_id, card["id"]))
+
+
+class JsonLinesCardStore:
+    def __init__(self, board_id: str, read_only: bool = False) -> None:
+        """
+        Store the per-card data of a board in a single JSON Lines file with one record per card.
+
+        A changed card is appended as a new record and a deleted card as a record without data,
+        the latest record of a card wins. An index of the byte offset of every card's latest record
+        is saved next to the file, so a card is read with a single seek. The file is rewritten
+        when it is closed and less than COMPACT_RATIO of it is live data. A store that wasn't changed
+        is left as it is.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+            read_only (bool): Only read the store, e.g. to render the board. Nothing is ever written.
+        """
+        self.board_id = board_id
+        self.read_only = read_only
+        self.file_path = file_structure.get_card_store_file(board_id)
+        self.index_path = file_structure.get_card_store_index_file(board_id)
+        self._lock = threading.Lock()
+        self._closed = False
+        # Set when the file or the index changed, so the index has to be saved on close
+        self._modified = False
+        # Card ID -> (offset, length) of its latest record, deleted cards are not in the index
+        self._index: Dict[str, Tuple[int, int]] = self._load_index()
+
+        self._writer: Optional[BinaryIO] = None if read_only else open(self.file_path, 'ab')
+        self._reader: Optional[BinaryIO] = open(self.file_path, 'rb') if file_system.file_exists(self.file_path) else None
+
+
+    def __enter__(self) -> "JsonLinesCardStore":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    @staticmethod
+    def exists(board_id: str) -> bool:
+        """
+        Check if the per-card data of a board export is stored in a JSON Lines file.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+
+        Returns:
+            bool: True if the board has a JSON Lines store, False otherwise.
+        """
+        return file_system.file_exists(file_structure.get_card_store_file(board_id))
+
+
+    def close(self) -> None:
+        """
+        Compact the store if it holds mostly outdated records, save the index and close the file.
+        """
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+            for file in (self._writer, self._reader):
+                if file:
+                    file.close()
+
+            if not self._modified:
+                return
+
+            if self._get_live_ratio() < COMPACT_RATIO:
+                self._compact()
+
+            file_system.write_file_json(self.index_path, {
+                "size": os.path.getsize(self.file_path),
+                "offsets": self._index
+            })
+
+
+    def write_card(self, card_id: str, checklist_ids: List[str], checklists_json: Dict[str, Any],
+                   attachments_json: Optional[Any]) -> None:
+        """
+        Append the checklists and attachments data of a card. See FileCardStore.write_card.
+        """
+        self._append({
+            "id": card_id,
+            "checklists": [checklists_json.get(checklist_id) for checklist_id in checklist_ids],
+            "attachments": attachments_json
+        })
+
+
+    def read_checklists(self, card: Any) -> List[Any]:
+        """
+        Read the checklists data of an exported card. See FileCardStore.read_checklists.
+        """
+        record = self._read(card["id"])
+        return record["checklists"] if record else []
+
+
+    def read_attachments(self, card: Any) -> Any:
+        """
+        Read the attachments data of an exported card. See FileCardStore.read_attachments.
+        """
+        record = self._read(card["id"])
+        return (record["attachments"] or []) if record and card["badges"]["attachments"] else []
+
+
+    def delete_card(self, card: Any) -> None:
+        """
+        Delete the checklists and attachments data of an exported card. See FileCardStore.delete_card.
+        """
+        self._append({"id": card["id"], "deleted": True})
+
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """
+        Append a record to the file and point the index at it.
+
+        Args:
+            record (Dict[str, Any]): The record, "id" is the card ID.
+        """
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+        if self.read_only:
+            raise ValueError(f"The card store of Board {self.board_id} is read-only")
+
+        with self._lock:
+            self._modified = True
+            offset = self._writer.tell()
+            self._writer.write(line)
+            # A card marked as done in the checkpoint must be in the file when the export is interrupted
+            self._writer.flush()
+
+            if record.get("deleted"):
+                self._index.pop(record["id"], None)
+            else:
+                self._index[record["id"]] = (offset, len(line))
+
+
+    def _read(self, card_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the latest record of a card.
+
+        Args:
+            card_id (str): The ID of the Trello card.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record, or None if the card is not in the store.
+        """
+        with self._lock:
+            position = self._index.get(card_id)
+
+            if position is None:
+                return None
+
+            self._reader.seek(position[0])
+            return json.loads(self._reader.read(position[1]))
+
+
+    def _load_index(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Load the saved index, or rebuild it from the file if it doesn't match the file (e.g. after a crash).
+
+        Returns:
+            Dict[str, Tuple[int, int]]: The offset and length of every card's latest record.
+        """
+        if not file_system.file_exists(self.file_path):
+            return {}
+
+        if file_system.file_exists(self.index_path):
+            index = file_system.read_file_json(self.index_path)
+
+            if index["size"] == os.path.getsize(self.file_path):
+                return {card_id: tuple(position) for card_id, position in index["offsets"].items()}
+
+        offsets: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+
+        with open(self.file_path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+
+                record = json.loads(line)
+
+                if record.get("deleted"):
+                    offsets.pop(record["id"], None)
+                else:
+                    offsets[record["id"]] = (offset, len(line))
+
+                offset += len(line)
+
+        # Drop the incomplete last record of an interrupted write, so the next record starts on a new line
+        if not self.read_only:
+            if offset < os.path.getsize(self.file_path):
+                os.truncate(self.file_path, offset)
+
+            # Save the rebuilt index on close
+            self._modified = True
+
+        return offsets
+
+
+    def _get_live_ratio(self) -> float:
+        """
+        Get the share of the file that is taken by the latest records of the cards.
+
+        Returns:
+            float: The live share, 1.0 for an empty file.
+        """
+        size = os.path.getsize(self.file_path)
+        return sum(length for _, length in self._index.values()) / size if size else 1.0
+
+
+    def _compact(self) -> None:
+        """
+        Rewrite the file with only the latest record of every card.
+        """
+        index: Dict[str, Tuple[int, int]] = {}
+
+        def get_records():
+            offset = 0
+
+            with open(self.file_path, 'rb') as file:
+                for card_id, (record_offset, length) in sorted(self._index.items(), key=lambda item: item[1][0]):
+                    file.seek(record_offset)
+                    index[card_id] = (offset, length)
+                    offset += length
+                    yield file.read(length)
+
+        file_system.write_file_stream(self.file_path, get_records())
+        self._index = index
+
+
+CardStore = Union[FileCardStore, JsonLinesCardStore]
+
+
+def open_card_store(board_id: str, store_type: Optional[str] = None, read_only: bool = False) -> CardStore:
+    """
+    Open the store of the per-card data of a board.
+
+    Args:
+        board_id (str): The ID of the Trello board.
+        store_type (Optional[str]): STORE_FILES or STORE_JSONL. Omit to use the layout of the existing export.
+        read_only (bool): Only read the per-card data, the store files are left untouched.
+
+    Returns:
+        CardStore: The store, close it when done.
+    """
+    if store_type is None:
+        store_type = STORE_JSONL if JsonLinesCardStore.exists(board_id) else STORE_FILES
+
+    if store_type == STORE_JSONL:
+        return JsonLinesCardStore(board_id, read_only)
+
+    return FileCardStore(board_id)
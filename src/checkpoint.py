@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+from typing import Dict, Set
+
+import src.file_system as file_system
+import src.file_structure as file_structure
+
+
+SAVE_INTERVAL = 100
+
+
+class Checkpoint:
+    def __init__(self, board_id: str) -> None:
+        """
+        Load the checkpoint manifest of a board export, or start an empty one.
+
+        The manifest records which cards have their checklists and attachment data written and which
+        attachments are downloaded, together with their file size. It is saved every SAVE_INTERVAL
+        changes, so an interrupted export can be resumed.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+        """
+        self.file_path = file_structure.get_checkpoint_json_file(board_id)
+        self.complete: bool = False
+        self.cards: Set[str] = set()
+        self.attachments: Dict[str, int] = {}
+        self._changes = 0
+        self._lock = threading.RLock()
+        
+        if file_system.file_exists(self.file_path):
+            manifest = file_system.read_file_json(self.file_path)
+            self.complete = manifest["complete"]
+            self.cards = set(manifest["cards"])
+            self.attachments = manifest["attachments"]
+
+
+    def can_resume(self) -> bool:
+        """
+        Check if there is an unfinished export to resume.
+
+        Returns:
+            bool: True if an earlier export was started but did not finish, False otherwise.
+        """
+        return file_system.file_exists(self.file_path) and not self.complete
+
+
+    def is_card_done(self, card_id: str) -> bool:
+        """
+        Check if the checklists and attachment data of a card are written.
+
+        Args:
+            card_id (str): The ID of the Trello card.
+
+        Returns:
+            bool: True if the card is done, False otherwise.
+        """
+        return card_id in self.cards
+
+
+    def is_attachment_done(self, attachment_id: str, filename: str) -> bool:
+        """
+        Check if an attachment is downloaded and its file is still complete.
+
+        Args:
+            attachment_id (str): The ID of the Trello attachment.
+            filename (str): The path the attachment is downloaded to.
+
+        Returns:
+            bool: True if the file exists with the size it was downloaded with, False otherwise.
+        """
+        size = self.attachments.get(attachment_id)
+        return size is not None and file_system.file_exists(filename) and os.path.getsize(filename) == size
+
+
+    def mark_card_done(self, card_id: str) -> None:
+        """
+        Record that the checklists and attachment data of a card are written.
+
+        Args:
+            card_id (str): The ID of the Trello card.
+        """
+        with self._lock:
+            self.cards.add(card_id)
+            self._changed()
+
+
+    def mark_attachment_done(self, attachment_id: str, filename: str) -> None:
+        """
+        Record that an attachment is downloaded.
+
+        Args:
+            attachment_id (str): The ID of the Trello attachment.
+            filename (str): The path the attachment was downloaded to.
+        """
+        size = os.path.getsize(filename)
+        
+        with self._lock:
+            self.attachments[attachment_id] = size
+            self._changed()
+
+
+    def save(self) -> None:
+        """
+        Write the manifest to the file system. The file is replaced atomically, so it is never left half written.
+        """
+        with self._lock:
+            manifest = {
+                "complete": self.complete,
+                "cards": sorted(self.cards),
+                "attachments": self.attachments
+            }
+            
+            file_system.write_file_stream(self.file_path, [json.dumps(manifest).encode("utf-8")])
+            self._changes = 0
+
+
+    def _changed(self) -> None:
+        """
+        Count a change and save the manifest every SAVE_INTERVAL changes. Must be called with the lock held.
+        """
+        self._changes += 1
+        
+        if self._changes >= SAVE_INTERVAL:
+            self.save()
@@ -1,11 +1,28 @@
 import json
 import os
-from typing import Any, List, Tuple
+import re
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from src.kanban_board import Board, BoardList, Card, Label, Checklist, ChecklistItem
 import src.file_system as file_system
 import src.file_structure as file_structure
-from src.util import set_color_brightness, insert_char
+from src.util import set_color_brightness
+from src.metrics import Metrics
+from src.card_store import CardStore, open_card_store
+from src.archive import BoardArchive
+from src.render_cache import RenderCache, get_card_hash
+
+
+# A hashtag is a "#" that is followed by anything but a space
+HASHTAG_PATTERN = re.compile(r"#(?=[^ ])")
+HASHTAG_REPLACEMENT = "&#8203#"
+
+# The fields of a Trello card the loader uses, everything else in cards.json is dropped while reading
+CARD_FIELDS = ("id", "name", "desc", "idList", "pos", "idLabels", "idChecklists", "idAttachmentCover", "badges")
+
+# Increase whenever the markdown of a card changes, so render caches of older versions are discarded
+RENDERER_VERSION = 1
 
 
 class ObsidianKanban:
@@ -45,6 +62,21 @@ class ObsidianKanban:
         }
     
     
+    def __init__(self, metrics: Optional[Metrics] = None, archive: Optional[BoardArchive] = None,
+                 use_render_cache: bool = False):
+        """
+        Set up the exporter for Obsidian Kanban boards.
+
+        Parameters:
+            metrics (Optional[Metrics]): Records the time spent loading and rendering boards.
+            archive (Optional[BoardArchive]): Load the boards from this archive instead of the exported JSON files.
+            use_render_cache (bool): Reuse the markdown of cards that are unchanged since the last render, see RenderCache.
+        """
+        self.metrics = metrics or Metrics()
+        self.archive = archive
+        self.use_render_cache = use_render_cache
+    
+    
     def export(self, board_id):                
         """
         Export the contents of a Trello board to a Markdown file compatible with Obsidian's Kanban plugin.
@@ -52,8 +84,46 @@ class ObsidianKanban:
         Parameters:
             board_id (str): The ID of the Trello board to export.
         """
-        board: Board = self._load_board(board_id)
-        self._create_markdown_file(board)
+        with self.metrics.phase("load"):
+            if self.archive:
+                board: Board = self._load_board_from_archive(board_id)
+            else:
+                board: Board = self._load_board(board_id)
+        
+        # The markdown is written while it is rendered, so this includes writing the file
+        with self.metrics.phase("render"):
+            render_cache = self.open_render_cache(board_id)
+            self._create_markdown_file(board, render_cache=render_cache)
+            self.save_render_cache(render_cache)
+    
+    
+    def open_render_cache(self, board_id: str) -> Optional[RenderCache]:
+        """
+        Load the render cache of a board if the render cache is used.
+
+        Parameters:
+            board_id (str): The ID of the Trello board.
+
+        Returns:
+            Optional[RenderCache]: The render cache, or None if it isn't used.
+        """
+        if not self.use_render_cache:
+            return None
+        
+        return RenderCache(board_id, RENDERER_VERSION)
+    
+    
+    def save_render_cache(self, render_cache: Optional[RenderCache]) -> None:
+        """
+        Save the render cache of a board after it was rendered and count its hits and misses.
+
+        Parameters:
+            render_cache (Optional[RenderCache]): The render cache, see open_render_cache.
+        """
+        if render_cache:
+            render_cache.save()
+            self.metrics.count("render_cache_hits", render_cache.hits)
+            self.metrics.count("render_cache_misses", render_cache.misses)
     
     
     def _load_board(self, board_id: str) -> Board:
@@ -69,57 +139,70 @@ class ObsidianKanban:
         board_json = file_system.read_file_json(file_structure.get_board_json_file(board_id))
         lists_json = file_system.read_file_json(file_structure.get_lists_json_file(board_id))
         labels_json = file_system.read_file_json(file_structure.get_labels_json_file(board_id))
-        cards_json = file_system.read_file_json(file_structure.get_cards_json_file(board_id))
-                
+        
+        # Cards are streamed from cards.json and turned into Card objects right away,
+        # so the raw JSON of only one card is held in memory at a time
+        with open_card_store(board_id, read_only=True) as card_store:
+            cards_json = file_system.read_file_json_array(file_structure.get_cards_json_file(board_id), CARD_FIELDS)
+            return self._build_board(board_id, board_json, lists_json, labels_json, cards_json, card_store)
+    
+    
+    def _load_board_from_archive(self, board_id: str) -> Board:
+        """
+        Load a Trello board from the archive and construct a Board object.
+
+        Parameters:
+            board_id (str): The ID of the Trello board to load.
+
+        Returns:
+            Board: The Board object representing the archived Trello board.
+        """
+        board_json = self.archive.get_board(board_id)
+        
+        if not board_json:
+            raise ValueError(f"Board {board_id} is not in the archive {self.archive.file_path}")
+        
+        return self._build_board(board_id, board_json, self.archive.get_lists(board_id), self.archive.get_labels(board_id),
+                                 self.archive.get_cards(board_id), self.archive)
+    
+    
+    def _build_board(self, board_id: str, board_json: Any, lists_json: Any, labels_json: Any, cards_json: Iterable[Any],
+                     card_store: Union[CardStore, BoardArchive]) -> Board:
+        """
+        Construct a Board object from the JSON data of a Trello board.
+
+        Parameters:
+            board_id (str): The ID of the Trello board.
+            board_json (Any): The board data.
+            lists_json (Any): The lists of the board in board order.
+            labels_json (Any): The labels of the board.
+            cards_json (Iterable[Any]): The cards of the board in board order.
+            card_store (Union[CardStore, BoardArchive]): Provides the checklists and attachments data of the cards.
+
+        Returns:
+            Board: The Board object representing the Trello board.
+        """
         board:Board = Board(board_id, board_json["name"])
         
+        # Index everything once, so building the board is linear in the number of cards
+        label_names = self._get_label_names(labels_json)
+        cards_by_list: Dict[str, List[Tuple[float, Card]]] = {list["id"]: [] for list in lists_json}
+        
+        for card in cards_json:
+            if card["idList"] in cards_by_list:
+                cards_by_list[card["idList"]].append((card["pos"], self._load_card(card_store, card, label_names)))
+        
         for list in lists_json:
             board_list = BoardList(list["id"], list["name"])
-
-            # Add Cards now
-            for card in cards_json:                
-                if card["idList"] == board_list.id:
-                    board_card = Card(card["id"], 
-                                      card["name"],
-                                      card["desc"].replace("\n", "<br>")) # Remove ascii line-breaks to html line-breaks                    
-                    
-                    # Add Labels
-                    for label_id in card["idLabels"]:
-                        board_card.labels.append(self._get_label_name(label_id, labels_json))
-                    
-                    # Add Attachments
-                    if card["badges"]["attachments"]:
-                        id_attachment_cover = card["idAttachmentCover"]
-                        attachments_file = file_structure.get_attachments_for_card_json_file(board_id, card["id"])
-                        attachment_json = file_system.read_file_json(attachments_file)
-
-                        for attachment in attachment_json:
-                            if id_attachment_cover == attachment["id"]:
-                                board_card.attachments.insert(0, attachment["fileName"])
-                            else:
-                                board_card.attachments.append(attachment["fileName"])
-
-                    # Add Checklists
-                    for checklist_id in card["idChecklists"]:
-                        checklist_filename = file_structure.get_checklist_json_file(board_id, checklist_id)
-                        checklist = file_system.read_file_json(checklist_filename)
-                        
-                        newChecklist = Checklist(checklist["name"])
-                        
-                        for item in checklist["checkItems"]:
-                            checked_state = bool(item["state"] == "complete")
-                            newChecklist.items.append(ChecklistItem(item["name"], checked_state))
-                            
-                        if newChecklist.items:
-                            board_card.checklists.append(newChecklist)
-                            
-                    board_list.cards.append(board_card)
-                    
+            # cards.json of a paginated fetch is in page order, the list shows the cards by position
+            cards = cards_by_list[board_list.id]
+            cards.sort(key=lambda item: item[0])
+            board_list.cards = [card for _, card in cards]
             board.lists.append(board_list)
             
         # Labels with their name and color
         for label in labels_json:
-            label_name = self._get_label_name(label["id"], labels_json)            
+            label_name = label_names[label["id"]]
             
             # Fixes a trello bug. Colors named dark are actually light, and colors named light should be dark!
             color_name = label["color"]
@@ -132,89 +215,206 @@ class ObsidianKanban:
             board.labels.append(Label(label_name, color_name))
             
         return board
+    
+    
+    def _get_label_names(self, labels_json: Any) -> Dict[str, str]:
+        """
+        Get the names of the labels of a board, see _get_label_name.
+
+        Label names are interned, so all cards (also of other boards) share one string per name.
+
+        Parameters:
+            labels_json (Any): The labels of the board.
+
+        Returns:
+            Dict[str, str]: The label names by label ID.
+        """
+        return {label["id"]: sys.intern(self._get_label_name(label)) for label in labels_json}
+    
+    
+    def _load_card(self, card_store: Union[CardStore, BoardArchive], card: Any, label_names: Dict[str, str]) -> Card:
+        """
+        Construct a Card object from the JSON data of a Trello card and its checklists and attachments data.
+
+        Parameters:
+            card_store (Union[CardStore, BoardArchive]): Provides the checklists and attachments data of the card.
+            card (Any): The JSON data of the card.
+            label_names (Dict[str, str]): The label names by label ID.
+
+        Returns:
+            Card: The Card object representing the card.
+        """
+        board_card = Card(card["id"], 
+                          card["name"],
+                          card["desc"].replace("\n", "<br>")) # Remove ascii line-breaks to html line-breaks                    
+        
+        # Add Labels
+        for label_id in card["idLabels"]:
+            board_card.labels.append(label_names.get(label_id))
+        
+        # Add Attachments
+        if card["badges"]["attachments"]:
+            id_attachment_cover = card["idAttachmentCover"]
+
+            for attachment in card_store.read_attachments(card):
+                if id_attachment_cover == attachment["id"]:
+                    board_card.attachments.insert(0, attachment["fileName"])
+                else:
+                    board_card.attachments.append(attachment["fileName"])
+
+        # Add Checklists
+        for checklist in card_store.read_checklists(card):
+            # Checklists deleted while the board was exported are exported as null
+            if not checklist:
+                continue
+            
+            # Checklist titles like "Checklist" or "To Do" repeat on many cards, so they share one string
+            newChecklist = Checklist(sys.intern(checklist["name"]))
+            
+            for item in checklist["checkItems"]:
+                checked_state = bool(item["state"] == "complete")
+                newChecklist.items.append(ChecklistItem(item["name"], checked_state))
+                
+            if newChecklist.items:
+                board_card.checklists.append(newChecklist)
+                
+        return board_card
         
     
-    def _create_markdown_file(self, board: Board):
+    def _create_markdown_file(self, board: Board, rendered_cards: Optional[Dict[str, List[str]]] = None,
+                              render_cache: Optional[RenderCache] = None):
         """
         Create a Markdown file representing the given Trello board.
 
+        The board is written list by list and card by card to a buffered file,
+        so only one card's markdown is held in memory at a time.
+
         Parameters:
             board (Board): The Board object representing the Trello board.
+            rendered_cards (Optional[Dict[str, List[str]]]): The markdown of the cards in list order by list ID,
+                        if they were rendered already (see RenderPipeline). Omit to render the cards of the board.
+            render_cache (Optional[RenderCache]): Reuse the markdown of unchanged cards from this cache.
         """
-        # Add header
-        text = "---\n\nkanban-plugin: basic\n\n---\n"
+        board_folder = file_structure.get_board_folder(board.board_id)
+        board_filename = os.path.join(board_folder, f"{board.title}.md")
+        print("Exporting to " + board_filename)
+        
+        # A board rendered from the archive may have no export folder
+        file_system.create_folder(board_folder)
         
-        for board_list in board.lists:
-            # Add List
-            text += f"\n\n## {board_list.title}\n\n"
+        with file_system.open_text_file_for_writing(board_filename) as file:
+            # Add header
+            file.write("---\n\nkanban-plugin: basic\n\n---\n")
             
-            # Add Card to the list
-            for card in board_list.cards:
-                card_text = "- [ ] "
+            for board_list in board.lists:
+                # Add List
+                file.write(f"\n\n## {board_list.title}\n\n")
                 
-                # Add labels
-                if card.labels:
-                    for label in card.labels:
-                        card_text += f"<br>#{label} "
-                        
-                    card_text += "<br>"
-                                                    
-                # Add Attachments
-                if card.attachments:
-                    card_text += "<br>"
-                                        
-                    cover_filename: str = ""
-                    hidden_attachments_filenames: List[str] = []
-                                                            
-                    for index, attachment_filename in enumerate(card.attachments):                                                    
-                        # Using relative pathing ./attachments/somefile.jpg
-                        filename = os.path.join(".", file_structure.ATTACHMENTS_FOLDER, attachment_filename)
-                        
-                        if index == 0:
-                            cover_filename = filename
-                        else:
-                            hidden_attachments_filenames.append(filename)
-
-                    card_text += f"![[{cover_filename}]]<br>"
-                    
-                    for filename in hidden_attachments_filenames:
-                        card_text += f"![[{filename}]]<br>"                    
+                # Add Card to the list
+                if rendered_cards is not None:
+                    file.writelines(rendered_cards[board_list.id])
+                else:
+                    for card in board_list.cards:
+                        file.write(self._get_card_markdown(card, render_cache))
+            
+            file.write(self._create_kanban_settings(board))
+        
+    
+    def _get_card_markdown(self, card: Card, render_cache: Optional[RenderCache]) -> str:
+        """
+        Get the Markdown line of a single card from the render cache, or render it if it isn't cached or has changed.
+
+        Parameters:
+            card (Card): The card to render.
+            render_cache (Optional[RenderCache]): The render cache, None to always render the card.
+
+        Returns:
+            str: The card as a Markdown list item, see _create_card_markdown.
+        """
+        if render_cache is None:
+            return self._create_card_markdown(card)
+        
+        card_hash = get_card_hash(card, RENDERER_VERSION)
+        markdown = render_cache.get(card.card_id, card_hash)
+        
+        if markdown is None:
+            markdown = self._create_card_markdown(card)
+            render_cache.put(card.card_id, card_hash, markdown)
+            
+        return markdown
+        
+    
+    def _create_card_markdown(self, card: Card) -> str:
+        """
+        Create the Markdown line of a single card.
+
+        Parameters:
+            card (Card): The card to render.
+
+        Returns:
+            str: The card as a Markdown list item, including the trailing line-break.
+        """
+        card_text = ["- [ ] "]
+        
+        # Add labels
+        if card.labels:
+            for label in card.labels:
+                card_text.append(f"<br>#{label} ")
                 
-                card.title = self._fix_hashtags_in_text(card.title)
-                card.description = self._fix_hashtags_in_text(card.description)
+            card_text.append("<br>")
+                                            
+        # Add Attachments
+        if card.attachments:
+            card_text.append("<br>")
+                                
+            cover_filename: str = ""
+            hidden_attachments_filenames: List[str] = []
+                                                    
+            for index, attachment_filename in enumerate(card.attachments):                                                    
+                # Using relative pathing ./attachments/somefile.jpg
+                filename = os.path.join(".", file_structure.ATTACHMENTS_FOLDER, attachment_filename)
                 
-                # Add Card Title
-                if card.description:
-                    card_text += f"<details><summary>{card.title}</summary> <br>{card.description}</details>"
+                if index == 0:
+                    cover_filename = filename
                 else:
-                    card_text += card.title
-
-                # Add Checklists
-                if card.checklists:
-                    card_text += "<br>"
-                    
-                    for checklist in card.checklists:
-                        card_text += f"   <br><u>{self._fix_hashtags_in_text(checklist.title)}:</u><br>"
-                        
-                        for item in checklist.items:
-                            if item.checked:
-                                card_text += "- [X] "
-                            else:
-                                card_text += "- [ ] "
-                                
-                            card_text += f"{self._fix_hashtags_in_text(item.text)}<br>"
+                    hidden_attachments_filenames.append(filename)
+
+            card_text.append(f"![[{cover_filename}]]<br>")
+            
+            for filename in hidden_attachments_filenames:
+                card_text.append(f"![[{filename}]]<br>")
+        
+        # Escape all texts of the card at once, they are taken in the same order below
+        texts = iter(self._fix_hashtags_in_texts(self._get_card_texts(card)))
+        title = next(texts)
+        description = next(texts)
+        
+        # Add Card Title
+        if description:
+            card_text.append(f"<details><summary>{title}</summary> <br>{description}</details>")
+        else:
+            card_text.append(title)
+
+        # Add Checklists
+        if card.checklists:
+            card_text.append("<br>")
+            
+            for checklist in card.checklists:
+                card_text.append(f"   <br><u>{next(texts)}:</u><br>")
+                
+                for item in checklist.items:
+                    if item.checked:
+                        card_text.append("- [X] ")
+                    else:
+                        card_text.append("- [ ] ")
                         
-                        card_text += "<br>"
+                    card_text.append(f"{next(texts)}<br>")
                 
-                text += card_text + "\n"                
+                card_text.append("<br>")
         
+        card_text.append("\n")
         
-        text += self._create_kanban_settings(board)
-        
-        # Export to file
-        board_filename = os.path.join(file_structure.get_board_folder(board.board_id), f"{board.title}.md")
-        print("Exporting to " + board_filename)
-        file_system.write_file(board_filename, text)
+        return "".join(card_text)
         
     
     def _create_kanban_settings(self, board: Board) -> str:
@@ -263,14 +463,40 @@ class ObsidianKanban:
 
         This function inserts an invisible character "&#8203" before hashtags not followed by a space in the description string.
         """
-        # Go from back to front
-        for i in range(len(description) - 1, -1, -1):            
-            current_char = description[i]
+        return HASHTAG_PATTERN.sub(HASHTAG_REPLACEMENT, description)
+    
+    
+    def _fix_hashtags_in_texts(self, texts: List[str]) -> List[str]:
+        """
+        Fix hashtags in several texts at once, see _fix_hashtags_in_text.
+
+        Parameters:
+            texts (List[str]): The texts to fix.
+
+        Returns:
+            List[str]: The modified texts in the same order.
+        """
+        substitute = HASHTAG_PATTERN.sub
+        return [substitute(HASHTAG_REPLACEMENT, text) for text in texts]
+    
+    
+    def _get_card_texts(self, card: Card) -> List[str]:
+        """
+        Collect all texts of a card that are shown in the markdown.
+
+        Parameters:
+            card (Card): The card.
+
+        Returns:
+            List[str]: The title, the description, and every checklist title followed by its item texts.
+        """
+        texts = [card.title, card.description]
         
-            if current_char == '#' and i + 1 < len(description) and description[i + 1] != ' ':
-                description = insert_char("&#8203", description, i)
-                        
-        return description
+        for checklist in card.checklists:
+            texts.append(checklist.title)
+            texts.extend(item.text for item in checklist.items)
+            
+        return texts
     
     
     def _get_text_color(self, color_name: str) -> str:
@@ -328,23 +554,20 @@ class ObsidianKanban:
         return f"rgba({red}, {green}, {blue}, {alpha})"
     
     
-    def _get_label_name(self, label_id: str, labels_json: Any) -> str:
+    def _get_label_name(self, label: Any) -> str:
         """
-        Retrieve the name of a label based on its ID.
+        Retrieve the name of a label.
 
         Args:
-            label_id (str): The ID of the label to retrieve the name for.
-            labels_json (Any): A (json) list of label objects retrieved from Trello.
+            label (Any): The (json) label object retrieved from Trello.
 
         Returns:
-            str: The name of the label corresponding to the provided ID.
+            str: The name of the label.
         """
-        for label in labels_json:
-            if label["id"] == label_id:
-                label_name:str = label["name"].replace(' ', '') # Also removes spaces
+        label_name:str = label["name"].replace(' ', '') # Also removes spaces
 
-                # As a fallback: Use the color name if this label has no name
-                if not label_name:
-                    return label["color"]
+        # As a fallback: Use the color name if this label has no name
+        if not label_name:
+            return label["color"]
 
-                return label_name
+        return label_name
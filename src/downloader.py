@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from src.trello import Trello, DownloadResult
+from src.attachment_cache import Fingerprint
+
+
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+
+class AttachmentDownloader:
+    def __init__(self, trello: Trello, workers: int = DEFAULT_DOWNLOAD_WORKERS,
+                 on_result: Optional[Callable[[DownloadResult], None]] = None) -> None:
+        """
+        Set up a bounded worker pool that downloads attachments in the background.
+
+        At most `workers` downloads run at the same time and at most `workers * 2` downloads
+        are waiting in the queue, so queueing blocks instead of piling up unbounded work.
+
+        Args:
+            trello (Trello): The Trello instance used to download the attachments.
+            workers (int): The number of parallel downloads.
+            on_result (Optional[Callable[[DownloadResult], None]]): Called on the worker thread after each download.
+        """
+        self.trello = trello
+        self.on_result = on_result
+        self.workers = max(1, workers)
+        self.results: List[DownloadResult] = []
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="download")
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+        self._lock = threading.Lock()
+
+
+    def __enter__(self) -> "AttachmentDownloader":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.wait()
+
+
+    def queue(self, url: str, filename: str, attachment_id: Optional[str] = None, fingerprint: Optional[Fingerprint] = None) -> None:
+        """
+        Queue an attachment for download. Blocks while the queue is full.
+
+        Args:
+            url (str): The URL of the attachment to download.
+            filename (str): The name of the file to save the attachment to.
+            attachment_id (Optional[str]): The ID of the Trello attachment, used for the attachment cache.
+            fingerprint (Optional[Fingerprint]): The fingerprint of the attachment, used for the attachment cache.
+        """
+        # Time the export waits for a free slot, i.e. for the downloads
+        with self.trello.metrics.phase("download_attachments"):
+            self._slots.acquire()
+
+        try:
+            self._executor.submit(self._download, url, filename, attachment_id, fingerprint)
+        except BaseException:
+            self._slots.release()
+            raise
+
+
+    def wait(self) -> List[DownloadResult]:
+        """
+        Wait until all queued downloads are finished and shut down the worker pool.
+
+        Returns:
+            List[DownloadResult]: The result of every queued download.
+        """
+        with self.trello.metrics.phase("download_attachments"):
+            self._executor.shutdown(wait=True)
+            
+        return self.results
+
+
+    def get_failed(self) -> List[DownloadResult]:
+        """
+        Get all downloads that failed so far.
+
+        Returns:
+            List[DownloadResult]: The failed downloads.
+        """
+        with self._lock:
+            return [result for result in self.results if not result.success]
+
+
+    def _download(self, url: str, filename: str, attachment_id: Optional[str], fingerprint: Optional[Fingerprint]) -> None:
+        """
+        Download a single attachment and record its result. Runs on a worker thread.
+
+        Args:
+            url (str): The URL of the attachment to download.
+            filename (str): The name of the file to save the attachment to.
+            attachment_id (Optional[str]): The ID of the Trello attachment, used for the attachment cache.
+            fingerprint (Optional[Fingerprint]): The fingerprint of the attachment, used for the attachment cache.
+        """
+        try:
+            print("Downloading:", url)
+            result = self.trello.download_attachment(url, filename, attachment_id, fingerprint)
+            
+            if result.cached:
+                print(f"Unchanged: {filename} (from cache)")
+            elif result:
+                print(f"Downloaded: {filename} ({_format_size(result.bytes_written)}, {_format_size(result.throughput)}/s)")
+        except Exception as e:
+            print(f"ERROR downloading Attachment [{e}]")
+            print(f"   {url}")
+            result = DownloadResult(url, filename, False, error=str(e), attachment_id=attachment_id)
+        finally:
+            self._slots.release()
+
+        with self._lock:
+            self.results.append(result)
+            
+        if self.on_result:
+            self.on_result(result)
+
+
+def _format_size(size: float) -> str:
+    """
+    Format a byte count in a human readable unit.
+
+    Args:
+        size (float): The number of bytes.
+
+    Returns:
+        str: The formatted size, e.g. "1.5 MB".
+    """
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB":
+            break
+        
+        size /= 1024
+        
+    return f"{size:.1f} {unit}"
@@ -1,50 +1,558 @@
-from typing import Any
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from src.trello import Trello
+from src.trello import Trello, DownloadResult, RequestFailedError, BATCH_URL_LIMIT
+from src.async_trello import AsyncTrello, DEFAULT_CONCURRENCY, DEFAULT_HOST_CONCURRENCY
+from src.downloader import AttachmentDownloader, DEFAULT_DOWNLOAD_WORKERS
+from src.checkpoint import Checkpoint
+from src.card_store import CardStore, open_card_store, STORE_FILES
+from src.card_fetcher import CardPageFetcher, CardFetchError
+from src.render_pipeline import RenderPipeline
+from src.attachment_cache import get_fingerprint
 import src.file_system as file_system
 import src.file_structure as file_structure
 
 
-def export_board(trello: Trello, board_id: str) -> None:
+DEFAULT_BOARD_WORKERS = 4
+
+
+class ExportResult:
+    def __init__(self, complete: bool, attachments_downloaded: bool = True) -> None:
+        """
+        The outcome of a board export. It is truthy if the board was exported completely and all attachments were downloaded.
+
+        Args:
+            complete (bool): True if the data of the board and all of its cards was exported, so the board can be rendered.
+                             The markdown only links the attachments, failed downloads don't make the export incomplete.
+            attachments_downloaded (bool): True if all attachments were downloaded.
+        """
+        self.complete: bool = complete
+        self.attachments_downloaded: bool = attachments_downloaded
+
+
+    def __bool__(self) -> bool:
+        return self.complete and self.attachments_downloaded
+
+
+def export_board(trello: Trello, board_id: str, download_workers: int = DEFAULT_DOWNLOAD_WORKERS, bulk: bool = False,
+                 incremental: bool = False, use_async: bool = False, concurrency: int = DEFAULT_CONCURRENCY,
+                 host_concurrency: int = DEFAULT_HOST_CONCURRENCY, resume: bool = False, store: str = STORE_FILES,
+                 pipeline: Optional[RenderPipeline] = None) -> ExportResult:
     """
     Export a Trello board to the file system.
 
     Args:
         trello (Trello): The Trello instance used to fetch board data.
         board_id (str): The ID of the Trello board to export.
+        download_workers (int): The number of attachments downloaded in parallel.
+        bulk (bool): Fetch the board, its cards, lists, labels, checklists and attachment data
+                     in a single nested request instead of one request per checklist and card.
+        incremental (bool): Only fetch what changed since the last export, using the board's actions.
+                     Falls back to a full export if there is no previous export.
+        use_async (bool): Run the full export with the asyncio client (requires aiohttp). All checklist,
+                     attachment data and attachment requests run as concurrent tasks.
+        concurrency (int): The maximum number of requests in flight with use_async.
+        host_concurrency (int): The maximum number of requests in flight per host with use_async.
+        resume (bool): Continue an interrupted export instead of starting over. Cards and attachments
+                     that are recorded as done in the checkpoint manifest are skipped.
+        store (str): How the checklists and attachments data of the cards are stored: STORE_FILES
+                     (one JSON file each) or STORE_JSONL (a single JSON Lines file). Incremental updates
+                     and resumed exports keep the layout of the existing export.
+        pipeline (Optional[RenderPipeline]): Hand every card to this pipeline as soon as its data is final,
+                     so the markdown is rendered during the export and written before the downloads finish.
+                     It is only written if the export is complete, like the board created afterwards without it.
+                     Incremental updates and use_async don't use it, see RenderPipeline.done.
+
+    Returns:
+        ExportResult: Whether the board was exported completely and all attachments were downloaded.
     """
-    
-    # Cleanup if there was a previous export
-    file_system.delete_folder(file_structure.get_board_folder(board_id))
+    try:
+        if incremental:
+            sync_state_file = file_structure.get_sync_state_json_file(board_id)
+            
+            if file_system.file_exists(sync_state_file):
+                return _update_board(trello, board_id, file_system.read_file_json(sync_state_file), download_workers)
+            
+            print("No previous export found, exporting the whole board...")
+        
+        if use_async:
+            return asyncio.run(export_board_async(trello, board_id, bulk, concurrency, host_concurrency, resume, store))
+        
+        return _export_board(trello, board_id, download_workers, bulk, resume, store, pipeline)
+    except RequestFailedError as e:
+        # Neither the sync state nor the checkpoint is completed and the cards being processed aren't
+        # checkpointed, so the failed request isn't mistaken for missing data
+        print(f"ERROR: {e}")
+        return ExportResult(False)
 
-    # Create necessary folders
-    _create_folders(board_id)
+
+def _export_board(trello: Trello, board_id: str, download_workers: int, bulk: bool, resume: bool, store: str,
+                  pipeline: Optional[RenderPipeline]) -> ExportResult:
+    """
+    Export a Trello board to the file system, see export_board.
+
+    Raises:
+        RequestFailedError: If a request still fails after all retries.
+    """
+    metrics = trello.metrics
 
     # Fetch board data
     print("Getting board...")
-    board_json = trello.get_board(board_id)
-    cards_json = trello.get_all_cards(board_id)
-    lists_json = trello.get_lists(board_id)
-    labels_json = trello.get_labels(board_id)
     
+    with metrics.phase("fetch_metadata"):
+        # Remember the newest action before fetching, so changes made during the export are picked up next time
+        latest_actions = trello.get_board_actions(board_id, limit=1)
+        
+        if bulk:
+            board_json, cards_json, lists_json, labels_json, checklists_json, attachments_json = _split_board_content(
+                trello.get_board_with_content(board_id))
+        else:
+            board_json = trello.get_board(board_id)
+            lists_json = trello.get_lists(board_id)
+            labels_json = trello.get_labels(board_id)
     
-    if board_json:
-        print(f"Board Title: {board_json['name']}")
-    else:
+    
+    # The previous export is only replaced once the board could be fetched
+    if not board_json or lists_json is None or labels_json is None:
         print(f"ERROR getting Board: {board_id}")
+        return ExportResult(False)
+    
+    print(f"Board Title: {board_json['name']}")
+    checkpoint = _start_checkpoint(board_id, resume)
 
-    # Write board data to files
-    file_system.write_file_json(file_structure.get_board_json_file(board_id), board_json)
-    file_system.write_file_json(file_structure.get_cards_json_file(board_id), cards_json)
-    file_system.write_file_json(file_structure.get_lists_json_file(board_id), lists_json)
-    file_system.write_file_json(file_structure.get_labels_json_file(board_id), labels_json)
-   
-    # Process cards, checklists and attachments
-    print(f"Getting cards ({len(cards_json)})...")
+    # Write board data to files, cards.json is written while the cards arrive
+    with metrics.phase("write_files"):
+        _write_board_files(board_id, board_json, None, lists_json, labels_json)
+    
+    if pipeline:
+        pipeline.start_board(board_json, lists_json, labels_json)
+    
+    # Without bulk the cards are fetched page by page, the next page downloads while this one is processed
+    card_fetcher = None if bulk else CardPageFetcher(trello, board_id)
+    
+    # A resumed export keeps the layout the done cards were written in, open_card_store detects it
+    store_type = None if checkpoint.cards else store
+    
+    try:
+        with open_card_store(board_id, store_type) as card_store, \
+             AttachmentDownloader(trello, download_workers, _get_checkpoint_callback(checkpoint)) as downloader, \
+             file_system.open_json_array_for_writing(file_structure.get_cards_json_file(board_id)) as append_cards:
+            for cards_json in (card_fetcher.start() if card_fetcher else [cards_json]):
+                with metrics.phase("write_files"):
+                    append_cards(cards_json)
+                
+                # Process cards, checklists and attachments
+                print(f"Getting cards ({len(cards_json)})...")
+                
+                # Cards are processed in chunks so their checklists and attachments are fetched with batched requests
+                for start in range(0, len(cards_json), BATCH_URL_LIMIT):
+                    cards_chunk = cards_json[start:start + BATCH_URL_LIMIT]
+                    pending_cards = [card for card in cards_chunk if not checkpoint.is_card_done(card["id"])]
+                    
+                    if not bulk:
+                        with metrics.phase("fetch_checklists"):
+                            checklists_json, attachments_json = _get_checklists_and_attachments(trello, pending_cards)
+                    
+                    for card in cards_chunk:
+                        if checkpoint.is_card_done(card["id"]):
+                            if pipeline:
+                                pipeline.put_card(card, card_store.read_checklists(card), card_store.read_attachments(card))
+                            
+                            # Only the downloads that didn't finish last time are left
+                            _queue_downloads(downloader, board_id, card_store.read_attachments(card), checkpoint=checkpoint)
+                            continue
+                        
+                        # Failed requests raise RequestFailedError before the card is written and checkpointed,
+                        # None is data Trello doesn't have anymore, e.g. a checklist deleted during the export
+                        card_attachments_json = (attachments_json.get(card["id"]) or []) if card["badges"]["attachments"] else None
+                        
+                        with metrics.phase("write_files"):
+                            card_store.write_card(card["id"], card["idChecklists"], checklists_json, card_attachments_json)
+                        
+                        if pipeline:
+                            pipeline.put_card(card, [checklists_json.get(checklist_id) for checklist_id in card["idChecklists"]],
+                                              card_attachments_json)
+                        
+                        if card_attachments_json:
+                            # TODO: HANDLE EXTERNAL LINKS!
+                            _queue_downloads(downloader, board_id, card_attachments_json, checkpoint=checkpoint)
+                            
+                        checkpoint.mark_card_done(card["id"])
+            
+            # All cards are known, the markdown is written while the downloads go on
+            if pipeline:
+                pipeline.finish_board()
+    except CardFetchError as e:
+        # cards.json isn't written and neither the sync state nor the checkpoint is completed,
+        # so the next export fetches all cards again
+        print(f"ERROR: {e}")
+        return ExportResult(False)
+    finally:
+        if card_fetcher:
+            card_fetcher.close()
+            
+        if pipeline:
+            pipeline.close()
+            
+        checkpoint.save()
+    
+    if latest_actions is not None:
+        _write_sync_state(board_id, latest_actions)
+    
+    return ExportResult(True, _finish_checkpoint(checkpoint, _print_download_summary(downloader.results)))
+
+
+def export_boards(trello: Trello, board_ids: Iterable[str], board_workers: int = DEFAULT_BOARD_WORKERS,
+                  download_workers: int = DEFAULT_DOWNLOAD_WORKERS, bulk: bool = False, incremental: bool = False,
+                  use_async: bool = False, concurrency: int = DEFAULT_CONCURRENCY,
+                  host_concurrency: int = DEFAULT_HOST_CONCURRENCY, resume: bool = False, store: str = STORE_FILES,
+                  on_board_exported: Optional[Callable[[str], None]] = None,
+                  create_pipeline: Optional[Callable[[str], RenderPipeline]] = None) -> Dict[str, bool]:
+    """
+    Export several Trello boards concurrently.
+
+    The boards are exported on a pool of worker threads. All of them use the given Trello instance,
+    so they share its connection pool, its rate limit scheduler and its attachment cache.
+    A board that raises an error is recorded as failed, the other boards keep going.
+
+    Args:
+        trello (Trello): The Trello instance used to fetch board data.
+        board_ids (Iterable[str]): The IDs of the Trello boards to export.
+        board_workers (int): The number of boards exported in parallel.
+        on_board_exported (Optional[Callable[[str], None]]): Called on the worker thread with the board ID
+                     after a board was exported completely, e.g. to create its markdown file, also if attachment
+                     downloads failed. Not called for boards the render pipeline has created the markdown file of.
+        create_pipeline (Optional[Callable[[str], RenderPipeline]]): Creates the render pipeline of a board,
+                     see export_board.
+        
+        The remaining arguments are passed to export_board for every board.
+
+    Returns:
+        Dict[str, bool]: The success of every board, by board ID, in the given order.
+    """
+    board_ids = list(dict.fromkeys(board_ids))
+    
+    def export(board_id: str) -> Tuple[bool, float]:
+        start_time = time.perf_counter()
+        
+        try:
+            pipeline = create_pipeline(board_id) if create_pipeline else None
+            result = export_board(trello, board_id, download_workers, bulk, incremental, use_async,
+                                  concurrency, host_concurrency, resume, store, pipeline)
+            success = bool(result)
+            
+            if result.complete and on_board_exported and not (pipeline and pipeline.done):
+                on_board_exported(board_id)
+        except Exception as e:
+            print(f"ERROR exporting Board: {board_id} [{e}]")
+            success = False
+            
+        return success, time.perf_counter() - start_time
+    
+    with ThreadPoolExecutor(max_workers=max(1, board_workers), thread_name_prefix="board") as executor:
+        exports = list(executor.map(export, board_ids))
+    
+    _print_board_summary(board_ids, exports)
+    return {board_id: success for board_id, (success, _) in zip(board_ids, exports)}
+
+
+async def export_board_async(trello: Trello, board_id: str, bulk: bool = False, concurrency: int = DEFAULT_CONCURRENCY,
+                             host_concurrency: int = DEFAULT_HOST_CONCURRENCY, resume: bool = False, store: str = STORE_FILES) -> ExportResult:
+    """
+    Export a Trello board to the file system with concurrent asyncio tasks.
+    Writes the same files as export_board.
+
+    Args:
+        trello (Trello): The Trello instance used for the credentials, the rate limit and the attachment cache.
+        board_id (str): The ID of the Trello board to export.
+        bulk (bool): Fetch the board, its cards, lists, labels, checklists and attachment data in a single nested request.
+        concurrency (int): The maximum number of requests in flight.
+        host_concurrency (int): The maximum number of requests in flight per host.
+        resume (bool): Continue an interrupted export instead of starting over.
+        store (str): How the checklists and attachments data of the cards are stored, see export_board.
+
+    Returns:
+        ExportResult: Whether all cards were exported and all attachments were downloaded.
+    """
+    metrics = trello.metrics
+    
+    async with AsyncTrello(trello, concurrency, host_concurrency) as client:
+        print("Getting board...")
+        
+        with metrics.phase("fetch_metadata"):
+            # Remember the newest action before fetching, so changes made during the export are picked up next time
+            latest_actions = await client.get_board_actions(board_id, limit=1)
+            
+            if bulk:
+                board_json, cards_json, lists_json, labels_json, checklists_json, attachments_json = _split_board_content(
+                    await client.get_board_with_content(board_id))
+            else:
+                board_json, cards_json, lists_json, labels_json = await asyncio.gather(
+                    client.get_board(board_id),
+                    client.get_all_cards(board_id),
+                    client.get_lists(board_id),
+                    client.get_labels(board_id))
+                checklists_json, attachments_json = None, None
+            
+        # The previous export is only replaced once the board could be fetched
+        if not board_json or cards_json is None or lists_json is None or labels_json is None:
+            print(f"ERROR getting Board: {board_id}")
+            return ExportResult(False)
+        
+        print(f"Board Title: {board_json['name']}")
+        checkpoint = _start_checkpoint(board_id, resume)
+            
+        with metrics.phase("write_files"):
+            _write_board_files(board_id, board_json, cards_json, lists_json, labels_json)
+        
+        print(f"Getting cards ({len(cards_json)})...")
+        
+        # A resumed export keeps the layout the done cards were written in, open_card_store detects it
+        store_type = None if checkpoint.cards else store
+        
+        try:
+            # Checklists, attachment data and downloads of all cards run concurrently, so they are a single phase
+            with metrics.phase("fetch_checklists_and_download_attachments"), open_card_store(board_id, store_type) as card_store:
+                card_results = await asyncio.gather(*[
+                    _export_card_async(client, board_id, card_store, card, checklists_json, attachments_json, checkpoint)
+                    for card in cards_json])
+        finally:
+            checkpoint.save()
+    
+    failed_cards = sum(1 for results in card_results if results is None)
+    
+    if failed_cards:
+        # The failed cards aren't checkpointed, so they are fetched again by --resume
+        print(f"ERROR: Couldn't get the checklists or attachments of {failed_cards} cards")
         
-    for card in cards_json:
-        _get_checklists(trello, board_id, card["id"], card["idChecklists"])
-        _get_attachments(trello, board_id, card["id"], card["badges"]["attachments"])
+    if latest_actions is not None and not failed_cards:
+        _write_sync_state(board_id, latest_actions)
+    
+    attachments_downloaded = _print_download_summary([result for results in card_results if results for result in results])
+    _finish_checkpoint(checkpoint, attachments_downloaded and not failed_cards)
+    
+    return ExportResult(not failed_cards, attachments_downloaded)
+
+
+async def _export_card_async(client: AsyncTrello, board_id: str, card_store: CardStore, card: Any,
+                             checklists_json: Optional[Dict[str, Any]], attachments_json: Optional[Dict[str, Any]],
+                             checkpoint: Checkpoint) -> Optional[List[DownloadResult]]:
+    """
+    Fetch and write the checklists and attachments of a Trello card and download its attachments.
+    A card whose data couldn't be fetched is neither written nor checkpointed.
+
+    Args:
+        client (AsyncTrello): The asyncio client used to fetch data.
+        board_id (str): The ID of the Trello board.
+        card_store (CardStore): The store the checklists and attachments data are written to.
+        card (Any): The card data.
+        checklists_json (Optional[Dict[str, Any]]): The checklists by checklist ID, or None to fetch them.
+        attachments_json (Optional[Dict[str, Any]]): The attachments by card ID, or None to fetch them.
+        checkpoint (Checkpoint): The progress of the export. Done cards and attachments are skipped.
+
+    Returns:
+        Optional[List[DownloadResult]]: The results of the card's attachment downloads,
+                    or None if the checklists or attachments data of the card couldn't be fetched.
+    """
+    if checkpoint.is_card_done(card["id"]):
+        return await _download_attachments_async(client, board_id, card_store.read_attachments(card), checkpoint)
+    
+    try:
+        if checklists_json is None:
+            checklists = await asyncio.gather(*[client.get_checklist(checklist_id) for checklist_id in card["idChecklists"]])
+            checklists_json = dict(zip(card["idChecklists"], checklists))
+            
+        card_attachments_json = None
+        
+        # None is data Trello doesn't have anymore, e.g. a card deleted during the export
+        if card["badges"]["attachments"]:
+            if attachments_json is None:
+                card_attachments_json = await client.get_attachments(card["id"]) or []
+            else:
+                card_attachments_json = attachments_json.get(card["id"]) or []
+    except RequestFailedError as e:
+        print(f"ERROR getting Card: {card['id']} [{e}]")
+        return None
+            
+    card_store.write_card(card["id"], card["idChecklists"], checklists_json, card_attachments_json)
+    checkpoint.mark_card_done(card["id"])
+    
+    return await _download_attachments_async(client, board_id, card_attachments_json or [], checkpoint)
+
+
+async def _download_attachments_async(client: AsyncTrello, board_id: str, attachments_json: Any, checkpoint: Checkpoint) -> List[DownloadResult]:
+    """
+    Download the attachments of a card that are not downloaded yet.
+
+    Args:
+        client (AsyncTrello): The asyncio client used to download the attachments.
+        board_id (str): The ID of the Trello board.
+        attachments_json (Any): The attachments data of the card.
+        checkpoint (Checkpoint): The progress of the export. Done attachments are skipped.
+
+    Returns:
+        List[DownloadResult]: The results of the downloads.
+    """
+    results = []
+    
+    for attachment in attachments_json:
+        filename = file_structure.get_attachment_file(board_id, attachment["fileName"])
+        
+        if not checkpoint.is_attachment_done(attachment["id"], filename):
+            results.append(client.download_attachment(_get_attachment_download_url(attachment), filename, attachment["id"],
+                                                      get_fingerprint(attachment)))
+    
+    results = await asyncio.gather(*results)
+    
+    for result in results:
+        if result:
+            checkpoint.mark_attachment_done(result.attachment_id, result.filename)
+            
+    return results
+
+
+def _update_board(trello: Trello, board_id: str, sync_state: Any, download_workers: int) -> ExportResult:
+    """
+    Update an existing board export with the changes made since the last export.
+
+    Only the cards that appear in the board's actions since the last export are fetched again.
+    Their entries in cards.json, their checklist files and their attachments are replaced in place.
+
+    Args:
+        trello (Trello): The Trello instance used to fetch board data.
+        board_id (str): The ID of the Trello board to update.
+        sync_state (Any): The sync state written by the last export.
+        download_workers (int): The number of attachments downloaded in parallel.
+
+    Returns:
+        ExportResult: Whether the board was updated and all attachments were downloaded.
+    """
+    metrics = trello.metrics
+    
+    print("Getting board changes...")
+    
+    with metrics.phase("fetch_changes"):
+        actions = trello.get_board_actions(board_id, since=sync_state["last_action_id"])
+    
+    if actions is None:
+        print(f"ERROR getting changes of Board: {board_id}")
+        return ExportResult(False)
+    
+    if not actions:
+        print("Board is up to date")
+        return ExportResult(True)
+    
+    changed_card_ids = list(dict.fromkeys(
+        action["data"]["card"]["id"] for action in actions if "card" in action.get("data", {})))
+    
+    print(f"Changes: {len(actions)}, changed cards: {len(changed_card_ids)}")
+    
+    # Board, lists and labels are a single request each, so they are always refreshed.
+    # A changed card that failed to fetch raises RequestFailedError before anything is deleted
+    # or the sync state is written, None is a card Trello doesn't have anymore (404).
+    with metrics.phase("fetch_metadata"):
+        board_json = trello.get_board(board_id)
+        lists_json = trello.get_lists(board_id)
+        labels_json = trello.get_labels(board_id)
+        changed_cards_json = trello.get_cards_by_id(changed_card_ids)
+    
+    if not board_json:
+        print(f"ERROR getting Board: {board_id}")
+        return ExportResult(False)
+    
+    with metrics.phase("write_files"):
+        file_system.write_file_json(file_structure.get_board_json_file(board_id), board_json)
+        file_system.write_file_json(file_structure.get_lists_json_file(board_id), lists_json)
+        file_system.write_file_json(file_structure.get_labels_json_file(board_id), labels_json)
+    
+    cards_by_id = {card["id"]: card for card in file_system.read_file_json(file_structure.get_cards_json_file(board_id))}
+    
+    old_cards_by_id = {}
+    updated_cards = []
+    
+    # The existing export keeps its layout of the per-card data
+    with open_card_store(board_id) as card_store:
+        for card_id in changed_card_ids:
+            old_card = cards_by_id.pop(card_id, None)
+            card = changed_cards_json[card_id]
+            
+            # Deleted, archived and moved cards are not part of the export anymore
+            if card and not card["closed"] and card["idBoard"] == board_json["id"]:
+                cards_by_id[card_id] = card
+                updated_cards.append(card)
+                old_cards_by_id[card_id] = old_card
+            elif old_card:
+                _delete_card_files(board_id, card_store, old_card)
+        
+        # Keep the card order Trello uses on the board
+        cards_json = sorted(cards_by_id.values(), key=lambda card: card["pos"])
+        
+        with metrics.phase("write_files"):
+            file_system.write_file_json(file_structure.get_cards_json_file(board_id), cards_json)
+        
+        with AttachmentDownloader(trello, download_workers) as downloader:
+            for start in range(0, len(updated_cards), BATCH_URL_LIMIT):
+                cards_chunk = updated_cards[start:start + BATCH_URL_LIMIT]
+                
+                with metrics.phase("fetch_checklists"):
+                    checklists_json, attachments_json = _get_checklists_and_attachments(trello, cards_chunk)
+                
+                for card in cards_chunk:
+                    card_attachments_json = (attachments_json.get(card["id"]) or []) if card["badges"]["attachments"] else None
+                    
+                    if old_cards_by_id[card["id"]]:
+                        # Attachments the card still has are kept, so they don't have to be downloaded again
+                        kept_attachment_ids = {attachment["id"] for attachment in card_attachments_json or []}
+                        _delete_card_files(board_id, card_store, old_cards_by_id[card["id"]], kept_attachment_ids)
+                    
+                    with metrics.phase("write_files"):
+                        card_store.write_card(card["id"], card["idChecklists"], checklists_json, card_attachments_json)
+                    
+                    if card_attachments_json:
+                        _queue_downloads(downloader, board_id, card_attachments_json, skip_existing=True)
+    
+    attachments_downloaded = _print_download_summary(downloader.results)
+    
+    # After failed downloads the same actions are processed again next time, which retries the missing attachments
+    if attachments_downloaded:
+        _write_sync_state(board_id, actions)
+    
+    return ExportResult(True, attachments_downloaded)
+
+
+def _delete_card_files(board_id: str, card_store: CardStore, card: Any, kept_attachment_ids: Optional[Set[str]] = None) -> None:
+    """
+    Delete the checklists data, the attachments data and the attachments of an exported card.
+
+    Args:
+        board_id (str): The ID of the Trello board.
+        card_store (CardStore): The store of the per-card data of the board.
+        card (Any): The card as it was exported.
+        kept_attachment_ids (Optional[Set[str]]): The IDs of the attachments whose files are not deleted.
+    """
+    for attachment in card_store.read_attachments(card):
+        if not kept_attachment_ids or attachment["id"] not in kept_attachment_ids:
+            file_system.delete_file(file_structure.get_attachment_file(board_id, attachment["fileName"]))
+            
+    card_store.delete_card(card)
+
+
+def _write_sync_state(board_id: str, actions: Any) -> None:
+    """
+    Write the newest board action as the starting point for the next incremental export.
+
+    Args:
+        board_id (str): The ID of the Trello board.
+        actions (Any): The board actions, newest first.
+    """
+    sync_state = {
+        "last_action_id": actions[0]["id"] if actions else None,
+        "last_action_date": actions[0]["date"] if actions else None
+    }
+    
+    file_system.write_file_json(file_structure.get_sync_state_json_file(board_id), sync_state)
         
         
 def _create_folders(board_id: str) -> None:
@@ -66,48 +574,206 @@ def _create_folders(board_id: str) -> None:
         file_system.create_folder(folder)
 
 
-def _get_checklists(trello: Trello, board_id: str, card_id: str, checklists: Any) -> None:
+def _get_checklists_and_attachments(trello: Trello, cards: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
-    Fetch and write checklists data for a Trello card to the file system.
+    Fetch the checklists and attachments data for several Trello cards.
 
     Args:
         trello (Trello): An instance of the Trello class used to fetch data.
-        board_id (str): The ID of the Trello board.
-        card_id (str): The ID of the Trello card.
-        checklists (Any): The checklists data associated with the card.
+        cards (Any): The cards whose checklists and attachments are fetched.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: The checklists by checklist ID and the attachments by card ID.
     """
-    if checklists:
-        file_system.write_file_json(file_structure.get_checklists_for_card_json_file(board_id, card_id), checklists)
+    checklist_ids = [checklist_id for card in cards for checklist_id in card["idChecklists"]]
+    card_ids_with_attachments = [card["id"] for card in cards if card["badges"]["attachments"]]
+    
+    return (trello.get_checklists(checklist_ids), trello.get_attachments_for_cards(card_ids_with_attachments))
+
+
+def _write_board_files(board_id: str, board_json: Any, cards_json: Optional[Any], lists_json: Any, labels_json: Any) -> None:
+    """
+    Write the board, cards, lists and labels data of a Trello board to the file system.
 
-        for checklist_id in checklists:
-            checklist_json = trello.get_checklist(checklist_id)
-            file_system.write_file_json(
-                file_structure.get_checklist_json_file(board_id, checklist_id),
-                checklist_json)
+    Args:
+        board_id (str): The ID of the Trello board.
+        board_json (Any): The board data.
+        cards_json (Optional[Any]): The cards data, None if cards.json is written separately.
+        lists_json (Any): The lists data.
+        labels_json (Any): The labels data.
+    """
+    file_system.write_file_json(file_structure.get_board_json_file(board_id), board_json)
+    
+    if cards_json is not None:
+        file_system.write_file_json(file_structure.get_cards_json_file(board_id), cards_json)
+        
+    file_system.write_file_json(file_structure.get_lists_json_file(board_id), lists_json)
+    file_system.write_file_json(file_structure.get_labels_json_file(board_id), labels_json)
 
 
-def _get_attachments(trello: Trello, board_id: str, card_id: str, attachments: Any) -> None:
+def _queue_downloads(downloader: AttachmentDownloader, board_id: str, attachments_json: Any,
+                     skip_existing: bool = False, checkpoint: Optional[Checkpoint] = None) -> None:
     """
-    Fetch and write attachments data for a Trello card to the file system.
+    Queue the attachments of a Trello card for download.
 
     Args:
-        trello (Trello): An instance of the Trello class used to fetch data.
+        downloader (AttachmentDownloader): The worker pool the attachment downloads are queued in.
         board_id (str): The ID of the Trello board.
-        card_id (str): The ID of the Trello card.
-        attachments (Any): The attachments data associated with the card.
+        attachments_json (Any): The attachments data of the card.
+        skip_existing (bool): Don't download attachments whose file already exists.
+        checkpoint (Optional[Checkpoint]): Don't download attachments that are recorded as done.
+    """
+    for attachment in attachments_json:
+        url = _get_attachment_download_url(attachment)
+        filename = file_structure.get_attachment_file(board_id, attachment["fileName"])
+        
+        if skip_existing and file_system.file_exists(filename):
+            continue
+        
+        if checkpoint and checkpoint.is_attachment_done(attachment["id"], filename):
+            continue
+        
+        # Temporary errors are retried by the RequestScheduler, failed downloads are retried by --resume
+        downloader.queue(url, filename, attachment["id"], get_fingerprint(attachment))
+
+
+def _start_checkpoint(board_id: str, resume: bool) -> Checkpoint:
     """
-    if attachments:
-        # TODO: HANDLE EXTERNAL LINKS!
-        attachments_json = trello.get_attachments(card_id)
+    Prepare the board folder for an export and load or create its checkpoint manifest.
 
-        file_system.write_file_json(file_structure.get_attachments_for_card_json_file(board_id, card_id), attachments_json)
+    Args:
+        board_id (str): The ID of the Trello board.
+        resume (bool): Continue an interrupted export if there is one.
+
+    Returns:
+        Checkpoint: The checkpoint manifest of the export.
+    """
+    checkpoint = Checkpoint(board_id)
+    
+    if resume and checkpoint.can_resume():
+        print(f"Resuming export ({len(checkpoint.cards)} cards and {len(checkpoint.attachments)} attachments done)...")
+    else:
+        if resume:
+            print("No interrupted export found, exporting the whole board...")
         
-        for attachment in attachments_json:
-            url:str = attachment["url"].replace("trello.com", "api.trello.com")                
+        # Cleanup if there was a previous export
+        file_system.delete_folder(file_structure.get_board_folder(board_id))
+        checkpoint = Checkpoint(board_id)
+    
+    # Create necessary folders
+    _create_folders(board_id)
+    checkpoint.save()
+    
+    return checkpoint
+
+
+def _get_checkpoint_callback(checkpoint: Checkpoint) -> Callable[[DownloadResult], None]:
+    """
+    Get a callback that records successful downloads in the checkpoint manifest.
+
+    Args:
+        checkpoint (Checkpoint): The checkpoint manifest of the export.
+
+    Returns:
+        Callable[[DownloadResult], None]: The callback for the AttachmentDownloader.
+    """
+    def on_result(result: DownloadResult) -> None:
+        if result:
+            checkpoint.mark_attachment_done(result.attachment_id, result.filename)
             
-            print("Downloading:", url)
-            # TODO: Retry download if it failed
-            trello.download_attachment(
-                url,
-                file_structure.get_attachment_file(board_id, attachment["fileName"]))
+    return on_result
+
+
+def _finish_checkpoint(checkpoint: Checkpoint, success: bool) -> bool:
+    """
+    Mark the export as complete in the checkpoint manifest if everything was downloaded.
+    Otherwise the export can be resumed to retry the failed cards and downloads.
+
+    Args:
+        checkpoint (Checkpoint): The checkpoint manifest of the export.
+        success (bool): True if all attachments were downloaded.
+
+    Returns:
+        bool: The given success value.
+    """
+    if success:
+        checkpoint.complete = True
+        checkpoint.save()
+    else:
+        print("Run again with --resume to retry the failed cards and downloads.")
+        
+    return success
+
 
+def _split_board_content(board_json: Optional[Any]) -> Tuple[Any, Any, Any, Any, Dict[str, Any], Dict[str, Any]]:
+    """
+    Split the response of a nested board request into the same data the single requests return.
+
+    Args:
+        board_json (Optional[Any]): The board with its nested lists, labels, cards and checklists.
+
+    Returns:
+        Tuple[Any, Any, Any, Any, Dict[str, Any], Dict[str, Any]]: The board, cards, lists and labels data,
+            the checklists by checklist ID and the attachments by card ID.
+    """
+    if not board_json:
+        return (board_json, [], [], [], {}, {})
+    
+    board_json = dict(board_json)
+    cards_json = board_json.pop("cards", [])
+    lists_json = board_json.pop("lists", [])
+    labels_json = board_json.pop("labels", [])
+    checklists_json = {checklist["id"]: checklist for checklist in board_json.pop("checklists", [])}
+    attachments_json = {card["id"]: card.pop("attachments", []) for card in cards_json}
+    
+    return (board_json, cards_json, lists_json, labels_json, checklists_json, attachments_json)
+
+
+def _get_attachment_download_url(attachment: Any) -> str:
+    """
+    Get the URL an attachment is downloaded from.
+
+    Args:
+        attachment (Any): The attachment data.
+
+    Returns:
+        str: The download URL through the Trello API.
+    """
+    return attachment["url"].replace("trello.com", "api.trello.com")
+
+
+def _print_download_summary(results: List[DownloadResult]) -> bool:
+    """
+    Print how many attachments were downloaded and list the ones that failed.
+
+    Args:
+        results (List[DownloadResult]): The results of all attachment downloads.
+
+    Returns:
+        bool: True if all attachments were downloaded, False otherwise.
+    """
+    failed = [result for result in results if not result.success]
+    cached = sum(1 for result in results if result.cached)
+    total_bytes = sum(result.bytes_written for result in results)
+    print(f"Downloaded attachments: {len(results) - len(failed)}/{len(results)} ({total_bytes} bytes, {cached} unchanged from cache)")
+    
+    for result in failed:
+        print(f"   FAILED: {result.filename} ({result.url})")
+        
+    return not failed
+
+
+def _print_board_summary(board_ids: List[str], exports: List[Tuple[bool, float]]) -> None:
+    """
+    Print the outcome of every board of a multi-board export.
+
+    Args:
+        board_ids (List[str]): The IDs of the exported boards.
+        exports (List[Tuple[bool, float]]): The success and the duration in seconds of every board export.
+    """
+    failed = sum(1 for success, _ in exports if not success)
+    print(f"Exported boards: {len(board_ids) - failed}/{len(board_ids)}")
+    
+    for board_id, (success, seconds) in zip(board_ids, exports):
+        status = "OK" if success else "FAILED"
+        print(f"   {status.ljust(6)} {board_id} ({seconds:.1f}s)")
@@ -7,14 +7,26 @@ import os
 # │   │   │   └── media files
 # │   │   ├── checklists
 # │   │   │   └── checklists_cardid.json
+# │   │   ├── cards_data.jsonl (with --store jsonl, replaces the checklists and attachments_cardid.json files)
+# │   │   ├── cards_data_index.json
 # │   │   ├── board.json
 # │   │   ├── lists.json
 # │   │   ├── cards.json
-# │   │   └── labels.json
+# │   │   ├── labels.json
+# │   │   ├── sync.json
+# │   │   └── checkpoint.json
+# ├── cache
+# │   ├── attachments
+# │   │   ├── index.json
+# │   │   └── content hash named files
+# │   └── render
+# │       └── board_id.json
 
 BOARDS_FOLDER = "boards"
 ATTACHMENTS_FOLDER = "attachments"
 CHECKLISTS_FOLDER = "checklists"
+CACHE_FOLDER = "cache"
+RENDER_CACHE_FOLDER = "render"
 
 
 def get_board_folder(board_id: str) -> str:
@@ -108,6 +120,58 @@ def get_labels_json_file(board_id: str) -> str:
     return os.path.join(get_board_folder(board_id), "labels.json")
 
 
+def get_sync_state_json_file(board_id: str) -> str:
+    """
+    Get the file path for the JSON file containing the newest board action of the last export.
+
+    Args:
+        board_id (str): The ID of the board.
+
+    Returns:
+        str: The file path for the JSON file containing the sync state.
+    """
+    return os.path.join(get_board_folder(board_id), "sync.json")
+
+
+def get_checkpoint_json_file(board_id: str) -> str:
+    """
+    Get the file path for the JSON file recording the progress of an export.
+
+    Args:
+        board_id (str): The ID of the board.
+
+    Returns:
+        str: The file path for the checkpoint manifest.
+    """
+    return os.path.join(get_board_folder(board_id), "checkpoint.json")
+
+
+def get_card_store_file(board_id: str) -> str:
+    """
+    Get the file path for the JSON Lines file containing the checklists and attachments of all cards.
+
+    Args:
+        board_id (str): The ID of the board.
+
+    Returns:
+        str: The file path for the JSON Lines card store.
+    """
+    return os.path.join(get_board_folder(board_id), "cards_data.jsonl")
+
+
+def get_card_store_index_file(board_id: str) -> str:
+    """
+    Get the file path for the JSON file containing the offset of every card in the JSON Lines card store.
+
+    Args:
+        board_id (str): The ID of the board.
+
+    Returns:
+        str: The file path for the card store index.
+    """
+    return os.path.join(get_board_folder(board_id), "cards_data_index.json")
+
+
 def get_checklists_for_card_json_file(board_id: str, card_id: str) -> str:
     """
     Get the file path for the JSON file containing checklists for a specific card.
@@ -161,4 +225,60 @@ def get_attachment_file(board_id: str, attachment_filename: str) -> str:
     Returns:
         str: The file path for the attachment.
     """
-    return os.path.join(get_attachment_folder(board_id), attachment_filename)
\ No newline at end of file
+    return os.path.join(get_attachment_folder(board_id), attachment_filename)
+
+
+def get_attachment_cache_folder() -> str:
+    """
+    Get the folder path of the attachment cache that is shared by all boards.
+
+    Returns:
+        str: The folder path of the attachment cache.
+    """
+    return os.path.join(CACHE_FOLDER, ATTACHMENTS_FOLDER)
+
+
+def get_attachment_cache_index_file() -> str:
+    """
+    Get the file path for the JSON file containing the index of the attachment cache.
+
+    Returns:
+        str: The file path for the attachment cache index.
+    """
+    return os.path.join(get_attachment_cache_folder(), "index.json")
+
+
+def get_attachment_cache_file(content_hash: str) -> str:
+    """
+    Get the file path for a cached attachment.
+
+    Args:
+        content_hash (str): The SHA-256 hash of the attachment's content.
+
+    Returns:
+        str: The file path for the cached attachment.
+    """
+    return os.path.join(get_attachment_cache_folder(), content_hash)
+
+
+def get_render_cache_folder() -> str:
+    """
+    Get the folder path of the render cache.
+
+    Returns:
+        str: The folder path of the render cache.
+    """
+    return os.path.join(CACHE_FOLDER, RENDER_CACHE_FOLDER)
+
+
+def get_render_cache_file(board_id: str) -> str:
+    """
+    Get the file path for the JSON file containing the rendered markdown of the cards of a board.
+
+    Args:
+        board_id (str): The ID of the board.
+
+    Returns:
+        str: The file path for the render cache of the board.
+    """
+    return os.path.join(get_render_cache_folder(), f"{board_id}.json")
@@ -1,7 +1,14 @@
 import os
+import re
 import shutil
 import json
-from typing import Any
+import uuid
+from contextlib import contextmanager, suppress
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, TextIO, Tuple
+
+
+JSON_READ_CHUNK_SIZE = 64 * 1024
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
 
 
 def create_folder(path:str) -> None:
@@ -26,6 +33,30 @@ def delete_folder(path: str) -> None:
         shutil.rmtree(path)
 
 
+def file_exists(file_path: str) -> bool:
+    """
+    Check if a file exists at the given path.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        bool: True if the file exists, False otherwise.
+    """
+    return os.path.isfile(file_path)
+
+
+def delete_file(file_path: str) -> None:
+    """
+    Delete a file at the given path if it exists. A symbolic link is deleted itself, even if its target is gone.
+
+    Args:
+        file_path (str): The path of the file to delete.
+    """
+    if os.path.isfile(file_path) or os.path.islink(file_path):
+        os.remove(file_path)
+
+
 def write_file(file_path: str, file_content: str) -> None:
     """
     Write data to a file.
@@ -38,6 +69,95 @@ def write_file(file_path: str, file_content: str) -> None:
         file.write(file_content)
 
 
+def write_file_stream(file_path: str, chunks: Iterable[bytes]) -> int:
+    """
+    Write binary chunks to a temporary file next to the target and rename it into place once complete.
+    An interrupted write never leaves a partial file at the target path.
+
+    Args:
+        file_path (str): The path of the file to write to.
+        chunks (Iterable[bytes]): The chunks to write.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    temp_path = _get_temp_path(file_path)
+    bytes_written = 0
+    
+    try:
+        with open(temp_path, 'xb') as file:
+            for chunk in chunks:
+                if chunk:
+                    file.write(chunk)
+                    bytes_written += len(chunk)
+                
+        os.replace(temp_path, file_path)
+    except BaseException:
+        # The temporary file doesn't exist if it couldn't be created, the original error is raised
+        with suppress(FileNotFoundError):
+            os.remove(temp_path)
+            
+        raise
+    
+    return bytes_written
+
+
+@contextmanager
+def open_text_file_for_writing(file_path: str, buffer_size: int = 1024 * 1024) -> Iterator[TextIO]:
+    """
+    Open a buffered text file for incremental writing. The content is written to a temporary file
+    next to the target, which replaces the target once the block finishes without an error.
+
+    Args:
+        file_path (str): The path of the file to write to.
+        buffer_size (int): The size of the write buffer in bytes.
+
+    Yields:
+        TextIO: The file to write to.
+    """
+    temp_path = _get_temp_path(file_path)
+    
+    try:
+        with open(temp_path, 'x', encoding='utf-8', buffering=buffer_size) as file:
+            yield file
+            
+        os.replace(temp_path, file_path)
+    except BaseException:
+        # The temporary file doesn't exist if it couldn't be created, the original error is raised
+        with suppress(FileNotFoundError):
+            os.remove(temp_path)
+            
+        raise
+
+
+@contextmanager
+def open_json_array_for_writing(file_path: str) -> Iterator[Callable[[Iterable[Any]], None]]:
+    """
+    Open a JSON array file for appending elements while they arrive, see open_text_file_for_writing.
+    The file has the same content as write_file_json with all elements.
+
+    Args:
+        file_path (str): The path of the JSON file to write to.
+
+    Yields:
+        Callable[[Iterable[Any]], None]: Appends elements to the array.
+    """
+    with open_text_file_for_writing(file_path) as file:
+        separator = ""
+        file.write("[")
+        
+        def append(elements: Iterable[Any]) -> None:
+            nonlocal separator
+            
+            for element in elements:
+                file.write(separator)
+                file.write(json.dumps(element, ensure_ascii=False))
+                separator = ", "
+        
+        yield append
+        file.write("]")
+
+
 def read_file(file_path: str) -> str:
     """
     Read data from a file.
@@ -76,3 +196,115 @@ def read_file_json(file_path: str) -> Any:
     """
     with open(file_path, 'r', encoding='utf-8') as file:
         return json.load(file)
+
+
+def read_file_json_array(file_path: str, fields: Optional[Sequence[str]] = None,
+                         chunk_size: int = JSON_READ_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Read the elements of a JSON array file one at a time.
+
+    The file is read in chunks and only the element that is being decoded is held in memory,
+    so huge arrays (e.g. cards.json) can be processed without loading the whole file.
+
+    Args:
+        file_path (str): The path of the JSON file to read from. It must contain an array.
+        fields (Optional[Sequence[str]]): Only keep these keys of every element (elements must be objects).
+                    Omit to keep the elements as they are.
+        chunk_size (int): The number of characters read at a time.
+
+    Yields:
+        Any: The elements of the array in order.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    end_of_file = False
+    started = False
+    expect_element = True
+    
+    with open(file_path, 'r', encoding='utf-8') as file:
+        while True:
+            position = JSON_WHITESPACE.match(buffer, position).end()
+            
+            if position == len(buffer):
+                if end_of_file:
+                    raise ValueError(f"Unexpected end of the JSON array in {file_path}")
+                
+                buffer, position, end_of_file = _read_json_chunk(file, buffer, position, chunk_size)
+                continue
+            
+            token = buffer[position]
+            
+            if not started:
+                if token != "[":
+                    raise ValueError(f"Expected a JSON array in {file_path}")
+                
+                started = True
+                position += 1
+            elif token == "]":
+                return
+            elif not expect_element:
+                if token != ",":
+                    raise ValueError(f"Expected ',' or ']' in the JSON array in {file_path}")
+                
+                expect_element = True
+                position += 1
+            else:
+                try:
+                    element, element_end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    element_end = None
+                
+                # The element is complete once the "," or "]" after it is in the buffer.
+                # A cut off number (e.g. "1" of "1.5e3") decodes without an error.
+                if element_end is not None:
+                    delimiter = JSON_WHITESPACE.match(buffer, element_end).end()
+                    complete = buffer[delimiter:delimiter + 1] in (",", "]")
+                
+                if element_end is None or not complete:
+                    if end_of_file:
+                        raise ValueError(f"Invalid element in the JSON array in {file_path}")
+                    
+                    buffer, position, end_of_file = _read_json_chunk(file, buffer, position, chunk_size)
+                    continue
+                
+                position = element_end
+                expect_element = False
+                
+                if fields is not None:
+                    element = {key: element[key] for key in fields if key in element}
+                    
+                yield element
+
+
+def _read_json_chunk(file: TextIO, buffer: str, position: int, chunk_size: int) -> Tuple[str, int, bool]:
+    """
+    Drop the consumed part of the buffer and append the next chunk of the file.
+    At least as much as is left in the buffer is read, so elements spanning many chunks are decoded
+    a logarithmic number of times instead of once per chunk.
+
+    Args:
+        file (TextIO): The file that is read.
+        buffer (str): The buffer.
+        position (int): The position of the first unconsumed character in the buffer.
+        chunk_size (int): The minimum number of characters to read.
+
+    Returns:
+        Tuple[str, int, bool]: The new buffer, the new position and whether the end of the file was reached.
+    """
+    chunk = file.read(max(chunk_size, len(buffer) - position))
+    return buffer[position:] + chunk, 0, not chunk
+
+
+def _get_temp_path(file_path: str) -> str:
+    """
+    Get a unique path for a temporary file next to the given file.
+
+    Args:
+        file_path (str): The path of the file that is written.
+
+    Returns:
+        str: The path of the temporary file.
+    """
+    folder, name = os.path.split(file_path)
+    return os.path.join(folder, f".{name}.{uuid.uuid4().hex}.part")
@@ -12,9 +12,14 @@ from typing import List, Any
                     - ChecklistItems
         
         - List of all defined Labels
+        
+    All classes use __slots__, so the objects have no per-instance __dict__.
+    Large boards hold hundreds of thousands of cards and checklist items.
 """
 
 class Board:
+    __slots__ = ("board_id", "title", "lists", "labels")
+    
     def __init__(self, board_id: str, title: str) -> None:
         self.board_id: str = board_id        
         self.title: str = title
@@ -23,6 +28,8 @@ class Board:
 
 
 class BoardList:
+    __slots__ = ("id", "title", "cards")
+    
     def __init__(self, id: str, title: str) -> None:
         self.id: str = id
         self.title: str = title
@@ -30,6 +37,8 @@ class BoardList:
 
 
 class Card:
+    __slots__ = ("card_id", "title", "description", "labels", "attachments", "checklists")
+    
     def __init__(self, card_id: str, title: str, description: str) -> None:
         self.card_id: str = card_id
         self.title: str = title
@@ -40,18 +49,24 @@ class Card:
         
         
 class Checklist:
+    __slots__ = ("title", "items")
+    
     def __init__(self, title: str) -> None:
         self.title: str = title
         self.items: List[ChecklistItem] = []
         
 
 class ChecklistItem:
+    __slots__ = ("checked", "text")
+    
     def __init__(self, text: str = "", checked: bool = False) -> None:
         self.checked: bool = checked
         self.text: str = text
         
 
 class Label:
+    __slots__ = ("title", "color_name")
+    
     def __init__(self, title: str, color_name: str) -> None:
         self.title: str = title
         self.color_name: str = color_name
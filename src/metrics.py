@@ -0,0 +1,200 @@
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import src.file_system as file_system
+
+
+# IDs in URL paths are replaced, so all requests of the same kind are counted as one endpoint
+ID_PATTERN = re.compile(r"/[0-9a-f]{24}(?=/|$)")
+
+PERCENTILES = [50, 90, 99]
+
+
+class Metrics:
+    def __init__(self) -> None:
+        """
+        Set up a thread-safe collector for the timing and request metrics of an export.
+
+        Phases are timed with the phase() context manager. The time of a phase that runs
+        several times (e.g. once per board) is added up. Requests are recorded per endpoint.
+        """
+        self.phases: Dict[str, float] = {}
+        self.requests: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.counters: Dict[str, int] = {}
+        self.bytes_downloaded = 0
+        self._start_time = time.perf_counter()
+        self._lock = threading.Lock()
+
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a phase of the export, e.g. "fetch_metadata".
+
+        Args:
+            name (str): The name of the phase.
+        """
+        start_time = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start_time
+
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+    def record_request(self, endpoint: str, seconds: float, status: Any) -> None:
+        """
+        Record the latency and the result of a request.
+
+        Args:
+            endpoint (str): The endpoint of the request, see get_endpoint.
+            seconds (float): The time until the response headers arrived.
+            status (Any): The HTTP status code, or the name of the error if there was no response.
+        """
+        with self._lock:
+            self.requests.setdefault(endpoint, []).append(seconds)
+            statuses = self.statuses.setdefault(endpoint, {})
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+
+    def record_download(self, size: int) -> None:
+        """
+        Record the bytes of a downloaded attachment.
+
+        Args:
+            size (int): The number of bytes written.
+        """
+        with self._lock:
+            self.bytes_downloaded += size
+
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Add to a counter, e.g. "retries".
+
+        Args:
+            name (str): The name of the counter.
+            amount (int): The amount to add.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        Get all metrics collected so far.
+
+        Returns:
+            Dict[str, Any]: The metrics as JSON serializable data. Times are in seconds.
+        """
+        with self._lock:
+            endpoints = {}
+
+            for endpoint, latencies in sorted(self.requests.items()):
+                latencies = sorted(latencies)
+                endpoints[endpoint] = {
+                    "count": len(latencies),
+                    "statuses": dict(self.statuses[endpoint]),
+                    "total_seconds": sum(latencies),
+                    "max_seconds": latencies[-1],
+                    **{f"p{percentile}_seconds": _get_percentile(latencies, percentile) for percentile in PERCENTILES}
+                }
+
+            return {
+                "wall_seconds": time.perf_counter() - self._start_time,
+                "phases": dict(self.phases),
+                "requests": sum(endpoint["count"] for endpoint in endpoints.values()),
+                "endpoints": endpoints,
+                "bytes_downloaded": self.bytes_downloaded,
+                "counters": dict(self.counters),
+                "peak_rss_bytes": get_peak_rss()
+            }
+
+
+    def save(self, file_path: str) -> None:
+        """
+        Write the metrics to a JSON file.
+
+        Args:
+            file_path (str): The path of the JSON file.
+        """
+        file_system.write_file_json(file_path, self.get_report())
+
+
+    def print_summary(self) -> None:
+        """
+        Print a human-readable summary of the metrics.
+        """
+        report = self.get_report()
+        peak_rss = report["peak_rss_bytes"]
+
+        print(f"Metrics: {report['wall_seconds']:.2f}s, {report['requests']} requests, "
+              f"{report['bytes_downloaded'] / 1024 / 1024:.1f} MB downloaded"
+              + (f", peak RSS {peak_rss / 1024 / 1024:.0f} MB" if peak_rss else ""))
+
+        for name, seconds in report["phases"].items():
+            print(f"   {name.ljust(24)} {seconds:9.2f}s")
+
+        for endpoint, stats in report["endpoints"].items():
+            print(f"   {endpoint.ljust(40)} {stats['count']:6} requests, p50 {stats['p50_seconds'] * 1000:7.1f}ms, "
+                  f"p90 {stats['p90_seconds'] * 1000:7.1f}ms, p99 {stats['p99_seconds'] * 1000:7.1f}ms")
+
+        for name, value in report["counters"].items():
+            print(f"   {name.ljust(24)} {value:9}")
+
+
+def get_endpoint(url_path: str) -> str:
+    """
+    Get the endpoint of an API request path by replacing the IDs in it.
+
+    Args:
+        url_path (str): The path of the request, e.g. "/boards/5f1c.../cards".
+
+    Returns:
+        str: The endpoint, e.g. "/boards/{id}/cards".
+    """
+    return ID_PATTERN.sub("/{id}", url_path)
+
+
+def get_peak_rss() -> Optional[int]:
+    """
+    Get the peak resident set size of the process.
+
+    Returns:
+        Optional[int]: The peak RSS in bytes, or None if the platform doesn't report it.
+    """
+    if resource is None:
+        return None
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _get_percentile(sorted_values: List[float], percentile: int) -> float:
+    """
+    Get a percentile of sorted values (nearest rank).
+
+    Args:
+        sorted_values (List[float]): The values in ascending order, at least one.
+        percentile (int): The percentile, 0 to 100.
+
+    Returns:
+        float: The value at the percentile.
+    """
+    index = max(0, -(-len(sorted_values) * percentile // 100) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
@@ -0,0 +1,117 @@
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from src.kanban_board import Card
+import src.file_system as file_system
+import src.file_structure as file_structure
+
+
+class RenderCache:
+    def __init__(self, board_id: str, renderer_version: int) -> None:
+        """
+        Load the persistent cache of the rendered markdown of the cards of a board.
+
+        Every entry is keyed by the card ID and a hash of everything the markdown of the card is made of
+        (see get_card_hash), so an unchanged card reuses its markdown and a changed card is rendered again.
+        The cache only keeps the cards of the last render, cards that disappeared are evicted on save.
+        A cache written by another renderer version is discarded.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+            renderer_version (int): The version of the markdown format, see RENDERER_VERSION.
+        """
+        self.board_id = board_id
+        self.renderer_version = renderer_version
+        self.hits = 0
+        self.misses = 0
+        # Card ID -> [hash, markdown] of the last render and of this render
+        self._entries: Dict[str, List[str]] = {}
+        self._used_entries: Dict[str, List[str]] = {}
+        self._changed = False
+
+        cache_file = file_structure.get_render_cache_file(board_id)
+
+        if file_system.file_exists(cache_file):
+            cache = file_system.read_file_json(cache_file)
+
+            if cache.get("version") == renderer_version:
+                self._entries = cache["cards"]
+
+
+    def get(self, card_id: str, card_hash: str) -> Optional[str]:
+        """
+        Get the cached markdown of a card.
+
+        Args:
+            card_id (str): The ID of the Trello card.
+            card_hash (str): The hash of the card, see get_card_hash.
+
+        Returns:
+            Optional[str]: The markdown, or None if the card is not cached or has changed.
+        """
+        entry = self._entries.get(card_id)
+
+        if entry and entry[0] == card_hash:
+            self.hits += 1
+            self._used_entries[card_id] = entry
+            return entry[1]
+
+        self.misses += 1
+        return None
+
+
+    def put(self, card_id: str, card_hash: str, markdown: str) -> None:
+        """
+        Add the markdown of a rendered card.
+
+        Args:
+            card_id (str): The ID of the Trello card.
+            card_hash (str): The hash of the card, see get_card_hash.
+            markdown (str): The markdown of the card.
+        """
+        self._used_entries[card_id] = [card_hash, markdown]
+        self._changed = True
+
+
+    def save(self) -> None:
+        """
+        Write the cards of this render to the cache file. Cards that were not rendered this time are evicted.
+        The file is only written if a card was rendered again or evicted.
+        """
+        changed = self._changed or len(self._used_entries) != len(self._entries)
+        self._entries = self._used_entries
+        self._used_entries = {}
+        self._changed = False
+
+        if not changed:
+            return
+
+        file_system.create_folder(file_structure.get_render_cache_folder())
+        file_system.write_file_json(file_structure.get_render_cache_file(self.board_id), {
+            "version": self.renderer_version,
+            "cards": self._entries
+        })
+
+
+def get_card_hash(card: Card, renderer_version: int) -> str:
+    """
+    Get a hash of everything the markdown of a card is made of.
+
+    Args:
+        card (Card): The card.
+        renderer_version (int): The version of the markdown format.
+
+    Returns:
+        str: The hex digest of the title, description, labels, attachments, checklists and renderer version.
+    """
+    # Separators that can't appear in Trello texts keep e.g. the title "a" + description "b" apart from "ab" + ""
+    parts: List[Any] = [str(renderer_version), card.title, card.description, "\x01"]
+    parts.extend(str(label) for label in card.labels)
+    parts.append("\x01")
+    parts.extend(card.attachments)
+
+    for checklist in card.checklists:
+        parts.append("\x02" + checklist.title)
+        parts.extend(("\x03" if item.checked else "\x04") + item.text for item in checklist.items)
+
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()
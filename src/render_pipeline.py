@@ -0,0 +1,148 @@
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.create_obsidian_kanban_board import ObsidianKanban, CARD_FIELDS
+from src.kanban_board import Board
+
+
+# Cards waiting to be rendered, the exporter blocks while the renderer is this far behind
+MAX_PENDING_CARDS = 1000
+
+# Put on the queue after the last card, or to stop without writing the markdown
+_FINISH = object()
+_CANCEL = object()
+
+
+class RenderPipeline:
+    def __init__(self, kanban: ObsidianKanban, board_id: str) -> None:
+        """
+        Render the cards of a board while it is exported.
+
+        The exporter hands over every card as soon as its checklists and attachments data are final
+        (see exporter.export_board). A background thread turns it into a Card and renders its markdown
+        right away. After the last card the markdown file is written, while the attachment downloads
+        still run. The markdown only links the attachments, so it doesn't wait for them.
+
+        This is the same policy as without the pipeline (see exporter.ExportResult.complete): the board is
+        created once all cards are exported, also if attachment downloads fail afterwards. An export that
+        stops before the last card never writes the markdown.
+
+        Exports that don't fetch all cards (incremental updates) don't feed the pipeline,
+        `done` is False afterwards and the board has to be rendered with ObsidianKanban.export.
+
+        Args:
+            kanban (ObsidianKanban): Loads and renders the cards.
+            board_id (str): The ID of the Trello board.
+        """
+        self.kanban = kanban
+        self.board_id = board_id
+        self.done = False
+        self._board: Optional[Board] = None
+        self._label_names: Dict[str, str] = {}
+        # List ID -> (position, markdown) of the rendered cards
+        self._rendered_cards: Dict[str, List[Tuple[float, str]]] = {}
+        self._cards: queue.Queue = queue.Queue(MAX_PENDING_CARDS)
+        self._thread = threading.Thread(target=self._render_cards, name="render", daemon=True)
+        self._error: Optional[BaseException] = None
+        self._render_cache = kanban.open_render_cache(board_id)
+
+
+    def start_board(self, board_json: Any, lists_json: Any, labels_json: Any) -> None:
+        """
+        Start rendering a board. Called by the exporter before the first card.
+
+        Args:
+            board_json (Any): The board data.
+            lists_json (Any): The lists of the board in board order.
+            labels_json (Any): The labels of the board.
+        """
+        self._board = self.kanban._build_board(self.board_id, board_json, lists_json, labels_json, [], None)
+        self._label_names = self.kanban._get_label_names(labels_json)
+        self._rendered_cards = {list["id"]: [] for list in lists_json}
+        self._thread.start()
+
+
+    def put_card(self, card: Any, checklists: List[Any], attachments: Optional[Any]) -> None:
+        """
+        Queue a card for rendering. Blocks while MAX_PENDING_CARDS cards are waiting.
+
+        Args:
+            card (Any): The card data.
+            checklists (List[Any]): The checklists data in the order of the card's checklist IDs.
+            attachments (Optional[Any]): The attachments data, None if the card has no attachments.
+        """
+        card = {key: card[key] for key in CARD_FIELDS if key in card}
+        card["checklists"] = checklists
+        card["attachments"] = attachments or []
+        self._cards.put(card)
+
+
+    def finish_board(self) -> None:
+        """
+        Wait until all queued cards are rendered and write the markdown file. Called by the exporter after the last card.
+        """
+        self._cards.put(_FINISH)
+        self._thread.join()
+
+        if self._error:
+            raise self._error
+
+        with self.kanban.metrics.phase("render"):
+            rendered_cards = {}
+
+            # Pages of cards arrive in any order, the list shows the cards by position
+            for list_id, cards in self._rendered_cards.items():
+                cards.sort(key=lambda item: item[0])
+                rendered_cards[list_id] = [markdown for _, markdown in cards]
+
+            self.kanban._create_markdown_file(self._board, rendered_cards)
+            self.kanban.save_render_cache(self._render_cache)
+
+        self.done = True
+
+
+    def close(self) -> None:
+        """
+        Stop the render thread if the export ended before finish_board, e.g. after an error.
+        """
+        if self._thread.is_alive():
+            self._cards.put(_CANCEL)
+            self._thread.join()
+
+
+    def read_checklists(self, card: Any) -> List[Any]:
+        """
+        Get the checklists data of a queued card, so the pipeline serves as the card store of ObsidianKanban._load_card.
+        """
+        return card["checklists"]
+
+
+    def read_attachments(self, card: Any) -> Any:
+        """
+        Get the attachments data of a queued card, see read_checklists.
+        """
+        return card["attachments"]
+
+
+    def _render_cards(self) -> None:
+        """
+        Render the queued cards until finish_board or close. Runs on the background thread.
+        """
+        while True:
+            card = self._cards.get()
+
+            if card is _FINISH or card is _CANCEL:
+                return
+
+            # After an error the remaining cards are only taken off the queue, so the exporter doesn't block
+            if self._error or card["idList"] not in self._rendered_cards:
+                continue
+
+            try:
+                with self.kanban.metrics.phase("render"):
+                    board_card = self.kanban._load_card(self, card, self._label_names)
+                    markdown = self.kanban._get_card_markdown(board_card, self._render_cache)
+                    self._rendered_cards[card["idList"]].append((card["pos"], markdown))
+            except Exception as e:
+                self._error = e
@@ -1,21 +1,335 @@
+import hashlib
+import random
+import threading
+import time
 import requests
-from typing import Optional, Any, Tuple
+from requests.adapters import HTTPAdapter
+from typing import Callable, Optional, Any, Dict, Iterable, List, Mapping, Tuple
+
+import src.file_system as file_system
+from src.attachment_cache import AttachmentCache, Fingerprint, hash_chunks
+from src.metrics import Metrics, get_endpoint
 
 # Trello API
 # https://developer.atlassian.com/cloud/trello/rest/
 
 
+API_URL = "https://api.trello.com"
+API_VERSION_PATH = "/1"
+BASE_URL = API_URL + API_VERSION_PATH
+
+DEFAULT_API_POOL_SIZE = 10
+DEFAULT_DOWNLOAD_POOL_SIZE = 10
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# The /batch endpoint accepts at most 10 urls per call
+# https://developer.atlassian.com/cloud/trello/rest/api-group-batch/
+BATCH_URL_LIMIT = 10
+
+# Trello allows 300 requests per 10 seconds per API key and 100 requests per 10 seconds per token.
+# https://developer.atlassian.com/cloud/trello/guides/rest-api/rate-limits/
+RATE_LIMIT_REQUESTS = 100
+RATE_LIMIT_INTERVAL = 10.0
+RATE_LIMIT_HEADERS = ["api-token", "api-key"]
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+ACTIONS_PAGE_LIMIT = 1000
+# Maximum number of cards per request of a paginated card fetch
+CARDS_PAGE_LIMIT = 1000
+
+# Endpoint names in the metrics for requests that don't go to the API
+DOWNLOAD_ENDPOINT = "attachment download"
+BOARD_URL_ENDPOINT = "board url"
+
+# Query for a board with its content as nested resources
+# https://developer.atlassian.com/cloud/trello/guides/rest-api/nested-resources/
+BOARD_CONTENT_QUERY = {
+    "lists": "open",
+    "labels": "all",
+    "labels_limit": "1000",
+    "cards": "visible",
+    "card_attachments": "true",
+    "checklists": "all"
+}
+
+
+class DownloadResult:
+    def __init__(self, url: str, filename: str, success: bool,
+                 bytes_written: int = 0, seconds: float = 0.0, error: str = "", cached: bool = False,
+                 attachment_id: Optional[str] = None) -> None:
+        self.url: str = url
+        self.filename: str = filename
+        self.attachment_id: Optional[str] = attachment_id
+        self.success: bool = success
+        self.bytes_written: int = bytes_written
+        self.seconds: float = seconds
+        self.error: str = error
+        self.cached: bool = cached
+
+
+    def __bool__(self) -> bool:
+        return self.success
+
+
+    @property
+    def throughput(self) -> float:
+        """
+        Returns:
+            float: The download speed in bytes per second.
+        """
+        if self.seconds > 0:
+            return self.bytes_written / self.seconds
+        
+        return 0.0
+
+
+class RequestFailedError(Exception):
+    def __init__(self, url: str, reason: Any) -> None:
+        """
+        Raised when a request still fails after all retries, so callers can tell a failed request
+        from data that doesn't exist (e.g. a deleted card, which Trello answers with 404).
+
+        Args:
+            url (str): The URL of the request, without the query (it contains the credentials).
+            reason (Any): The HTTP status code or the name of the error of the last attempt.
+        """
+        super().__init__(f"Request failed [{reason}] {url}")
+        self.url = url
+        self.reason = reason
+
+
+class RequestScheduler:
+    def __init__(self, requests_per_interval: int = RATE_LIMIT_REQUESTS, interval: float = RATE_LIMIT_INTERVAL,
+                 max_retries: int = MAX_RETRIES) -> None:
+        """
+        Set up a thread-safe scheduler that keeps requests within Trello's rate limits.
+
+        Requests are paced by a token bucket that refills `requests_per_interval` tokens every `interval`
+        seconds. Responses with status 429 or 5xx and connection errors are retried with exponential
+        backoff, honoring the Retry-After header. The remaining quota reported by Trello in the
+        x-rate-limit-* response headers pauses all requests once it runs out.
+
+        Args:
+            requests_per_interval (int): The number of requests allowed per interval.
+            interval (float): The length of the interval in seconds.
+            max_retries (int): How often a failed request is retried before giving up.
+        """
+        self.capacity = float(requests_per_interval)
+        self.interval = interval
+        self.max_retries = max_retries
+        self.remaining: Dict[str, int] = {}
+        self.retries = 0
+        self._rate = requests_per_interval / interval
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket for the next request.
+        If the bucket is empty the token is borrowed from the future.
+
+        Returns:
+            float: The number of seconds to wait before the request may be sent.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            
+            wait_for_token = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            return max(wait_for_token, self._paused_until - now)
+
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back all requests for the given number of seconds.
+
+        Args:
+            seconds (float): How long no request may be sent.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+    def update_quota(self, headers: Mapping[str, str]) -> None:
+        """
+        Track the remaining quota from the rate limit headers of a response
+        and pause all requests if the quota is used up.
+
+        Args:
+            headers (Mapping[str, str]): The (case-insensitive) headers of a Trello API response.
+        """
+        for limit in RATE_LIMIT_HEADERS:
+            remaining = headers.get(f"x-rate-limit-{limit}-remaining")
+            
+            if remaining is None or not remaining.isdigit():
+                continue
+            
+            self.remaining[limit] = int(remaining)
+            
+            if self.remaining[limit] == 0:
+                interval_ms = headers.get(f"x-rate-limit-{limit}-interval-ms", "")
+                self.pause(int(interval_ms) / 1000 if interval_ms.isdigit() else self.interval)
+
+
+    def get_backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Get the delay before the next retry.
+
+        Args:
+            attempt (int): The number of the failed attempt, starting at 0.
+            retry_after (Optional[str]): The value of the Retry-After header, if there was one.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        
+        # Exponential backoff with jitter, so parallel workers don't retry at the same moment
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+    def execute(self, send_request: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Send a request once the rate limit allows it and retry it if Trello rejects it temporarily.
+
+        Args:
+            send_request (Callable[[], requests.Response]): Sends the request and returns its response.
+
+        Returns:
+            requests.Response: The response, also if Trello rejected the request (e.g. 404).
+            
+        Raises:
+            RequestFailedError: If the request still fails after max_retries retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self.reserve())
+            
+            try:
+                response = send_request()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise RequestFailedError(_get_url_without_query(e.request.url if e.request else ""), e.__class__.__name__) from e
+                
+                time.sleep(self.schedule_retry(attempt, e.__class__.__name__))
+                continue
+            
+            self.update_quota(response.headers)
+            
+            if not self.should_retry(response.status_code):
+                return response
+            
+            response.close()
+            
+            if attempt == self.max_retries:
+                print(f"ERROR: Request failed [{response.status_code}] after {self.max_retries} retries")
+                raise RequestFailedError(_get_url_without_query(response.url), response.status_code)
+            
+            time.sleep(self.schedule_retry(attempt, response.status_code, response.headers.get("Retry-After")))
+    
+    
+    def should_retry(self, status_code: int) -> bool:
+        """
+        Check if a response status is a temporary error that is worth retrying.
+
+        Args:
+            status_code (int): The HTTP status code of the response.
+
+        Returns:
+            bool: True for "429 Too Many Requests" and server errors, False otherwise.
+        """
+        return status_code == 429 or status_code >= 500
+    
+    
+    def schedule_retry(self, attempt: int, reason: Any, retry_after: Optional[str] = None) -> float:
+        """
+        Count a retry and get the delay before it may be sent.
+        A 429 response pauses all requests, because the quota is shared, not just this one.
+
+        Args:
+            attempt (int): The number of the failed attempt, starting at 0.
+            reason (Any): The HTTP status code or the name of the error of the failed attempt.
+            retry_after (Optional[str]): The value of the Retry-After header, if there was one.
+
+        Returns:
+            float: The number of seconds to wait before the retry.
+        """
+        delay = self.get_backoff(attempt, retry_after)
+        print(f"WARNING: Request failed [{reason}], retrying in {delay:.1f}s")
+        
+        with self._lock:
+            self.retries += 1
+        
+        if reason == 429:
+            # The pause is applied by reserve() before the next request
+            self.pause(delay)
+            return 0.0
+        
+        return delay
+
+
 class Trello:
-    def __init__(self, api_key: str, api_token: str) -> None:
+    def __init__(self, api_key: str, api_token: str,
+                 api_pool_size: int = DEFAULT_API_POOL_SIZE,
+                 download_pool_size: int = DEFAULT_DOWNLOAD_POOL_SIZE,
+                 scheduler: Optional[RequestScheduler] = None,
+                 attachment_cache: Optional[AttachmentCache] = None,
+                 api_url: Optional[str] = None,
+                 metrics: Optional[Metrics] = None) -> None:
         """
         Set up a Trello instance using the supplied API key and API token.
 
+        All requests share one keep-alive session, so connections are reused instead of
+        doing a new TCP/TLS handshake for every request.
+
         Args:
             api_key (str): The API key used for authentication with Trello.
             api_token (str): The API token used for authentication with Trello.
+            api_pool_size (int): Number of pooled connections kept open to api.trello.com for API requests.
+            download_pool_size (int): Number of pooled connections kept open per attachment host. Attachments are
+                        downloaded through api.trello.com, so its pool gets this many connections on top.
+            scheduler (Optional[RequestScheduler]): Paces and retries all requests. Pass the same scheduler
+                        to several instances that share an API token.
+            attachment_cache (Optional[AttachmentCache]): Cache used to skip downloads of unchanged attachments.
+            api_url (Optional[str]): The URL of the Trello API host, e.g. a local server for benchmarks.
+                        Defaults to API_URL.
+            metrics (Optional[Metrics]): Records the latency of every request and the downloaded bytes.
         """
         self.api_key = api_key
         self.api_token = api_token
+        self.api_url = (api_url or API_URL).rstrip("/")
+        self.base_url = self.api_url + API_VERSION_PATH
+        self.session = self._create_session(api_pool_size, download_pool_size)
+        self.scheduler = scheduler or RequestScheduler()
+        self.attachment_cache = attachment_cache
+        self.metrics = metrics or Metrics()
+
+
+    def __enter__(self) -> "Trello":
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def close(self) -> None:
+        """
+        Close the pooled session and all of its open connections and save the attachment cache.
+        """
+        self.session.close()
+        
+        if self.attachment_cache:
+            self.attachment_cache.save()
         
 
     def get_boards(self) -> Optional[Any]:
@@ -52,6 +366,27 @@ class Trello:
         return None
     
 
+    def get_board_with_content(self, board_id: str) -> Optional[Any]:
+        """
+        Retrieve a Trello board together with its lists, labels, cards, card attachments and checklists
+        in a single nested request.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+
+        Returns:
+            Optional[Any]: The JSON representation of the board with the nested "lists", "labels", "cards"
+                        and "checklists" arrays if the request is successful, or None if the request fails.
+                        Every card contains its attachments in "attachments".
+        """
+        response = self._execute_get_request(f"/boards/{board_id}", BOARD_CONTENT_QUERY)
+        
+        if response.status_code == 200:
+            return response.json()
+        
+        return None
+    
+
     def get_lists(self, board_id: str) -> Optional[Any]:
         """
         Retrieve information about all lists in a Trello board.
@@ -128,6 +463,151 @@ class Trello:
         return None
 
     
+    def get_checklists(self, checklist_ids: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """
+        Retrieve information about several Trello checklists using as few requests as possible.
+
+        Args:
+            checklist_ids (Iterable[str]): The IDs of the Trello checklists.
+
+        Returns:
+            Dict[str, Optional[Any]]: The JSON representation of every checklist by its ID,
+                        or None for the checklists Trello rejected (e.g. deleted checklists).
+        """
+        return self._get_many("/checklists/{}", checklist_ids)
+    
+    
+    def get_lists_by_id(self, list_ids: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """
+        Retrieve information about several Trello lists using as few requests as possible.
+
+        Args:
+            list_ids (Iterable[str]): The IDs of the Trello lists.
+
+        Returns:
+            Dict[str, Optional[Any]]: The JSON representation of every list by its ID,
+                        or None for the lists Trello rejected (e.g. deleted lists).
+        """
+        return self._get_many("/lists/{}", list_ids)
+    
+    
+    def get_boards_by_id(self, board_ids: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """
+        Retrieve information about several Trello boards using as few requests as possible.
+
+        Args:
+            board_ids (Iterable[str]): The IDs of the Trello boards.
+
+        Returns:
+            Dict[str, Optional[Any]]: The JSON representation of every board by its ID,
+                        or None for the boards Trello rejected (e.g. deleted boards).
+        """
+        return self._get_many("/boards/{}", board_ids)
+    
+    
+    def get_cards_by_id(self, card_ids: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """
+        Retrieve information about several Trello cards using as few requests as possible.
+
+        Args:
+            card_ids (Iterable[str]): The IDs of the Trello cards.
+
+        Returns:
+            Dict[str, Optional[Any]]: The JSON representation of every card by its ID,
+                        or None for the cards Trello rejected (e.g. deleted cards).
+        """
+        return self._get_many("/cards/{}", card_ids)
+    
+    
+    def get_attachments_for_cards(self, card_ids: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """
+        Retrieve information about the attachments of several Trello cards using as few requests as possible.
+
+        Args:
+            card_ids (Iterable[str]): The IDs of the Trello cards.
+
+        Returns:
+            Dict[str, Optional[Any]]: The JSON representation of the attachments by card ID,
+                        or None for the cards Trello rejected (e.g. deleted cards).
+        """
+        return self._get_many("/cards/{}/attachments", card_ids)
+
+
+    def batch_get(self, url_paths: List[str]) -> List[Optional[Any]]:
+        """
+        Execute several GET requests through Trello's /batch endpoint.
+        The requests are sent in groups of up to BATCH_URL_LIMIT urls per call.
+
+        Args:
+            url_paths (List[str]): The paths of the GET requests, e.g. "/checklists/{id}".
+
+        Returns:
+            List[Optional[Any]]: The JSON response of every request in the same order as url_paths,
+                        or None for each request Trello rejected (e.g. 404 for a deleted checklist).
+                        
+        Raises:
+            RequestFailedError: If a batch call fails or one of its requests failed temporarily (429, 5xx).
+                        A failed request is never mistaken for missing data.
+        """
+        results: List[Optional[Any]] = []
+        
+        for start in range(0, len(url_paths), BATCH_URL_LIMIT):
+            chunk = url_paths[start:start + BATCH_URL_LIMIT]
+            response = self._execute_get_request("/batch", {"urls": ",".join(chunk)})
+            
+            if response.status_code != 200:
+                raise RequestFailedError(self.base_url + "/batch", response.status_code)
+            
+            # Each entry is either {"200": <json>} or an error object with a "statusCode"
+            for url_path, entry in zip(chunk, response.json()):
+                if "200" in entry:
+                    results.append(entry["200"])
+                elif self.scheduler.should_retry(entry.get("statusCode", 500)):
+                    raise RequestFailedError(self.base_url + url_path, entry.get("statusCode"))
+                else:
+                    results.append(None)
+                
+        return results
+
+    
+    def get_board_actions(self, board_id: str, since: Optional[str] = None, limit: int = ACTIONS_PAGE_LIMIT) -> Optional[Any]:
+        """
+        Retrieve the actions (changes) of a Trello board, newest first.
+        All pages are fetched if there are more than `limit` actions.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+            since (Optional[str]): Only return actions after this action ID or date. Omit to get all actions.
+            limit (int): The number of actions fetched per request. If it is smaller than ACTIONS_PAGE_LIMIT
+                        only that many of the newest actions are returned.
+
+        Returns:
+            Optional[Any]: The JSON representation of the actions if the requests are successful,
+                        or None if a request fails.
+        """
+        # https://developer.atlassian.com/cloud/trello/rest/api-group-boards/#api-boards-boardid-actions-get
+        actions = []
+        query = {"limit": str(limit)}
+        
+        if since:
+            query["since"] = since
+        
+        while True:
+            response = self._execute_get_request(f"/boards/{board_id}/actions", query)
+            
+            if response.status_code != 200:
+                return None
+            
+            page = response.json()
+            actions.extend(page)
+            
+            if len(page) < ACTIONS_PAGE_LIMIT:
+                return actions
+            
+            # Continue with the actions older than the oldest one of this page
+            query["before"] = page[-1]["id"]
+    
+    
     def get_all_cards(self, board_id: str) -> Optional[Any]:
         """
         Retrieve information about all cards in a Trello board.
@@ -147,6 +627,33 @@ class Trello:
         return None
 
     
+    def get_cards_page(self, board_id: str, before: Optional[str] = None, limit: int = CARDS_PAGE_LIMIT) -> Optional[Any]:
+        """
+        Retrieve a page of the cards in a Trello board, newest first.
+
+        Args:
+            board_id (str): The ID of the Trello board.
+            before (Optional[str]): Only return cards older than this card ID, i.e. the oldest card of the previous page.
+                        Omit for the first page.
+            limit (int): The maximum number of cards of the page. A page with fewer cards is the last one.
+
+        Returns:
+            Optional[Any]: The JSON representation of the cards if the request is successful,
+                        or None if the request fails.
+        """
+        query = {"limit": str(limit)}
+        
+        if before:
+            query["before"] = before
+        
+        response = self._execute_get_request(f"/boards/{board_id}/cards", query)
+
+        if response.status_code == 200:
+            return response.json()
+        
+        return None
+
+    
     def get_attachments(self, card_id: str) -> Optional[Any]:      
         """
         Retrieve information about all attachments on a Trello card.
@@ -167,34 +674,70 @@ class Trello:
         return None
 
         
-    def download_attachment(self, attachment_url: str, filename: str) -> bool:        
+    def download_attachment(self, attachment_url: str, filename: str, attachment_id: Optional[str] = None,
+                            fingerprint: Optional[Fingerprint] = None) -> DownloadResult:
         """
         Download an attachment from a Trello card.
 
+        The response is streamed to a temporary file in fixed-size chunks and renamed into place
+        once it is complete, so memory usage does not depend on the attachment size.
+        
+        If there is an attachment cache and the attachment ID is given, a conditional request is sent
+        for cached attachments. Unchanged attachments are linked from the cache instead of downloaded.
+        With the fingerprint, a copy of the attachment that is cached for another attachment (e.g. on another board)
+        is linked as well.
+
         Args:
             attachment_url (str): The URL of the attachment to download.
             filename (str): The name of the file to save the attachment to.
+            attachment_id (Optional[str]): The ID of the Trello attachment, used as key for the attachment cache.
+            fingerprint (Optional[Fingerprint]): The fingerprint of the attachment, see attachment_cache.get_fingerprint.
             
         Returns:
-            bool: True if the download is successful, False otherwise.
+            DownloadResult: The result of the download. It is truthy if the download is successful.
         """        
         headers = {
             'Authorization': f'OAuth oauth_consumer_key="{self.api_key}", oauth_token="{self.api_token}"'
         }
         
-        # TODO: HANDLE EXTERNAL LINKS?!
-        response = requests.get(attachment_url, headers=headers)
+        use_cache = self.attachment_cache is not None and attachment_id is not None
+        conditional_headers = self.attachment_cache.get_conditional_headers(attachment_id, fingerprint) if use_cache else {}
+        start_time = time.perf_counter()
         
-        if response.status_code == 200:
-            with open(filename, 'wb') as file:
-                file.write(response.content)
-                
-            return True
-        else:
-            print(f"ERROR downloading Attachment [{response.status_code}]")
-            print(f"   {response.url}")
+        while True:
+            request_headers = dict(headers, **conditional_headers)
             
-            return False
+            # TODO: HANDLE EXTERNAL LINKS?!
+            with self.scheduler.execute(lambda: self._send_get_request(DOWNLOAD_ENDPOINT, attachment_url, headers=request_headers, stream=True)) as response:
+                if response.status_code == 304 and conditional_headers:
+                    if self.attachment_cache.link(attachment_id, filename, fingerprint):
+                        self.metrics.count("attachments_from_cache")
+                        return DownloadResult(attachment_url, filename, True, seconds=time.perf_counter() - start_time, cached=True,
+                                              attachment_id=attachment_id)
+                    
+                    # The cached file was evicted after the conditional headers were chosen, download it again
+                    conditional_headers = {}
+                    continue
+                
+                if response.status_code == 200:
+                    content_hash = hashlib.sha256()
+                    bytes_written = file_system.write_file_stream(
+                        filename,
+                        hash_chunks(response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE), content_hash))
+                    
+                    if use_cache:
+                        self.attachment_cache.add(attachment_id, filename, content_hash.hexdigest(),
+                                                  response.headers.get("ETag"), response.headers.get("Last-Modified"), fingerprint)
+                    
+                    self.metrics.record_download(bytes_written)
+                    return DownloadResult(attachment_url, filename, True, bytes_written, time.perf_counter() - start_time,
+                                          attachment_id=attachment_id)
+                else:
+                    print(f"ERROR downloading Attachment [{response.status_code}]")
+                    print(f"   {response.url}")
+                    
+                    return DownloadResult(attachment_url, filename, False, error=f"HTTP {response.status_code}",
+                                          attachment_id=attachment_id)
         
     
     def get_board_id_from_url(self, url: str) -> Optional[str]:
@@ -209,7 +752,7 @@ class Trello:
         """
         url = f"{url}.json" # adding .json to get to the json file of the board
         _, headers, params = self._create_get_request("")
-        response = requests.get(url, headers=headers, params=params)
+        response = self.scheduler.execute(lambda: self._send_get_request(BOARD_URL_ENDPOINT, url, headers=headers, params=params))
         
         if response.status_code == 200:                        
             try:
@@ -223,42 +766,123 @@ class Trello:
         return None
         
     
-    def _create_get_request(self, url_path: str) -> Tuple[str, str, str]:        
+    def _get_many(self, url_path_template: str, ids: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """
+        Retrieve the same kind of resource for several IDs through the batch endpoint.
+
+        Args:
+            url_path_template (str): The path of the GET request with "{}" as placeholder for the ID.
+            ids (Iterable[str]): The IDs to request. Duplicates are only requested once.
+
+        Returns:
+            Dict[str, Optional[Any]]: The JSON response by ID, or None for each request Trello rejected (e.g. 404).
+        """
+        unique_ids = list(dict.fromkeys(ids))
+        results = self.batch_get([url_path_template.format(id) for id in unique_ids])
+        
+        return dict(zip(unique_ids, results))
+        
+    
+    def _create_get_request(self, url_path: str, query: Optional[Dict[str, str]] = None) -> Tuple[str, Dict[str, str], Dict[str, str]]:        
         """
         Create a GET request with the specified URL path.
 
         Args:
             url_path (str): The path for the GET request.
+            query (Optional[Dict[str, str]]): Additional query parameters for the request.
 
         Returns:
-            Tuple[str, str, str]: A tuple containing the URL, headers, and parameters for the request.
+            Tuple[str, Dict[str, str], Dict[str, str]]: A tuple containing the URL, headers, and parameters for the request.
         """
-        BASE_URL = "https://api.trello.com/1"
-        #url = f"{BASE_URL}/members/me/boards"
-        url = BASE_URL + url_path
+        url = self.base_url + url_path
 
         headers = {"Accept": "application/json"}      
-        params = {
-            'key': self.api_key,
-            'token': self.api_token
-        }
+        params = dict(query) if query else {}
         
         # Only if there is a api_key and api_token available
         if self.api_key and self.api_token:
-            return (url, headers, params)
-        else:
-            return (url, headers, "{}")
+            params['key'] = self.api_key
+            params['token'] = self.api_token
+            
+        return (url, headers, params)
 
 
-    def _execute_get_request(self, url_path:str) -> requests.Response:
+    def _execute_get_request(self, url_path: str, query: Optional[Dict[str, str]] = None) -> requests.Response:
         """
         Execute a GET request with the specified URL path.
 
         Args:
             url_path (str): The path for the GET request.
+            query (Optional[Dict[str, str]]): Additional query parameters for the request.
 
         Returns:
             requests.Response: The response object from the GET request.
+            
+        Raises:
+            RequestFailedError: If the request still fails after all retries, see RequestScheduler.execute.
         """
-        url, headers, params = self._create_get_request(url_path)
-        return requests.get(url, headers=headers, params=params)
\ No newline at end of file
+        url, headers, params = self._create_get_request(url_path, query)
+        endpoint = get_endpoint(url_path)
+        return self.scheduler.execute(lambda: self._send_get_request(endpoint, url, headers=headers, params=params))
+
+
+    def _send_get_request(self, endpoint: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a single GET request through the session and record its latency in the metrics.
+
+        Args:
+            endpoint (str): The endpoint the request is counted for.
+            url (str): The URL of the request.
+            **kwargs: Passed to requests.Session.get.
+
+        Returns:
+            requests.Response: The response object from the GET request.
+        """
+        start_time = time.perf_counter()
+        
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.RequestException as e:
+            self.metrics.record_request(endpoint, time.perf_counter() - start_time, e.__class__.__name__)
+            raise
+        
+        self.metrics.record_request(endpoint, time.perf_counter() - start_time, response.status_code)
+        return response
+
+
+    def _create_session(self, api_pool_size: int, download_pool_size: int) -> requests.Session:
+        """
+        Create a keep-alive session with separate connection pools for the API and attachment hosts.
+
+        Args:
+            api_pool_size (int): Number of pooled connections kept open to api.trello.com for API requests.
+            download_pool_size (int): Number of pooled connections kept open per attachment host.
+
+        Returns:
+            requests.Session: The configured session.
+        """
+        session = requests.Session()
+
+        # Requests picks the adapter with the longest matching prefix, so api.trello.com gets
+        # its own pool and every other host (attachment CDN, trello.com) uses the download pool.
+        download_adapter = HTTPAdapter(pool_maxsize=download_pool_size)
+        session.mount("https://", download_adapter)
+        session.mount("http://", download_adapter)
+        # Attachment downloads go through api.trello.com as well (see exporter._get_attachment_download_url)
+        # and run next to the API requests, so the pool is sized for both instead of dropping connections
+        session.mount(self.api_url, HTTPAdapter(pool_connections=1, pool_maxsize=api_pool_size + download_pool_size))
+
+        return session
+
+
+def _get_url_without_query(url: str) -> str:
+    """
+    Remove the query from a URL, it contains the API key and token.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str: The URL without the query.
+    """
+    return url.split("?", 1)[0]
@@ -0,0 +1,23 @@
+import pytest
+
+import src.file_system as file_system
+import src.file_structure as file_structure
+
+
+BOARD_ID = "b" * 24
+
+
+@pytest.fixture
+def board_id(tmp_path, monkeypatch):
+    """
+    Run the test in an empty folder, exports are written relative to the working directory.
+    Creates the folders of the board export and returns the board ID.
+    """
+    monkeypatch.chdir(tmp_path)
+
+    for folder in [file_structure.get_board_folder(BOARD_ID),
+                   file_structure.get_attachment_folder(BOARD_ID),
+                   file_structure.get_checklists_folder(BOARD_ID)]:
+        file_system.create_folder(folder)
+
+    return BOARD_ID
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from src.card_store import FileCardStore, JsonLinesCardStore, open_card_store, STORE_FILES, STORE_JSONL
+import src.file_system as file_system
+import src.file_structure as file_structure
+
+
+CHECKLISTS = {
+    "c1": {"id": "c1", "name": "To Do", "checkItems": [{"name": "One", "state": "complete"}]},
+    "c2": {"id": "c2", "name": "Done", "checkItems": []}
+}
+ATTACHMENTS = [{"id": "a1", "fileName": "image.png"}]
+
+
+def create_card(card_id, checklist_ids=(), attachments=0):
+    return {"id": card_id, "idChecklists": list(checklist_ids), "badges": {"attachments": attachments}}
+
+
+@pytest.mark.parametrize("store_type", [STORE_FILES, STORE_JSONL])
+def test_write_read_and_delete(board_id, store_type):
+    card = create_card("card1", ["c1", "c2"], 1)
+    plain_card = create_card("card2")
+
+    with open_card_store(board_id, store_type) as store:
+        store.write_card(card["id"], card["idChecklists"], CHECKLISTS, ATTACHMENTS)
+        store.write_card(plain_card["id"], [], CHECKLISTS, None)
+
+        assert store.read_checklists(card) == [CHECKLISTS["c1"], CHECKLISTS["c2"]]
+        assert store.read_attachments(card) == ATTACHMENTS
+        assert store.read_checklists(plain_card) == []
+        assert store.read_attachments(plain_card) == []
+
+    with open_card_store(board_id) as store:
+        assert store.read_checklists(card) == [CHECKLISTS["c1"], CHECKLISTS["c2"]]
+        assert store.read_attachments(card) == ATTACHMENTS
+
+        store.delete_card(card)
+        assert store.read_attachments(card) == []
+
+    with open_card_store(board_id, read_only=True) as store:
+        assert store.read_attachments(card) == []
+
+
+def test_open_card_store_detects_the_layout(board_id):
+    assert isinstance(open_card_store(board_id), FileCardStore)
+
+    with open_card_store(board_id, STORE_JSONL) as store:
+        store.write_card("card1", [], {}, ATTACHMENTS)
+
+    with open_card_store(board_id) as store:
+        assert isinstance(store, JsonLinesCardStore)
+
+
+def test_jsonl_latest_record_wins_and_compacts(board_id):
+    card = create_card("card1", attachments=1)
+    file_path = file_structure.get_card_store_file(board_id)
+
+    with JsonLinesCardStore(board_id) as store:
+        for i in range(10):
+            store.write_card(card["id"], [], {}, [{"id": f"a{i}", "fileName": f"{i}.png"}])
+
+    # Only the latest record is left after the compaction
+    with open(file_path, "rb") as file:
+        assert len(file.readlines()) == 1
+
+    with JsonLinesCardStore(board_id, read_only=True) as store:
+        assert store.read_attachments(card) == [{"id": "a9", "fileName": "9.png"}]
+
+
+def test_jsonl_rebuilds_the_index_after_an_interrupted_write(board_id):
+    card = create_card("card1", attachments=1)
+    file_path = file_structure.get_card_store_file(board_id)
+
+    with JsonLinesCardStore(board_id) as store:
+        store.write_card(card["id"], [], {}, ATTACHMENTS)
+
+    # A record cut off by a crash, the index doesn't match the file anymore
+    with open(file_path, "ab") as file:
+        file.write(b'{"id": "card2", "checklists": [')
+
+    with JsonLinesCardStore(board_id) as store:
+        assert store.read_attachments(card) == ATTACHMENTS
+        store.write_card("card2", [], {}, ATTACHMENTS)
+
+    with JsonLinesCardStore(board_id, read_only=True) as store:
+        assert store.read_attachments(create_card("card2", attachments=1)) == ATTACHMENTS
+
+
+def test_jsonl_read_only_leaves_the_store_untouched(board_id):
+    card = create_card("card1", attachments=1)
+    file_path = file_structure.get_card_store_file(board_id)
+    index_path = file_structure.get_card_store_index_file(board_id)
+
+    with JsonLinesCardStore(board_id) as store:
+        store.write_card(card["id"], [], {}, ATTACHMENTS)
+
+    # A stale index is rebuilt in memory, but neither saved nor used to truncate the file
+    file_system.delete_file(index_path)
+
+    with open(file_path, "ab") as file:
+        file.write(b'{"id": "card2"')
+
+    size = os.path.getsize(file_path)
+
+    with JsonLinesCardStore(board_id, read_only=True) as store:
+        assert store.read_attachments(card) == ATTACHMENTS
+
+        with pytest.raises(ValueError):
+            store.write_card("card3", [], {}, ATTACHMENTS)
+
+    assert os.path.getsize(file_path) == size
+    assert not file_system.file_exists(index_path)
@@ -0,0 +1,141 @@
+import os
+
+import pytest
+
+from benchmarks.fake_trello import FakeTrelloServer
+from benchmarks.synthetic_board import SyntheticBoard
+from src.card_store import JsonLinesCardStore, STORE_JSONL
+from src.checkpoint import Checkpoint
+from src.create_obsidian_kanban_board import ObsidianKanban
+from src.trello import Trello, RequestFailedError, BATCH_URL_LIMIT
+import src.exporter as exporter
+import src.file_system as file_system
+import src.file_structure as file_structure
+
+
+CARDS = BATCH_URL_LIMIT * 2 + 5
+
+
+@pytest.fixture
+def server(board_id):
+    board = SyntheticBoard(board_id, lists=3, cards=CARDS, labels=5, attachments_per_card=1, attachment_size=64)
+
+    with FakeTrelloServer(board) as server:
+        yield server
+
+
+@pytest.fixture
+def trello(server):
+    with Trello("key", "token", api_url=server.url) as trello:
+        yield trello
+
+
+def fail_on_call(monkeypatch, method_name, call_number):
+    """
+    Let a Trello method raise RequestFailedError on the given call, like a request that failed after all retries.
+    """
+    method = getattr(Trello, method_name)
+    calls = []
+
+    def failing_method(self, *args, **kwargs):
+        calls.append(args)
+
+        if len(calls) == call_number:
+            raise RequestFailedError(f"/{method_name}", 503)
+
+        return method(self, *args, **kwargs)
+
+    monkeypatch.setattr(Trello, method_name, failing_method)
+
+
+def get_attachment_file(server, board_id, card_index):
+    card = server.board.cards_json[card_index]
+    return file_structure.get_attachment_file(board_id, server.board.attachments_json[card["id"]][0]["fileName"])
+
+
+def count_attachment_files(board_id):
+    return sum(1 for file_name in os.listdir(file_structure.get_attachment_folder(board_id)) if file_name.endswith(".png"))
+
+
+def test_export(board_id, trello):
+    result = exporter.export_board(trello, board_id)
+
+    assert result and result.complete
+    assert len(file_system.read_file_json(file_structure.get_cards_json_file(board_id))) == CARDS
+    assert count_attachment_files(board_id) == CARDS
+    assert Checkpoint(board_id).complete
+    assert file_system.file_exists(file_structure.get_sync_state_json_file(board_id))
+
+
+def test_resume_retries_only_the_failed_downloads(board_id, server, trello):
+    attachment = server.board.attachments_json[server.board.cards_json[3]["id"]][0]
+    server._attachments.pop(attachment["id"])
+
+    result = exporter.export_board(trello, board_id)
+
+    # The board can be rendered, only the download failed
+    assert not result and result.complete
+    assert not Checkpoint(board_id).complete
+
+    server._attachments[attachment["id"]] = attachment
+    downloaded_file = get_attachment_file(server, board_id, 0)
+    modified_time = os.stat(downloaded_file).st_mtime_ns
+
+    assert exporter.export_board(trello, board_id, resume=True)
+    assert file_system.file_exists(get_attachment_file(server, board_id, 3))
+    assert os.stat(downloaded_file).st_mtime_ns == modified_time
+    assert Checkpoint(board_id).complete
+
+
+def test_failed_batch_is_not_checkpointed(board_id, trello, monkeypatch):
+    # The second chunk of cards fails, the first one is exported
+    with monkeypatch.context() as patch:
+        fail_on_call(patch, "get_checklists", 2)
+        result = exporter.export_board(trello, board_id)
+
+    assert not result and not result.complete
+    assert len(Checkpoint(board_id).cards) == BATCH_URL_LIMIT
+    assert not file_system.file_exists(file_structure.get_sync_state_json_file(board_id))
+
+    result = exporter.export_board(trello, board_id, resume=True)
+
+    assert result and result.complete
+    assert len(Checkpoint(board_id).cards) == CARDS
+
+
+def test_resume_keeps_the_store_layout(board_id, server, trello, monkeypatch):
+    with monkeypatch.context() as patch:
+        fail_on_call(patch, "get_checklists", 2)
+        assert not exporter.export_board(trello, board_id, store=STORE_JSONL)
+
+    # Resumed with the default store, the missing cards are added to the JSON Lines store
+    assert exporter.export_board(trello, board_id, resume=True)
+    assert not any(file_system.file_exists(file_structure.get_checklist_json_file(board_id, checklist_id))
+                   for checklist_id in server.board.checklists_json)
+
+    with JsonLinesCardStore(board_id, read_only=True) as store:
+        for card in server.board.cards_json:
+            assert store.read_checklists(card) == [server.board.checklists_json[id] for id in card["idChecklists"]]
+
+
+def test_failed_board_request_keeps_the_previous_export(board_id, trello, monkeypatch):
+    assert exporter.export_board(trello, board_id)
+
+    fail_on_call(monkeypatch, "get_lists", 1)
+    result = exporter.export_board(trello, board_id)
+
+    assert not result and not result.complete
+    assert Checkpoint(board_id).complete
+    assert count_attachment_files(board_id) == CARDS
+
+
+def test_deleted_checklist_is_skipped(board_id, server, trello):
+    card_json = server.board.cards_json[0]
+    server.board.checklists_json.pop(card_json["idChecklists"][0])
+
+    assert exporter.export_board(trello, board_id)
+
+    board = ObsidianKanban()._load_board(board_id)
+    exported_card = next(card for board_list in board.lists for card in board_list.cards if card.card_id == card_json["id"])
+
+    assert exported_card.checklists == []
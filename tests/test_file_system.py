@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import src.file_system as file_system
+
+
+ELEMENTS = [
+    {"id": "a", "name": "Brackets ] [ and braces } {", "desc": "Quotes \" , and escapes \\ \n"},
+    {"id": "b", "name": "Ünïcödé ✓ 😀", "nested": {"list": [1, 2.5, None, True, -3e-7]}},
+    [],
+    "text, with ] a comma",
+    1234567.5e3,
+    {}
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 64 * 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_read_file_json_array_across_chunk_boundaries(tmp_path, chunk_size, indent):
+    path = tmp_path / "array.json"
+    path.write_text(json.dumps(ELEMENTS, ensure_ascii=False, indent=indent), encoding="utf-8")
+
+    assert list(file_system.read_file_json_array(str(path), chunk_size=chunk_size)) == ELEMENTS
+
+
+@pytest.mark.parametrize("content", ["[]", " [ ] ", "\n[\n]\n"])
+def test_read_file_json_array_empty(tmp_path, content):
+    path = tmp_path / "array.json"
+    path.write_text(content, encoding="utf-8")
+
+    assert list(file_system.read_file_json_array(str(path), chunk_size=1)) == []
+
+
+def test_read_file_json_array_fields(tmp_path):
+    path = tmp_path / "array.json"
+    path.write_text(json.dumps([{"id": "a", "name": "A", "desc": "x" * 1000}, {"id": "b"}]), encoding="utf-8")
+
+    assert list(file_system.read_file_json_array(str(path), fields=["id", "name"], chunk_size=4)) == [
+        {"id": "a", "name": "A"}, {"id": "b"}]
+
+
+@pytest.mark.parametrize("content", ['[{"id": "a"}, {"id": "b"', '[1, 2', '[1, 2,', '{"id": "a"}', '[1 2]'])
+def test_read_file_json_array_invalid(tmp_path, content):
+    path = tmp_path / "array.json"
+    path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(file_system.read_file_json_array(str(path), chunk_size=3))
+
+
+def test_open_json_array_for_writing(tmp_path):
+    path = str(tmp_path / "array.json")
+
+    with file_system.open_json_array_for_writing(path) as append:
+        append(ELEMENTS[:2])
+        append([])
+        append(ELEMENTS[2:])
+
+    assert file_system.read_file_json(path) == ELEMENTS
+
+
+def test_open_json_array_for_writing_keeps_the_file_on_error(tmp_path):
+    path = str(tmp_path / "array.json")
+    file_system.write_file_json(path, ["old"])
+
+    with pytest.raises(RuntimeError):
+        with file_system.open_json_array_for_writing(path) as append:
+            append(["new"])
+            raise RuntimeError("interrupted")
+
+    assert file_system.read_file_json(path) == ["old"]
+    assert sorted(file.name for file in tmp_path.iterdir()) == ["array.json"]
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+import requests
+
+import src.trello as trello_module
+from src.trello import Trello, RequestScheduler, RequestFailedError, BATCH_URL_LIMIT
+
+
+def create_response(status_code, body=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = "https://api.trello.com/1/batch?key=secret&token=secret"
+    response._content = json.dumps(body).encode("utf-8") if body is not None else b""
+    response._content_consumed = True
+    return response
+
+
+@pytest.fixture
+def trello(monkeypatch):
+    monkeypatch.setattr(trello_module, "BACKOFF_BASE", 0.0)
+
+    with Trello("key", "token", scheduler=RequestScheduler(max_retries=2)) as trello:
+        yield trello
+
+
+def answer(trello, monkeypatch, *responses):
+    """
+    Answer the requests of the Trello instance with the given responses (or exceptions) in order.
+    Returns the list the URLs of the requests are recorded in.
+    """
+    responses = list(responses)
+    urls = []
+
+    def get(url, **kwargs):
+        urls.append((url, kwargs.get("params")))
+        response = responses.pop(0)
+
+        if isinstance(response, Exception):
+            raise response
+
+        return response
+
+    monkeypatch.setattr(trello.session, "get", get)
+    return urls
+
+
+def test_retries_temporary_errors(trello, monkeypatch):
+    answer(trello, monkeypatch, create_response(503), create_response(429), create_response(200, {"id": "b"}))
+
+    assert trello.get_board("b") == {"id": "b"}
+    assert trello.scheduler.retries == 2
+
+
+def test_rejected_request_returns_none(trello, monkeypatch):
+    answer(trello, monkeypatch, create_response(404))
+
+    assert trello.get_board("b") is None
+
+
+def test_raises_when_retries_are_exhausted(trello, monkeypatch):
+    answer(trello, monkeypatch, create_response(503), create_response(503), create_response(503))
+
+    with pytest.raises(RequestFailedError) as error:
+        trello.get_board("b")
+
+    assert error.value.reason == 503
+    assert "secret" not in str(error.value)
+
+
+def test_raises_when_the_connection_keeps_failing(trello, monkeypatch):
+    answer(trello, monkeypatch, *[requests.ConnectionError("refused") for _ in range(3)])
+
+    with pytest.raises(RequestFailedError) as error:
+        trello.get_board("b")
+
+    assert error.value.reason == "ConnectionError"
+
+
+def test_batch_get_keeps_the_order_across_chunks(trello, monkeypatch):
+    ids = [f"c{i}" for i in range(BATCH_URL_LIMIT + 3)]
+    urls = answer(trello, monkeypatch,
+                  create_response(200, [{"200": {"id": id}} for id in ids[:BATCH_URL_LIMIT]]),
+                  create_response(200, [{"200": {"id": id}} for id in ids[BATCH_URL_LIMIT:]]))
+
+    assert trello.get_cards_by_id(ids) == {id: {"id": id} for id in ids}
+    assert [len(params["urls"].split(",")) for _, params in urls] == [BATCH_URL_LIMIT, 3]
+
+
+def test_batch_get_returns_none_for_rejected_entries(trello, monkeypatch):
+    answer(trello, monkeypatch, create_response(200, [{"200": {"id": "c1"}}, {"name": "NotFound", "statusCode": 404}]))
+
+    assert trello.get_checklists(["c1", "c2"]) == {"c1": {"id": "c1"}, "c2": None}
+
+
+def test_batch_get_raises_for_a_failed_entry(trello, monkeypatch):
+    answer(trello, monkeypatch, create_response(200, [{"200": {"id": "c1"}}, {"name": "Error", "statusCode": 500}]))
+
+    with pytest.raises(RequestFailedError):
+        trello.get_checklists(["c1", "c2"])
+
+
+def test_batch_get_raises_for_a_failed_batch(trello, monkeypatch):
+    answer(trello, monkeypatch, *[create_response(503) for _ in range(3)])
+
+    with pytest.raises(RequestFailedError):
+        trello.get_checklists(["c1", "c2"])